@@ -0,0 +1,273 @@
+"""
+Local stand-ins for api.weather.gov and an OpenAI-compatible chat endpoint.
+
+One threaded HTTP server answers:
+    GET  /points/{lat},{lon}                     -> points metadata
+    GET  /gridpoints/{office}/{x},{y}/forecast   -> 14 forecast periods
+    POST /v1/chat/completions                    -> a tool call to the weather
+                                                    tool (one per marker for
+                                                    "marker 1 vs marker 2"),
+                                                    then a final answer once
+                                                    tool results are sent
+
+Latency, jitter and error rates are configurable so benchmarks can model a
+slow or flaky upstream; chat latency can grow with prompt size, differ per
+requested model and have a slow tail, and usage reports an estimated
+prompt token count. Only the standard library is used.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the fake upstreams"""
+    latency: float = 0.0  # seconds added to every weather.gov response
+    jitter: float = 0.0  # extra uniform random delay, seconds
+    error_rate: float = 0.0  # fraction of weather.gov requests answered with 500
+    llm_latency: float = 0.0  # seconds before each chat completion responds
+    llm_prefill_latency: float = 0.0  # extra seconds per 1000 prompt tokens (models prompt processing)
+    llm_tail_rate: float = 0.0  # fraction of chat completions delayed by llm_tail_latency
+    llm_tail_latency: float = 0.0
+    model_latency: Dict[str, float] = field(default_factory=dict)  # extra seconds per requested model
+    failing_models: List[str] = field(default_factory=list)  # models answered with 500
+    max_age: Optional[int] = None  # Cache-Control max-age sent with weather.gov responses
+    seed: int = 0
+
+
+def _points_body(base_url: str, latitude: str, longitude: str) -> Dict[str, Any]:
+    x = int(abs(float(latitude)) * 10) % 100
+    y = int(abs(float(longitude)) * 10) % 100
+    return {
+        "properties": {
+            "forecast": f"{base_url}/gridpoints/TST/{x},{y}/forecast",
+            "forecastHourly": f"{base_url}/gridpoints/TST/{x},{y}/forecast/hourly",
+            "relativeLocation": {"properties": {"city": "Testville", "state": "TS"}},
+        }
+    }
+
+
+def _forecast_body() -> Dict[str, Any]:
+    periods = []
+    for number in range(1, 15):
+        periods.append({
+            "number": number,
+            "name": f"Period {number}",
+            "temperature": 50 + number,
+            "temperatureUnit": "F",
+            "windSpeed": "5 to 10 mph",
+            "windDirection": "NW",
+            "shortForecast": "Partly Cloudy",
+            "detailedForecast": "Partly cloudy, with a high near 60. Northwest wind 5 to 10 mph.",
+        })
+    return {"properties": {"periods": periods}}
+
+
+def _prompt_tokens(body: Dict[str, Any]) -> int:
+    """Rough prompt size (~4 characters per token) of the messages and tool schemas"""
+    text = json.dumps(body.get("messages", [])) + json.dumps(body.get("tools") or [])
+    return len(text) // 4
+
+
+def _tool_arguments(messages: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """One call per marker when the question compares several ("marker 3 vs marker 4"), else one fixed call"""
+    user_text = " ".join(str(m.get("content") or "") for m in messages if m.get("role") == "user")
+    markers = re.findall(r"marker (\d+)", user_text)
+    if len(markers) < 2:
+        return [{"latitude": 47.6062, "longitude": -122.3321}]
+    return [{"latitude": 30 + int(n) % 1000 / 100, "longitude": -100 - int(n) // 1000 % 20} for n in markers]
+
+
+def _chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the assistant message: call the first tool, or answer once a tool replied"""
+    messages: List[Dict[str, Any]] = body.get("messages", [])
+    tools = body.get("tools") or []
+    if tools and not any(message.get("role") == "tool" for message in messages):
+        name = tools[0]["function"]["name"]
+        calls = [
+            {"id": f"call_{i}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+            for i, arguments in enumerate(_tool_arguments(messages), 1)
+        ]
+        message = {"role": "assistant", "content": None, "tool_calls": calls}
+        return {"message": message, "finish_reason": "tool_calls"}
+    content = "Expect partly cloudy skies with a high near 60°F and a light northwest wind."
+    return {"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+
+
+def _stream_chunks(model: str, completion: Dict[str, Any], usage: Optional[Dict[str, int]]) -> bytes:
+    """Render a completion as server-sent events in the OpenAI streaming format"""
+    message = completion["message"]
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    chunks = [chunk({"role": "assistant", "content": ""})]
+    if message.get("tool_calls"):
+        for index, call in enumerate(message["tool_calls"]):
+            chunks.append(chunk({"tool_calls": [{
+                "index": index, "id": call["id"], "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": ""},
+            }]}))
+            chunks.append(chunk({"tool_calls": [{"index": index, "function": {"arguments": call["function"]["arguments"]}}]}))
+    else:
+        for word in message["content"].split(" "):
+            chunks.append(chunk({"content": word + " "}))
+    chunks.append(chunk({}, completion["finish_reason"]))
+    if usage is not None:
+        usage_chunk = chunk({})
+        usage_chunk["choices"] = []
+        usage_chunk["usage"] = usage
+        chunks.append(usage_chunk)
+
+    events = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+    return events.encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    server: "FakeUpstreamServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        config = self.server.config
+        self.server.count("weather")
+        delay = config.latency + (self.server.random() * config.jitter if config.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if config.error_rate and self.server.random() < config.error_rate:
+            self._send(500, {"detail": "Injected upstream error"})
+            return
+
+        path = self.path.split("?", 1)[0].strip("/")
+        parts = path.split("/")
+        headers = {"cache-control": f"public, max-age={config.max_age}"} if config.max_age is not None else {}
+        if len(parts) == 2 and parts[0] == "points" and "," in parts[1]:
+            latitude, longitude = parts[1].split(",", 1)
+            self._send(200, _points_body(self.server.base_url, latitude, longitude), headers)
+        elif parts[0] == "gridpoints" and parts[-1] == "forecast":
+            self._send(200, _forecast_body(), headers)
+        else:
+            self._send(404, {"detail": f"Unknown path /{path}"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("content-length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        self.server.count("llm")
+        config = self.server.config
+        model = body.get("model", "fake-model")
+        if model in config.failing_models:
+            self._send(500, {"error": {"message": f"{model} is unavailable"}})
+            return
+        prompt_tokens = _prompt_tokens(body)
+        delay = config.llm_latency + config.llm_prefill_latency * prompt_tokens / 1000 + config.model_latency.get(model, 0.0)
+        if config.llm_tail_rate and self.server.random() < config.llm_tail_rate:
+            delay += config.llm_tail_latency
+        if delay:
+            time.sleep(delay)
+
+        completion = _chat_completion(body)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": 20, "total_tokens": prompt_tokens + 20}
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            payload = _stream_chunks(model, completion, usage if include_usage else None)
+            self._send_bytes(200, payload, "text/event-stream")
+            return
+        self._send(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": 0,
+            "model": model,
+            "choices": [{"index": 0, **completion}],
+            "usage": usage,
+        })
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_bytes(status, json.dumps(body).encode(), "application/json", headers)
+
+    def _send_bytes(self, status: int, payload: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request, e.g. a hedged chat call that lost
+            pass
+
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    """
+    Fake weather.gov + chat completions server on a background thread.
+
+    Use as a context manager; base_url is the weather API base and
+    llm_base_url the OpenAI-compatible base URL.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, config: Optional[FakeServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeServerConfig()
+        self.requests = {"weather": 0, "llm": 0}
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def llm_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def start(self) -> "FakeUpstreamServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeUpstreamServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
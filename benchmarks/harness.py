@@ -0,0 +1,132 @@
+"""Load generators and statistics for the benchmark suite"""
+
+import asyncio
+import math
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+
+SYNC = "sync"
+THREADED = "threaded"
+ASYNC = "async"
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+@dataclass
+class BenchmarkResult:
+    """Latencies and allocation figures for one scenario run"""
+    name: str
+    mode: str
+    concurrency: int
+    elapsed: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    alloc_peak_kib: Optional[float] = None
+    retained_per_op_kib: Optional[float] = None
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "alloc_peak_kib": self.alloc_peak_kib,
+            "retained_per_op_kib": self.retained_per_op_kib,
+        }
+
+
+def _timed_call(fn: Callable[[int], Any], index: int) -> Optional[float]:
+    started = time.perf_counter()
+    try:
+        fn(index)
+    except Exception:
+        return None
+    return time.perf_counter() - started
+
+
+def run_sync(name: str, fn: Callable[[int], Any], requests: int) -> BenchmarkResult:
+    """Call fn(i) back to back on the calling thread"""
+    result = BenchmarkResult(name, SYNC, 1, 0.0)
+    started = time.perf_counter()
+    for index in range(requests):
+        _record(result, _timed_call(fn, index))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_threaded(name: str, fn: Callable[[int], Any], requests: int, concurrency: int) -> BenchmarkResult:
+    """Call fn(i) from a pool of concurrency threads"""
+    result = BenchmarkResult(name, THREADED, concurrency, 0.0)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency in pool.map(lambda index: _timed_call(fn, index), range(requests)):
+            _record(result, latency)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def run_async(name: str, fn: Callable[[int], Awaitable[Any]], requests: int, concurrency: int) -> BenchmarkResult:
+    """Await fn(i) with at most concurrency coroutines in flight"""
+    result = BenchmarkResult(name, ASYNC, concurrency, 0.0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> Optional[float]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await fn(index)
+            except Exception:
+                return None
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    for latency in await asyncio.gather(*(one(index) for index in range(requests))):
+        _record(result, latency)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+@contextmanager
+def traced_allocations(result: BenchmarkResult, operations: int) -> Iterator[None]:
+    """
+    Record peak traced memory and memory retained per operation for the
+    code run inside the block. Use it on a separate pass from the timed one:
+    tracing slows every allocation.
+    """
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result.alloc_peak_kib = round((peak - baseline) / 1024, 1)
+    result.retained_per_op_kib = round(max(current - baseline, 0) / 1024 / max(operations, 1), 3)
+
+
+def _record(result: BenchmarkResult, latency: Optional[float]) -> None:
+    if latency is None:
+        result.errors += 1
+    else:
+        result.latencies.append(latency)
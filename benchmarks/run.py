@@ -0,0 +1,249 @@
+"""
+Benchmark ApiClient, WeatherTool and WeatherAgent against local fake upstreams.
+
+    python -m benchmarks.run                                  # everything
+    python -m benchmarks.run --scenarios client tool --modes async
+    python -m benchmarks.run --latency 0.05 --error-rate 0.01
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json   # exit 1 on regression
+
+Each scenario runs in sync (one caller), threaded and async modes and reports
+req/s, p50/p95/p99 latency and allocations (from a separate traced pass).
+No real network or API key is used: weather.gov and OpenRouter are replaced
+by benchmarks.fake_servers.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fake_servers import FakeServerConfig, FakeUpstreamServer
+from benchmarks.harness import ASYNC, SYNC, THREADED, BenchmarkResult, run_async, run_sync, run_threaded, traced_allocations
+
+SCENARIOS = ("client", "tool", "agent")
+MODES = (SYNC, THREADED, ASYNC)
+
+# Distinct points spread over the fake grid
+LOCATIONS = [(round(30 + i * 0.7, 4), round(-120 + i * 1.3, 4)) for i in range(32)]
+
+# Metrics that must not get worse by more than the tolerance, and in which direction
+COMPARED = {"rps": 1, "p50_ms": -1, "p95_ms": -1, "p99_ms": -1}
+# Latency changes smaller than this are scheduler noise, whatever their relative size
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weather agent benchmark suite")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client/tool run")
+    parser.add_argument("--agent-requests", type=int, default=40, help="Queries per agent run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Callers in threaded and async modes")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests before each run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake weather.gov latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random weather.gov latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of weather.gov requests that fail")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake chat completion latency in seconds")
+    parser.add_argument("--max-age", type=int, default=None, help="Cache-Control max-age on weather.gov responses")
+    parser.add_argument("--no-cache", action="store_true", help="Disable grid, response and answer caches")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Write results to this file as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(server: FakeUpstreamServer, args: argparse.Namespace) -> None:
+    """Point settings at the fake upstreams; must run before src is imported"""
+    os.environ["API_BASE_URL"] = server.base_url
+    os.environ["OPENROUTER_BASE_URL"] = server.llm_base_url
+    os.environ["OPENROUTER_API_KEY"] = "benchmark-key"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.no_cache:
+        for name in ("GRID_CACHE_ENABLED", "RESPONSE_CACHE_ENABLED", "AGENT_CACHE_ENABLED"):
+            os.environ[name] = "false"
+
+
+SyncTarget = Tuple[Callable[[int], Any], Callable[[], None]]
+AsyncTarget = Tuple[Callable[[int], Awaitable[Any]], Callable[[], Awaitable[None]]]
+
+
+_query_ids = itertools.count()
+
+
+def _agent_query(index: int) -> str:
+    # Not routable by the fast path and never repeated, so every query runs the agent loop
+    return f"Should I plan a picnic near marker {next(_query_ids)}?"
+
+
+def sync_target(scenario: str) -> SyncTarget:
+    from src.client import ApiClient
+    from src.tools.weather_tool import WeatherTool
+
+    if scenario == "client":
+        client = ApiClient()
+        return (lambda i: client.get(f"gridpoints/TST/{i % 50},{i % 50}/forecast")), client.close
+    if scenario == "tool":
+        tool = WeatherTool()
+        return (lambda i: tool.forecast(*LOCATIONS[i % len(LOCATIONS)])), tool.client.close
+
+    from src.agents.weather_agent import WeatherAgent
+    agent = WeatherAgent()
+    return (lambda i: agent.answer(_agent_query(i))), agent.close
+
+
+def async_target(scenario: str) -> AsyncTarget:
+    from src.client import AsyncApiClient
+    from src.tools.weather_tool import WeatherTool
+
+    if scenario == "client":
+        client = AsyncApiClient()
+        return (lambda i: client.get(f"gridpoints/TST/{i % 50},{i % 50}/forecast")), client.aclose
+    if scenario == "tool":
+        tool = WeatherTool()
+        return (lambda i: tool.aforecast(*LOCATIONS[i % len(LOCATIONS)])), tool.async_client.aclose
+
+    from src.agents.weather_agent import WeatherAgent
+    agent = WeatherAgent()
+    return (lambda i: agent.aanswer(_agent_query(i))), agent.aclose
+
+
+def run_scenario(scenario: str, mode: str, args: argparse.Namespace) -> BenchmarkResult:
+    requests = args.agent_requests if scenario == "agent" else args.requests
+    alloc_ops = min(requests, 50)
+    name = f"{scenario}.{mode}"
+
+    if mode == ASYNC:
+        async def main() -> BenchmarkResult:
+            fn, close = async_target(scenario)
+            try:
+                for index in range(args.warmup):
+                    await fn(index)
+                result = await run_async(name, fn, requests, args.concurrency)
+                if not args.no_alloc:
+                    with traced_allocations(result, alloc_ops):
+                        await run_async(name, fn, alloc_ops, args.concurrency)
+                return result
+            finally:
+                await close()
+        return asyncio.run(main())
+
+    fn, close = sync_target(scenario)
+    try:
+        for index in range(args.warmup):
+            fn(index)
+        if mode == SYNC:
+            result = run_sync(name, fn, requests)
+        else:
+            result = run_threaded(name, fn, requests, args.concurrency)
+        if not args.no_alloc:
+            with traced_allocations(result, alloc_ops):
+                run_sync(name, fn, alloc_ops)
+        return result
+    finally:
+        close()
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Describe every metric that regressed beyond tolerance relative to the baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, direction in COMPARED.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if metric.endswith("_ms") and abs(new - old) < MIN_LATENCY_DELTA_MS:
+                continue
+            change = (new - old) / old
+            if change * direction < -tolerance:
+                regressions.append(f"{name} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    header = f"{'scenario':<18}{'conc':>5}{'req':>6}{'err':>5}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'peak KiB':>10}{'KiB/op':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        line = (
+            f"{name:<18}{row['concurrency']:>5}{row['requests']:>6}{row['errors']:>5}{row['rps']:>10.1f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+            f"{row['alloc_peak_kib'] if row['alloc_peak_kib'] is not None else '-':>10}"
+            f"{row['retained_per_op_kib'] if row['retained_per_op_kib'] is not None else '-':>8}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("rps"):
+            line += f"   ({(row['rps'] - previous['rps']) / previous['rps']:+.0%} req/s vs baseline)"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = FakeServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        llm_latency=args.llm_latency,
+        max_age=args.max_age,
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    with FakeUpstreamServer(config) as server:
+        configure_environment(server, args)
+        results: Dict[str, Dict[str, Any]] = {}
+        started = time.perf_counter()
+        for scenario in args.scenarios:
+            for mode in args.modes:
+                result = run_scenario(scenario, mode, args)
+                results[result.name] = result.to_dict()
+                print(f"  {result.name}: {results[result.name]['rps']} req/s", file=sys.stderr)
+        upstream = dict(server.requests)
+
+    print()
+    print_table(results, baseline)
+    print(f"\nUpstream requests: {upstream['weather']} weather.gov, {upstream['llm']} chat; "
+          f"total time {time.perf_counter() - started:.1f}s")
+
+    report = {
+        "config": {
+            "python": sys.version.split()[0],
+            "requests": args.requests,
+            "agent_requests": args.agent_requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "llm_latency": args.llm_latency,
+            "no_cache": args.no_cache,
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Token and latency report for the agent's LLM calls: full vs compact prompts.
+
+    python -m benchmarks.tokens
+    python -m benchmarks.tokens --queries 40 --prefill-latency 0.3 -o tokens.json
+
+Runs the same agent queries against the fake chat endpoint twice: with the
+original system prompt and verbose tool output ("full"), then with
+AGENT_PROMPT_COMPACT and TOOL_OUTPUT_COMPACT ("compact"). It reports tokens
+per query by prompt part, tool-output tokens and latency. Chat latency is
+modelled as --llm-latency plus --prefill-latency seconds per 1000 prompt
+tokens, so the latency column shows what the token savings are worth under
+that assumption; the token columns don't depend on it.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_servers import FakeServerConfig, FakeUpstreamServer
+from benchmarks.harness import run_sync
+
+VARIANTS = {
+    "full": {"AGENT_PROMPT_COMPACT": False, "TOOL_OUTPUT_COMPACT": False},
+    "compact": {"AGENT_PROMPT_COMPACT": True, "TOOL_OUTPUT_COMPACT": True},
+}
+PARTS = ("system", "tools", "user", "assistant", "tool")
+
+_query_ids = itertools.count()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prompt token and latency report")
+    parser.add_argument("--queries", type=int, default=20, help="Agent queries per variant")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fixed seconds per chat completion")
+    parser.add_argument("--prefill-latency", type=float, default=0.2, help="Chat seconds per 1000 prompt tokens")
+    parser.add_argument("-o", "--output", help="Write the report as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def _counters() -> Dict[str, float]:
+    from src.agents.tokens import PROMPT_TOKENS, TOOL_OUTPUT_TOKENS
+    from src.config import settings
+    from src.metrics import LLM_TOKENS
+
+    values = {part: PROMPT_TOKENS.value(model=settings.LLM_MODEL, part=part) for part in PARTS}
+    values["tool_output"] = sum(
+        TOOL_OUTPUT_TOKENS.value(tool=name) for name in ("get_weather_forecast", "get_weather_details", "geocode_place")
+    )
+    values["provider_prompt"] = LLM_TOKENS.value(model=settings.LLM_MODEL, kind="prompt")
+    return values
+
+
+def run_variant(name: str, queries: int) -> Dict[str, Any]:
+    from src.agents.weather_agent import WeatherAgent
+    from src.config import settings
+
+    for key, value in VARIANTS[name].items():
+        setattr(settings, key, value)
+    agent = WeatherAgent()
+    try:
+        # Warm up so the first query doesn't pay for building the executor
+        agent.answer(f"Should I plan a picnic near marker {next(_query_ids)}?")
+        before = _counters()
+        result = run_sync(name, lambda i: agent.answer(f"Should I plan a picnic near marker {next(_query_ids)}?"), queries)
+        after = _counters()
+    finally:
+        agent.close()
+
+    row = result.to_dict()
+    per_query = {key: round((after[key] - before[key]) / queries, 1) for key in after}
+    per_query["prompt_total"] = round(sum(per_query[part] for part in PARTS), 1)
+    return {"errors": row["errors"], "p50_ms": row["p50_ms"], "p95_ms": row["p95_ms"], "tokens_per_query": per_query}
+
+
+def print_report(report: Dict[str, Dict[str, Any]]) -> None:
+    header = f"{'variant':<10}" + "".join(f"{part:>11}" for part in PARTS) + f"{'prompt':>9}{'provider':>10}{'p50 ms':>9}{'p95 ms':>9}"
+    print("Tokens per query (all LLM calls), counted locally; provider = usage reported by the chat endpoint")
+    print(header)
+    print("-" * len(header))
+    for name, row in report.items():
+        tokens = row["tokens_per_query"]
+        print(
+            f"{name:<10}" + "".join(f"{tokens[part]:>11.0f}" for part in PARTS)
+            + f"{tokens['prompt_total']:>9.0f}{tokens['provider_prompt']:>10.0f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+        )
+    if "full" in report and "compact" in report:
+        full, compact = report["full"], report["compact"]
+        saved = 1 - compact["tokens_per_query"]["prompt_total"] / full["tokens_per_query"]["prompt_total"]
+        print(f"\nCompact prompts send {saved:.0%} fewer prompt tokens per query; "
+              f"p50 latency {full['p50_ms']:.1f} -> {compact['p50_ms']:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = FakeServerConfig(llm_latency=args.llm_latency, llm_prefill_latency=args.prefill_latency)
+    with FakeUpstreamServer(config) as server:
+        # Must happen before src is imported
+        os.environ["API_BASE_URL"] = server.base_url
+        os.environ["OPENROUTER_BASE_URL"] = server.llm_base_url
+        os.environ["OPENROUTER_API_KEY"] = "benchmark-key"
+        os.environ["METRICS_ENABLED"] = "true"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        report = {name: run_variant(name, args.queries) for name in VARIANTS}
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Build src/data/us_places.gaz from GeoNames data.
+
+    # GeoNames dump (https://download.geonames.org/export/dump/cities500.zip, unzipped)
+    python -m scripts.build_gazetteer cities500.txt
+    # or the same data as shipped in the geonamescache package
+    python -m scripts.build_gazetteer path/to/geonamescache/data/cities500.json
+
+Only US populated places in the 50 states and DC are kept. GeoNames data is
+licensed CC BY 4.0 (https://www.geonames.org/).
+"""
+
+import argparse
+import json
+import struct
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+from src.gazetteer import COORD_SCALE, DEFAULT_PATH, HEADER, KD_ENTRY, MAGIC, RECORD, US_STATES, VERSION, normalize_name
+
+# name, state, latitude, longitude, population
+Row = Tuple[str, str, float, float, int]
+
+
+def read_geonames_tsv(path: str) -> Iterable[Row]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 15 or fields[8] != "US" or fields[6] != "P":
+                continue
+            yield fields[1], fields[10], float(fields[4]), float(fields[5]), int(fields[14] or 0)
+
+
+def read_geonamescache_json(path: str) -> Iterable[Row]:
+    with open(path, encoding="utf-8") as f:
+        cities = json.load(f)
+    for city in cities.values():
+        if city["countrycode"] == "US":
+            yield city["name"], city["admin1code"], city["latitude"], city["longitude"], int(city["population"] or 0)
+
+
+def deduplicate(rows: Iterable[Row]) -> List[Row]:
+    """Keep the most populous entry per (name, state); GeoNames lists some places twice"""
+    best: Dict[Tuple[str, str], Row] = {}
+    for row in rows:
+        name, state = row[0], row[1]
+        key = (normalize_name(name), state)
+        if state in US_STATES and key[0] and len(key[0].encode()) < 256 and len(name.encode()) < 256:
+            if key not in best or row[4] > best[key][4]:
+                best[key] = row
+    return list(best.values())
+
+
+def kd_order(points: List[Tuple[float, float]]) -> List[int]:
+    """Lay out point indexes as an implicit k-d tree (see src/gazetteer.py)"""
+    order = list(range(len(points)))
+
+    def build(lo: int, hi: int, depth: int) -> None:
+        if hi - lo <= 1:
+            return
+        axis = depth % 2
+        order[lo:hi] = sorted(order[lo:hi], key=lambda i: points[i][axis])
+        mid = (lo + hi) // 2
+        build(lo, mid, depth + 1)
+        build(mid + 1, hi, depth + 1)
+
+    build(0, len(order), 0)
+    return order
+
+
+def build(rows: List[Row], output: str) -> int:
+    rows.sort(key=lambda row: (normalize_name(row[0]), -row[4], row[1]))
+    states = sorted({row[1] for row in rows})
+    state_index = {code: i for i, code in enumerate(states)}
+
+    names = bytearray()
+    records = bytearray()
+    for name, state, latitude, longitude, population in rows:
+        key = normalize_name(name).encode()
+        display = name.encode()
+        records += RECORD.pack(
+            round(latitude * COORD_SCALE), round(longitude * COORD_SCALE), population,
+            len(names), state_index[state], len(key), len(display),
+        )
+        names += key + display
+
+    # Build the tree on the stored (rounded) coordinates so lookups see the same values
+    points = [
+        (round(row[2] * COORD_SCALE) / COORD_SCALE, round(row[3] * COORD_SCALE) / COORD_SCALE) for row in rows
+    ]
+    kd = b"".join(KD_ENTRY.pack(i) for i in kd_order(points))
+
+    states_blob = "".join(states).encode()
+    names_offset = HEADER.size + len(states_blob) + len(records)
+    kd_offset = names_offset + len(names)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(states), len(rows), names_offset, kd_offset))
+        f.write(states_blob)
+        f.write(records)
+        f.write(names)
+        f.write(kd)
+    return len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the bundled US gazetteer from GeoNames data")
+    parser.add_argument("source", help="GeoNames dump (.txt) or geonamescache cities JSON (.json)")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH, help=f"Output file (default {DEFAULT_PATH})")
+    parser.add_argument("--min-population", type=int, default=0, help="Drop smaller places")
+    args = parser.parse_args()
+
+    reader = read_geonamescache_json if args.source.endswith(".json") else read_geonames_tsv
+    rows = [row for row in deduplicate(reader(args.source)) if row[4] >= args.min_population]
+    count = build(rows, args.output)
+    print(f"Wrote {count} places to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""LangChain callback handlers used by WeatherAgent"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.agents.streaming import TOKEN, TOOL_START, AgentEvent
+from src.agents.tokens import prompt_breakdown, record_prompt, record_tool_output
+from src.metrics import record_llm_usage, record_span
+
+
+class QueueCallbackHandler(BaseCallbackHandler):
+    """
+    Forwards LLM tokens and tool starts from a running AgentExecutor into a queue.
+
+    Only non-empty content tokens are forwarded: tool-call turns stream their
+    arguments as tool_call_chunks with empty content, so what reaches the
+    queue is the text the model writes for the user.
+    """
+
+    def __init__(self, events: "queue.Queue[Any]"):
+        self.events = events
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.events.put(AgentEvent(TOKEN, token))
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        name: Optional[str] = (serialized or {}).get("name") or kwargs.get("name")
+        self.events.put(AgentEvent(TOOL_START, name or "tool"))
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records an "llm" span and token usage for every LLM call.
+
+    Token counts come from the provider's usage report: llm_output for
+    non-streaming calls, the message's usage_metadata for streamed ones.
+    Each chat prompt is also broken down by part (system, tool schemas,
+    user, assistant, tool results) and, when the handler is attached to the
+    tools too, each tool result is counted as it is produced.
+    """
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started: Dict[UUID, Tuple[float, float]] = {}
+        self._prompt_parts: Dict[UUID, Dict[str, int]] = {}
+        self._tools: Dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        tools = (kwargs.get("invocation_params") or {}).get("tools")
+        parts = prompt_breakdown([message for batch in messages for message in batch], tools)
+        record_prompt(self.model, parts)
+        with self._lock:
+            self._prompt_parts[run_id] = parts
+        self._start(run_id)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = self._token_usage(response)
+        self._finish(run_id, None, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        record_llm_usage(self.model, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, type(error).__name__)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._tools[run_id] = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            name = self._tools.pop(run_id, "tool")
+        record_tool_output(name, output)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._tools.pop(run_id, None)
+
+    def _start(self, run_id: UUID) -> None:
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), time.time())
+
+    def _finish(self, run_id: UUID, error: Optional[str], **attrs: Any) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            parts = self._prompt_parts.pop(run_id, None)
+        if started is None:
+            return
+        if parts:
+            attrs["prompt_parts"] = parts
+        record_span("llm", time.perf_counter() - started[0], started[1], error=error, model=self.model, **attrs)
+
+    @staticmethod
+    def _token_usage(response: Any) -> Tuple[int, int]:
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        if usage:
+            return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        for generations in getattr(response, "generations", []):
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+        return 0, 0
@@ -0,0 +1,182 @@
+"""
+AgentExecutor that runs the tool calls of one LLM turn concurrently.
+
+LangChain's AgentExecutor performs the tool calls a model returns in one
+turn one after another on the sync path, and all at once with no bound on
+the async path. For "Seattle vs Miami vs Denver" the model asks for three
+forecasts in a single turn; running them concurrently makes the turn take
+about as long as the slowest lookup.
+
+ParallelAgentExecutor keeps LangChain's planning and error handling and
+only changes how a turn's actions are performed: at most
+max_tool_concurrency at a time (threads for invoke, tasks for ainvoke),
+for at most tool_timeout seconds and never past max_execution_time. A call
+that misses the deadline gets a timeout observation, so the model can
+still answer from the calls that finished. Keep tool_timeout below
+max_execution_time to leave time for that answer.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+
+from src.logger import setup_logger
+from src.metrics import span
+
+logger = setup_logger(__name__)
+
+# Monotonic time by which the current agent run must finish (None: no deadline)
+_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar("agent_deadline", default=None)
+
+
+class _DeferredStep:
+    """A tool call planned by the base executor, performed later by _run_steps/_arun_steps"""
+
+    def __init__(self, action: AgentAction, perform: Callable[[], Any]):
+        self.action = action
+        self.perform = perform
+
+
+def _timeout_step(action: AgentAction) -> AgentStep:
+    return AgentStep(
+        action=action,
+        observation=f"{action.tool} did not finish before the deadline; answer with the results you have.",
+    )
+
+
+def _timeout(tool_timeout: Optional[float]) -> Optional[float]:
+    """Seconds a turn's tool calls may take: tool_timeout, cut short by the run's deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return tool_timeout
+    remaining = max(deadline - time.monotonic(), 0.0)
+    return remaining if tool_timeout is None else min(tool_timeout, remaining)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor performing each turn's tool calls concurrently"""
+
+    max_tool_concurrency: int = 4
+    """Most tool calls of one turn run at the same time"""
+
+    tool_timeout: Optional[float] = None
+    """Seconds one turn's tool calls may take"""
+
+    def _call(self, inputs: Dict[str, str], run_manager: Any = None) -> Dict[str, Any]:
+        token = _deadline.set(self._start_deadline())
+        try:
+            return super()._call(inputs, run_manager=run_manager)
+        finally:
+            _deadline.reset(token)
+
+    async def _acall(self, inputs: Dict[str, str], run_manager: Any = None) -> Dict[str, str]:
+        token = _deadline.set(self._start_deadline())
+        try:
+            return await super()._acall(inputs, run_manager=run_manager)
+        finally:
+            _deadline.reset(token)
+
+    def _start_deadline(self) -> Optional[float]:
+        if self.max_execution_time is None:
+            return None
+        return time.monotonic() + self.max_execution_time
+
+    # The base class plans a turn and then calls _perform_agent_action /
+    # _aperform_agent_action per action; these overrides defer the calls so
+    # the whole turn can be performed together below.
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, Any],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Any = None,
+    ) -> Any:
+        perform = partial(super()._perform_agent_action, name_to_tool_map, color_mapping, agent_action, run_manager)
+        return _DeferredStep(agent_action, perform)
+
+    async def _aperform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, Any],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Any = None,
+    ) -> Any:
+        perform = partial(super()._aperform_agent_action, name_to_tool_map, color_mapping, agent_action, run_manager)
+        return _DeferredStep(agent_action, perform)
+
+    def _iter_next_step(self, *args: Any, **kwargs: Any) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        deferred: List[_DeferredStep] = []
+        for item in super()._iter_next_step(*args, **kwargs):
+            if isinstance(item, _DeferredStep):
+                deferred.append(item)
+            else:
+                yield item
+        yield from self._run_steps(deferred)
+
+    async def _aiter_next_step(self, *args: Any, **kwargs: Any) -> AsyncIterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        deferred: List[_DeferredStep] = []
+        async for item in super()._aiter_next_step(*args, **kwargs):
+            if isinstance(item, _DeferredStep):
+                deferred.append(item)
+            else:
+                yield item
+        for step in await self._arun_steps(deferred):
+            yield step
+
+    def _run_steps(self, deferred: List[_DeferredStep]) -> List[AgentStep]:
+        """Perform a turn's tool calls on a thread pool, in action order"""
+        if len(deferred) <= 1 or self.max_tool_concurrency <= 1:
+            # Nothing to overlap; run inline, bounded by the tools' own HTTP timeouts
+            return [step.perform() for step in deferred]
+
+        with span("agent.tools", calls=len(deferred)):
+            pool = ThreadPoolExecutor(
+                max_workers=min(len(deferred), self.max_tool_concurrency), thread_name_prefix="agent-tool"
+            )
+            try:
+                # Each call runs in a copy of this context so spans join the query's trace
+                futures = [pool.submit(contextvars.copy_context().run, step.perform) for step in deferred]
+                done, _ = wait(futures, timeout=_timeout(self.tool_timeout))
+                steps = []
+                for step, future in zip(deferred, futures):
+                    if future in done:
+                        steps.append(future.result())
+                    else:
+                        future.cancel()
+                        logger.warning(f"Tool call {step.action.tool} missed the agent deadline")
+                        steps.append(_timeout_step(step.action))
+                return steps
+            finally:
+                # Don't wait for calls that missed the deadline; they finish in the background
+                pool.shutdown(wait=False)
+
+    async def _arun_steps(self, deferred: List[_DeferredStep]) -> List[AgentStep]:
+        """Perform a turn's tool calls as tasks, at most max_tool_concurrency at once"""
+        if not deferred:
+            return []
+        semaphore = asyncio.Semaphore(max(self.max_tool_concurrency, 1))
+
+        async def perform(step: _DeferredStep) -> AgentStep:
+            async with semaphore:
+                return await step.perform()
+
+        with span("agent.tools", calls=len(deferred)):
+            tasks = [asyncio.ensure_future(perform(step)) for step in deferred]
+            done, pending = await asyncio.wait(tasks, timeout=_timeout(self.tool_timeout))
+            for task in pending:
+                task.cancel()
+            steps = []
+            for step, task in zip(deferred, tasks):
+                if task in done:
+                    steps.append(task.result())
+                else:
+                    logger.warning(f"Tool call {step.action.tool} missed the agent deadline")
+                    steps.append(_timeout_step(step.action))
+            return steps
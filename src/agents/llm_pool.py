@@ -0,0 +1,432 @@
+"""
+Chat model pool: hedged requests and fallback across several models.
+
+With LLM_FALLBACK_MODELS set, WeatherAgent talks to a PooledChatModel
+instead of a single ChatOpenAI. Each call goes to the best-ranked model
+first. If no token has arrived by that model's p95 time to first token
+(LLM_HEDGE_DELAY until enough calls have been seen), the call is also sent
+to the next model, and whichever starts answering first is used; the other
+is abandoned. A model that fails is replaced by the next one right away.
+
+Models are ranked by observed time to first token, penalized by their
+recent error rate. A model whose calls fail LLM_FAILURE_THRESHOLD times in
+a row is tried last for LLM_COOLDOWN seconds; each further failure before
+it answers again restarts the cooldown.
+
+Hedging races on the first streamed chunk, so once a model starts
+answering the call is committed to it; an error mid-answer is raised, not
+retried.
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel, generate_from_stream
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+from src.logger import setup_logger
+from src.metrics import registry
+
+logger = setup_logger(__name__)
+
+LLM_POOL_CALLS = registry.counter(
+    "weather_llm_pool_calls_total", "Chat model attempts by model and outcome (won/abandoned/error)"
+)
+LLM_POOL_HEDGES = registry.counter("weather_llm_pool_hedges_total", "Calls sent to a second model because the first was slow")
+LLM_FIRST_TOKEN_SECONDS = registry.histogram(
+    "weather_llm_first_token_seconds", "Seconds until a chat model streamed its first chunk, by model"
+)
+
+# Time-to-first-token samples kept per model, and how many are needed before its p95 replaces LLM_HEDGE_DELAY
+LATENCY_WINDOW = 100
+MIN_SAMPLES = 10
+# Weight of the newest call in the error-rate moving average
+ERROR_DECAY = 0.1
+
+_CHUNK, _DONE, _ERROR = "chunk", "done", "error"
+
+
+def parse_model_spec(spec: str, default_base_url: str) -> Tuple[str, str]:
+    """'model' or 'model@base_url' -> (model, base_url)"""
+    model, sep, base_url = spec.partition("@")
+    return model.strip(), (base_url.strip() if sep else default_base_url)
+
+
+def _at(ordered: List[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ModelStats:
+    """Recent time to first token, error rate and failure cooldown of one pool member"""
+
+    def __init__(
+        self, name: str, failure_threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.latencies: "deque[float]" = deque(maxlen=LATENCY_WINDOW)
+        # Hedge losers' waits: only lower bounds on their time to first token
+        self.abandoned: "deque[float]" = deque(maxlen=LATENCY_WINDOW)
+        self.error_rate = 0.0
+        self.failures = 0
+        # When the latest failure at or past the threshold happened (None: not failing)
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record_first_token(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+            self.error_rate *= 1 - ERROR_DECAY
+            self.failures = 0
+            self.opened_at = None
+        LLM_FIRST_TOKEN_SECONDS.observe(seconds, model=self.name)
+
+    def record_abandoned(self, seconds: float) -> None:
+        """A hedge loser had not answered after seconds; kept apart, see percentile"""
+        with self._lock:
+            self.abandoned.append(seconds)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.error_rate = self.error_rate * (1 - ERROR_DECAY) + ERROR_DECAY
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                # Failures only reset on an answer, so one more after a cooldown starts another
+                self.opened_at = self.clock()
+
+    def cooling_down(self) -> bool:
+        """True while the model is tried last after repeated failures"""
+        with self._lock:
+            return self.opened_at is not None and self.clock() - self.opened_at < self.cooldown
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        q-th percentile of measured times to first token. Abandoned waits
+        may raise it (a model often abandoned while slow is slower than its
+        wins suggest) but never lower it, as they understate the real time.
+        """
+        with self._lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return None
+            measured = sorted(self.latencies)
+            with_abandoned = sorted(list(self.latencies) + list(self.abandoned))
+        return max(_at(measured, q), _at(with_abandoned, q))
+
+    def score(self) -> float:
+        """Lower is better: median time to first token inflated by the error rate (inf until measured)"""
+        median = self.percentile(0.5)
+        if median is None:
+            return float("inf")
+        return median / max(1 - self.error_rate, 0.1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "model": self.name,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": round(self.error_rate, 3),
+            "circuit": "open" if self.cooling_down() else "closed",
+        }
+
+
+class PooledChatModel(BaseChatModel):
+    """
+    Chat model that spreads each call over models (usually ChatOpenAI
+    instances for different models or endpoints) with hedging and fallback.
+    """
+
+    models: List[BaseChatModel]
+    names: List[str]
+    hedge_delay: float = 2.0
+    """Seconds before hedging while a model has too few samples for its own p95"""
+    hedge_enabled: bool = True
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _stats: Dict[str, ModelStats] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._stats = {name: ModelStats(name, self.failure_threshold, self.cooldown) for name in self.names}
+
+    @property
+    def _llm_type(self) -> str:
+        return "pooled-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"models": self.names}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Any:
+        # Let the first member format the tools (and tool_choice) the way it expects;
+        # the same request kwargs are then passed to whichever member serves the call
+        binding = self.models[0].bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [self._stats[name].snapshot() for name in self.names]
+
+    def ranked(self) -> List[int]:
+        """Member indexes, best first; members cooling down after failures go last"""
+        def key(index: int) -> Tuple[bool, float, int]:
+            stats = self._stats[self.names[index]]
+            return stats.cooling_down(), stats.score(), index
+        return sorted(range(len(self.models)), key=key)
+
+    def _hedge_after(self, index: int) -> Optional[float]:
+        if not self.hedge_enabled:
+            return None
+        p95 = self._stats[self.names[index]].percentile(0.95)
+        return self.hedge_delay if p95 is None else p95
+
+    @staticmethod
+    def _wait(hedge_at: Optional[float], can_hedge: bool) -> Optional[float]:
+        """Seconds to wait for the next event before hedging (None: no hedge pending)"""
+        if hedge_at is None or not can_hedge:
+            return None
+        return max(hedge_at - time.monotonic(), 0.0)
+
+    # Sync path: each attempt streams on its own thread into a shared queue
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        order = self.ranked()
+        events: "queue.Queue[Tuple[int, str, Any]]" = queue.Queue()
+        started: Dict[int, float] = {}
+        cancelled: Dict[int, threading.Event] = {}
+        live = set()
+        error: Optional[BaseException] = None
+
+        def start(position: int) -> Optional[float]:
+            index = order[position]
+            started[index] = time.monotonic()
+            cancelled[index] = threading.Event()
+            live.add(index)
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run,
+                args=(self._pump, index, messages, stop, kwargs, events, cancelled[index]),
+                name=f"llm-{self.names[index]}",
+                daemon=True,
+            ).start()
+            hedge = self._hedge_after(index)
+            return None if hedge is None else started[index] + hedge
+
+        next_position = 1
+        hedge_at = start(0)
+        winner = None
+        try:
+            while winner is None:
+                try:
+                    index, kind, payload = events.get(timeout=self._wait(hedge_at, next_position < len(order)))
+                except queue.Empty:
+                    LLM_POOL_HEDGES.inc()
+                    logger.info("Hedging slow call with %s", self.names[order[next_position]])
+                    hedge_at = start(next_position)
+                    next_position += 1
+                    continue
+                if kind == _ERROR:
+                    error = self._record_failure(index, payload)
+                    live.discard(index)
+                    if next_position < len(order):
+                        hedge_at = start(next_position)
+                        next_position += 1
+                    elif not live:
+                        raise error
+                    continue
+                winner = index
+                self._record_winner(winner, started, live, cancelled)
+                if kind == _DONE:
+                    return
+                yield payload
+
+            while True:
+                index, kind, payload = events.get()
+                if index != winner:
+                    continue
+                if kind == _CHUNK:
+                    yield payload
+                elif kind == _ERROR:
+                    raise payload
+                else:
+                    return
+        finally:
+            # Stop attempts still streaming, e.g. when the caller stops reading early
+            for event in cancelled.values():
+                event.set()
+
+    def _pump(
+        self,
+        index: int,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        kwargs: Dict[str, Any],
+        events: "queue.Queue[Tuple[int, str, Any]]",
+        cancelled: threading.Event,
+    ) -> None:
+        stream = self.models[index]._stream(messages, stop=stop, **kwargs)
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    return
+                events.put((index, _CHUNK, chunk))
+            events.put((index, _DONE, None))
+        except Exception as e:
+            events.put((index, _ERROR, e))
+        finally:
+            stream.close()
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        chunks = []
+        for chunk in self._stream(messages, stop=stop, **kwargs):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            chunks.append(chunk)
+        return generate_from_stream(iter(chunks))
+
+    # Async path: each attempt is a task feeding a shared asyncio.Queue
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        order = self.ranked()
+        events: "asyncio.Queue[Tuple[int, str, Any]]" = asyncio.Queue()
+        started: Dict[int, float] = {}
+        tasks: Dict[int, "asyncio.Task[None]"] = {}
+        error: Optional[BaseException] = None
+
+        def start(position: int) -> Optional[float]:
+            index = order[position]
+            started[index] = time.monotonic()
+            tasks[index] = asyncio.ensure_future(self._apump(index, messages, stop, kwargs, events))
+            hedge = self._hedge_after(index)
+            return None if hedge is None else started[index] + hedge
+
+        next_position = 1
+        hedge_at = start(0)
+        winner = None
+        try:
+            while winner is None:
+                try:
+                    index, kind, payload = await asyncio.wait_for(
+                        events.get(), self._wait(hedge_at, next_position < len(order))
+                    )
+                except asyncio.TimeoutError:
+                    LLM_POOL_HEDGES.inc()
+                    logger.info("Hedging slow call with %s", self.names[order[next_position]])
+                    hedge_at = start(next_position)
+                    next_position += 1
+                    continue
+                if kind == _ERROR:
+                    error = self._record_failure(index, payload)
+                    del tasks[index]
+                    if next_position < len(order):
+                        hedge_at = start(next_position)
+                        next_position += 1
+                    elif not tasks:
+                        raise error
+                    continue
+                winner = index
+                losers = {i: task for i, task in tasks.items() if i != winner}
+                self._record_winner(winner, started, set(losers) | {winner}, {})
+                for task in losers.values():
+                    task.cancel()
+                if kind == _DONE:
+                    return
+                yield payload
+
+            while True:
+                index, kind, payload = await events.get()
+                if index != winner:
+                    continue
+                if kind == _CHUNK:
+                    yield payload
+                elif kind == _ERROR:
+                    raise payload
+                else:
+                    return
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+    async def _apump(
+        self,
+        index: int,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        kwargs: Dict[str, Any],
+        events: "asyncio.Queue[Tuple[int, str, Any]]",
+    ) -> None:
+        try:
+            async for chunk in self.models[index]._astream(messages, stop=stop, **kwargs):
+                events.put_nowait((index, _CHUNK, chunk))
+            events.put_nowait((index, _DONE, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            events.put_nowait((index, _ERROR, e))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        chunks = []
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            chunks.append(chunk)
+        return generate_from_stream(iter(chunks))
+
+    # Bookkeeping shared by both paths
+
+    def _record_winner(
+        self, winner: int, started: Dict[int, float], live: Any, cancelled: Dict[int, threading.Event]
+    ) -> None:
+        now = time.monotonic()
+        name = self.names[winner]
+        self._stats[name].record_first_token(now - started[winner])
+        LLM_POOL_CALLS.inc(model=name, outcome="won")
+        for index in live:
+            if index == winner:
+                continue
+            if index in cancelled:
+                cancelled[index].set()
+            self._stats[self.names[index]].record_abandoned(now - started[index])
+            LLM_POOL_CALLS.inc(model=self.names[index], outcome="abandoned")
+
+    def _record_failure(self, index: int, error: BaseException) -> BaseException:
+        name = self.names[index]
+        self._stats[name].record_error()
+        LLM_POOL_CALLS.inc(model=name, outcome="error")
+        logger.warning(f"Chat model {name} failed: {error}")
+        return error
@@ -0,0 +1,325 @@
+"""
+Per-session conversation memory for multi-turn use of WeatherAgent.
+
+Each session keeps its recent turns, a rolling summary of older ones, the
+locations it has resolved and its most recent tool results. The agent
+sends these with the next turn, so a follow-up such as "and tomorrow?"
+can be answered from the forecast already fetched instead of geocoding
+and calling the weather tool again.
+
+History is capped by a token budget: once the kept turns and tool results
+exceed SESSION_HISTORY_TOKENS, the oldest turns are folded into the
+summary. Sessions idle for longer than SESSION_IDLE_TTL are evicted.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.agents.tokens import CHARS_PER_TOKEN, count_tokens
+from src.config import settings
+from src.forecast import truncate
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MAX_LOCATIONS = 5
+
+# "Forecast for Linn, KS:" / "Hourly forecast for Linn, KS (next 12 hours):"
+_LOCATION_RE = re.compile(r"\bfor ([A-Z][^,:\n]*, [A-Z]{2})\b")
+
+
+class Turn(NamedTuple):
+    """One question and the answer given"""
+    query: str
+    response: str
+    tokens: int
+
+
+class ToolResult(NamedTuple):
+    """A tool output kept so follow-up turns can reuse it"""
+    tool: str
+    args: str
+    output: str
+    fetched_at: float
+    tokens: int
+
+
+class Location(NamedTuple):
+    """A place the session has resolved to coordinates"""
+    name: str
+    latitude: float
+    longitude: float
+
+
+def summarize_turns(summary: str, turns: Sequence[Turn], max_tokens: int) -> str:
+    """
+    Extractive rolling summary: one shortened line per folded turn appended
+    to the previous summary, keeping the newest lines within max_tokens
+    """
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        lines.append(f"- Asked: {truncate(turn.query, 120)} Answered: {truncate(turn.response, 200)}")
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    kept: List[str] = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > max_chars:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+
+def _location_from_call(args: Any, output: str) -> Optional[Location]:
+    """The location a weather tool call was made for, named from its output when possible"""
+    if not isinstance(args, dict) or "latitude" not in args or "longitude" not in args:
+        return None
+    try:
+        latitude, longitude = float(args["latitude"]), float(args["longitude"])
+    except (TypeError, ValueError):
+        return None
+    match = _LOCATION_RE.search(output)
+    name = match.group(1) if match else f"{latitude:.4f}, {longitude:.4f}"
+    return Location(name, latitude, longitude)
+
+
+def _format_args(args: Any) -> str:
+    if isinstance(args, dict):
+        return ", ".join(f"{key}={value}" for key, value in args.items())
+    return str(args)
+
+
+class SessionMemory:
+    """
+    Memory of one conversation. Mutations are thread-safe; turns of the same
+    session running concurrently are recorded in completion order.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        history_tokens: int,
+        summary_tokens: int,
+        max_tool_results: int,
+        tool_result_ttl: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.session_id = session_id
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_tool_results = max_tool_results
+        self.tool_result_ttl = tool_result_ttl
+        self.clock = clock
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.tool_results: List[ToolResult] = []
+        self.locations: "OrderedDict[str, Location]" = OrderedDict()
+        self.last_used = clock()
+        self._lock = threading.Lock()
+
+    def has_context(self) -> bool:
+        """True once the session has anything a follow-up question could refer to"""
+        return bool(self.turns or self.summary or self.locations)
+
+    def messages(self) -> List[Tuple[str, str]]:
+        """
+        Chat history for the next turn: earlier turns first, then one system
+        message with the summary, locations and fresh tool results. The turns
+        only grow at the end, so consecutive prompts share a stable prefix.
+        """
+        with self._lock:
+            self._expire_tool_results()
+            messages: List[Tuple[str, str]] = []
+            for turn in self.turns:
+                messages.append(("human", turn.query))
+                messages.append(("ai", turn.response))
+            context = self._render_context()
+            if context:
+                messages.append(("system", context))
+            return messages
+
+    def remember_location(self, location: Location) -> None:
+        with self._lock:
+            self._add_location(location)
+
+    def add_turn(
+        self, query: str, response: str, steps: Iterable[Tuple[Any, Any]] = ()
+    ) -> List[Turn]:
+        """
+        Record a turn and the (action, observation) pairs of the tool calls it
+        made. Returns the oldest turns dropped to stay within the token
+        budget; pass them to fold() to update the summary.
+        """
+        now = self.clock()
+        with self._lock:
+            self.last_used = now
+            for action, observation in steps:
+                self._add_tool_result(action, observation, now)
+            self.turns.append(Turn(query, response, count_tokens(query) + count_tokens(response)))
+            return self._enforce_budget()
+
+    def fold(self, summary: str) -> None:
+        """Replace the summary after turns were dropped"""
+        with self._lock:
+            self.summary = summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self.summary = ""
+            self.turns.clear()
+            self.tool_results.clear()
+            self.locations.clear()
+
+    def tokens(self) -> int:
+        """Tokens the history adds to a prompt (summary excluded, it has its own cap)"""
+        return sum(turn.tokens for turn in self.turns) + sum(result.tokens for result in self.tool_results)
+
+    def _add_location(self, location: Location) -> None:
+        self.locations.pop(location.name, None)
+        self.locations[location.name] = location
+        while len(self.locations) > MAX_LOCATIONS:
+            self.locations.popitem(last=False)
+
+    def _add_tool_result(self, action: Any, observation: Any, now: float) -> None:
+        tool = getattr(action, "tool", "tool")
+        args = getattr(action, "tool_input", None)
+        output = str(getattr(observation, "content", observation))
+        location = _location_from_call(args, output)
+        if location is not None:
+            self._add_location(location)
+        key = (tool, _format_args(args))
+        self.tool_results = [r for r in self.tool_results if (r.tool, r.args) != key]
+        self.tool_results.append(ToolResult(tool, key[1], output, now, count_tokens(output)))
+        if len(self.tool_results) > self.max_tool_results:
+            del self.tool_results[:len(self.tool_results) - self.max_tool_results]
+
+    def _expire_tool_results(self) -> None:
+        oldest = self.clock() - self.tool_result_ttl
+        self.tool_results = [result for result in self.tool_results if result.fetched_at > oldest]
+
+    def _enforce_budget(self) -> List[Turn]:
+        """Drop old turns, then old tool results, until the history fits the budget"""
+        self._expire_tool_results()
+        dropped: List[Turn] = []
+        total = self.tokens()
+        while total > self.history_tokens and len(self.turns) > 1:
+            turn = self.turns.pop(0)
+            dropped.append(turn)
+            total -= turn.tokens
+        while total > self.history_tokens and self.tool_results:
+            total -= self.tool_results.pop(0).tokens
+        if dropped:
+            logger.debug("Session %s: folding %d turn(s) into the summary", self.session_id, len(dropped))
+        return dropped
+
+    def _render_context(self) -> str:
+        sections = []
+        if self.summary:
+            sections.append(f"Earlier in this conversation:\n{self.summary}")
+        if self.locations:
+            places = "; ".join(
+                f"{location.name} ({location.latitude:.4f}, {location.longitude:.4f})"
+                for location in reversed(self.locations.values())
+            )
+            sections.append(f"Locations discussed (most recent first): {places}")
+        if self.tool_results:
+            results = "\n\n".join(
+                f"[{result.tool}({result.args}) fetched {time.strftime('%H:%M UTC', time.gmtime(result.fetched_at))}]\n"
+                f"{result.output}"
+                for result in self.tool_results
+            )
+            sections.append(
+                "Recent tool results; answer from these when they cover the question instead of calling the tool again:\n"
+                f"{results}"
+            )
+        return "\n\n".join(sections)
+
+
+class SessionStore:
+    """
+    Sessions by id, with LRU and idle-time eviction.
+
+    Idle sessions are swept on access rather than by a background thread, at
+    most once per tenth of the idle TTL.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl: float = 1800,
+        history_tokens: int = 1500,
+        summary_tokens: int = 200,
+        max_tool_results: int = 3,
+        tool_result_ttl: float = 900,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_tool_results = max_tool_results
+        self.tool_result_ttl = tool_result_ttl
+        self.clock = clock
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+
+    @classmethod
+    def from_settings(cls) -> Optional["SessionStore"]:
+        """Build the store configured in settings, or None when session memory is disabled"""
+        if not settings.SESSION_MEMORY_ENABLED:
+            return None
+        return cls(
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            idle_ttl=settings.SESSION_IDLE_TTL,
+            history_tokens=settings.SESSION_HISTORY_TOKENS,
+            summary_tokens=settings.SESSION_SUMMARY_TOKENS,
+            max_tool_results=settings.SESSION_TOOL_RESULTS,
+            tool_result_ttl=settings.SESSION_TOOL_RESULT_TTL,
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> SessionMemory:
+        """The session's memory, created on first use"""
+        now = self.clock()
+        with self._lock:
+            self._sweep(now)
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                memory = SessionMemory(
+                    session_id,
+                    history_tokens=self.history_tokens,
+                    summary_tokens=self.summary_tokens,
+                    max_tool_results=self.max_tool_results,
+                    tool_result_ttl=self.tool_result_ttl,
+                    clock=self.clock,
+                )
+                self._sessions[session_id] = memory
+                while len(self._sessions) > self.max_sessions:
+                    evicted, _ = self._sessions.popitem(last=False)
+                    logger.debug(f"Evicted least recently used session {evicted}")
+            self._sessions.move_to_end(session_id)
+            memory.last_used = now
+            return memory
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _sweep(self, now: float) -> None:
+        if now - self._last_sweep < self.idle_ttl / 10:
+            return
+        self._last_sweep = now
+        idle = [sid for sid, memory in self._sessions.items() if now - memory.last_used > self.idle_ttl]
+        for session_id in idle:
+            del self._sessions[session_id]
+        if idle:
+            logger.debug(f"Evicted {len(idle)} idle session(s)")
@@ -5,14 +5,17 @@ WEATHER_AGENT_SYSTEM_PROMPT = """You are a helpful weather assistant with access
 Your capabilities:
 - You can fetch weather forecasts for any location in the United States
 - You have access to the get_weather_forecast tool which requires latitude and longitude coordinates
+- You have access to the get_weather_details tool for hour-by-hour forecasts, active weather alerts and raw gridpoint data; ask for every section a question needs in one call (e.g. sections ["hourly", "alerts"] for "will it rain at 3pm and are there any warnings?")
+- You have access to the geocode_place tool which looks up the coordinates of any US city or town
 - You should be conversational and helpful in your responses
 
 Important guidelines:
 1. The weather.gov API only works for US locations
 2. When users ask about weather, you need coordinates (latitude, longitude)
-3. If users provide a city name, you should know common US city coordinates or ask them to provide coordinates
+3. If users provide a place name that is not listed below, look up its coordinates with geocode_place instead of guessing them; if several places match, ask which one they mean
 4. Provide clear, natural language responses based on the weather data
 5. If asked about non-US locations, politely explain that you only have access to US weather data
+6. When a question covers several places, call the tools for all of them at once in the same turn rather than one after another
 
 Common US city coordinates (for reference):
 - New York, NY: 40.7128, -74.0060
@@ -34,6 +37,54 @@ Common US city coordinates (for reference):
 Always be helpful, accurate, and conversational in your responses.
 """
 
+# Short system prompt (AGENT_PROMPT_COMPACT): the tool schemas already describe
+# each tool, and geocode_place replaces the coordinate table above. Sent on
+# every LLM call, so it carries only rules the tools can't express.
+WEATHER_AGENT_SYSTEM_PROMPT_COMPACT = """You are a helpful, conversational weather assistant using US National Weather Service data.
+- Only US locations are supported; politely decline others.
+- Tools need coordinates: look up place names with geocode_place rather than guessing; if several places match, ask which one is meant.
+- For hourly, alert or gridpoint questions, request every section needed in one get_weather_details call.
+- For several places, call the tools for all of them in the same turn.
+- Base answers on the tool results."""
+
+
+def system_prompt(compact: bool) -> str:
+    """The agent's system prompt"""
+    return WEATHER_AGENT_SYSTEM_PROMPT_COMPACT if compact else WEATHER_AGENT_SYSTEM_PROMPT
+
+
+# Fast-path summary: static instructions go in the system message and the
+# per-query data last, so the unchanging prefix is eligible for provider
+# prompt caching
+FAST_PATH_SUMMARY_SYSTEM_PROMPT = """You are a helpful weather assistant. Answer the user's question in two or three friendly sentences using only the forecast provided."""
+
+FAST_PATH_SUMMARY_PROMPT = """Question: {query}
+
+Forecast:
+{forecast}
+"""
+
+
+def fast_path_summary_messages(query: str, forecast: str) -> list:
+    """Chat messages asking the LLM to phrase a fast-path forecast"""
+    return [
+        ("system", FAST_PATH_SUMMARY_SYSTEM_PROMPT),
+        ("human", FAST_PATH_SUMMARY_PROMPT.format(query=query, forecast=forecast)),
+    ]
+
+
+# Rolling summary of turns dropped from a session's history (SESSION_SUMMARY_LLM)
+SESSION_SUMMARY_SYSTEM_PROMPT = """Update the running summary of a weather conversation with the turns below. Keep places, dates and conclusions the user may refer back to; drop pleasantries. Reply with the summary only, at most {max_words} words."""
+
+
+def session_summary_messages(summary: str, turns: list, max_tokens: int) -> list:
+    """Chat messages asking the LLM to fold dropped turns into the summary"""
+    transcript = "\n".join(f"User: {turn.query}\nAssistant: {turn.response}" for turn in turns)
+    return [
+        ("system", SESSION_SUMMARY_SYSTEM_PROMPT.format(max_words=max(max_tokens * 3 // 4, 1))),
+        ("human", f"Summary so far:\n{summary or '(none)'}\n\nTurns:\n{transcript}"),
+    ]
+
 
 # Common US city coordinates mapping
 US_CITY_COORDINATES = {
@@ -53,3 +104,22 @@ US_CITY_COORDINATES = {
     "denver": (39.7392, -104.9903),
     "boston": (42.3601, -71.0589),
 }
+
+# State of each city above, checked against a state given with the name
+US_CITY_STATES = {
+    "new york": "NY",
+    "los angeles": "CA",
+    "chicago": "IL",
+    "houston": "TX",
+    "phoenix": "AZ",
+    "philadelphia": "PA",
+    "san antonio": "TX",
+    "san diego": "CA",
+    "dallas": "TX",
+    "san jose": "CA",
+    "kansas city": "MO",
+    "miami": "FL",
+    "seattle": "WA",
+    "denver": "CO",
+    "boston": "MA",
+}
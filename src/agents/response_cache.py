@@ -0,0 +1,73 @@
+"""Cache of final agent answers keyed on normalized queries"""
+
+import re
+import time
+from typing import Callable, Optional
+
+from src.agents.router import RoutedLocation, normalize_query
+from src.cache import CacheBackend, build_backend, format_coordinate
+from src.config import settings
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AgentResponseCache:
+    """
+    Answer cache in front of WeatherAgent.
+
+    Queries the router resolves to a location share one entry per location
+    ("weather in Seattle?" and "Seattle weather"); other queries are keyed on
+    their normalized words in order, since order and time words change the
+    question ("colder in Seattle than Miami" vs "... Miami than Seattle").
+    Keys include the forecast period bucket so an answer is never reused
+    across a forecast update boundary, and entries expire no later than the
+    forecast data they were built from.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, period: float, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.ttl = ttl
+        self.period = period
+        self.clock = clock
+
+    @classmethod
+    def from_settings(cls) -> Optional["AgentResponseCache"]:
+        """Build the cache configured in settings, or None when it is disabled"""
+        if not settings.AGENT_CACHE_ENABLED:
+            return None
+        backend = build_backend(
+            max_entries=settings.AGENT_CACHE_MAX_ENTRIES,
+            path=settings.AGENT_CACHE_PATH,
+        )
+        return cls(backend, ttl=settings.AGENT_CACHE_TTL, period=settings.AGENT_CACHE_PERIOD)
+
+    def key(self, query: str, location: Optional[RoutedLocation] = None) -> str:
+        bucket = int(self.clock() // self.period)
+        if location is not None:
+            return f"answer:loc:{format_coordinate(location.latitude)},{format_coordinate(location.longitude)}:{bucket}"
+        words = re.findall(r"[a-z0-9'.-]+", normalize_query(query))
+        terms = " ".join(words)
+        return f"answer:q:{terms}:{bucket}"
+
+    def get(self, key: str) -> Optional[str]:
+        response = self.backend.get(key)
+        if response is not None:
+            logger.debug("Agent cache hit for %s", key)
+        return response
+
+    def set(self, key: str, response: str, fresh_until: Optional[float] = None) -> None:
+        """
+        Store an answer; fresh_until caps the TTL at the freshness of the
+        forecast the answer was built from
+        """
+        now = self.clock()
+        period_end = (int(now // self.period) + 1) * self.period
+        expires_at = min(now + self.ttl, period_end)
+        if fresh_until is not None:
+            expires_at = min(expires_at, fresh_until)
+        if expires_at > now:
+            self.backend.set(key, response, expires_at - now)
+
+    def close(self) -> None:
+        self.backend.close()
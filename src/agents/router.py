@@ -0,0 +1,112 @@
+"""Deterministic routing of simple weather queries around the LLM agent"""
+
+import re
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from src.agents.prompts import US_CITY_COORDINATES, US_CITY_STATES
+from src.config import settings
+from src.gazetteer import get_gazetteer, split_state
+
+
+class RoutedLocation(NamedTuple):
+    """A location resolved directly from the user's query"""
+    name: str
+    latitude: float
+    longitude: float
+
+
+# Optional leading/trailing filler that does not change what the user wants
+_LEAD = r"(?:please\s+)?(?:(?:can|could) you\s+)?(?:tell me\s+|show me\s+|get\s+|give me\s+)?"
+_TAIL = r"(?:\s+(?:today|now|right now|currently|please))?"
+_WHAT = r"(?:what(?:'s| is)\s+|how(?:'s| is)\s+)?(?:the\s+)?(?:current\s+)?"
+
+_PLACE_PATTERNS = [
+    # "What's the weather in Seattle?", "forecast for Denver, CO"
+    re.compile(rf"^{_LEAD}{_WHAT}(?:weather|forecast)(?:\s+like)?\s+(?:in|for|at)\s+(?P<place>[a-z .,'-]+?){_TAIL}$"),
+    # "Seattle weather", "Boston forecast today"
+    re.compile(rf"^{_LEAD}(?P<place>[a-z .,'-]+?)\s+(?:weather|forecast){_TAIL}$"),
+]
+
+_COORD = r"-?\d{1,3}(?:\.\d+)?"
+_COORDINATE_PATTERNS = [
+    # "Get forecast for latitude 39.7456, longitude -97.0892"
+    re.compile(
+        rf"^{_LEAD}{_WHAT}(?:weather|forecast)\s+(?:in|for|at)\s+"
+        rf"lat(?:itude)?\s*(?P<lat>{_COORD})\s*,?\s*(?:and\s+)?lon(?:gitude)?\s*(?P<lon>{_COORD}){_TAIL}$"
+    ),
+    # "What's the weather at 37.7749, -122.4194?"
+    re.compile(
+        rf"^{_LEAD}{_WHAT}(?:weather|forecast)(?:\s+like)?\s+(?:in|for|at)\s+"
+        rf"(?P<lat>{_COORD})\s*,\s*(?P<lon>{_COORD}){_TAIL}$"
+    ),
+]
+
+
+def lookup_known_city(place: str) -> Optional[Tuple[str, float, float]]:
+    """
+    Resolve a place against the built-in city table.
+
+    Accepts an optional state ("Denver, CO", "Denver CO" or "Denver, Colorado");
+    a state other than the table city's ("Kansas City, KS") is not a match,
+    so the gazetteer can resolve it.
+    """
+    name, state = split_state(place)
+    coordinates = US_CITY_COORDINATES.get(name)
+    if coordinates is None:
+        return None
+    if state is not None and state != US_CITY_STATES[name]:
+        return None
+    return name.title(), coordinates[0], coordinates[1]
+
+
+def resolve_place(place: str) -> Optional[Tuple[str, float, float]]:
+    """
+    Resolve a place from the built-in city table, then the offline gazetteer.
+
+    Gazetteer names must be unambiguous: "Portland, OR" resolves, "Portland"
+    alone does not, nor does a small town named without its state.
+    """
+    known = lookup_known_city(place)
+    if known is not None:
+        return known
+    resolved = get_gazetteer().resolve(place, min_population=settings.GAZETTEER_MIN_POPULATION)
+    if resolved is None:
+        return None
+    return resolved.label, resolved.latitude, resolved.longitude
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    query = re.sub(r"\s+", " ", query.strip().lower()).replace("\u2019", "'")
+    return query.rstrip("?!. ")
+
+
+class QueryRouter:
+    """
+    Recognizes simple "weather in <place>" queries that need no LLM reasoning.
+
+    Anything with extra intent (comparisons, "will it rain", what to wear,
+    unknown places) is left to the full agent by returning None.
+    """
+
+    def __init__(self, resolve_place: Callable[[str], Optional[Tuple[str, float, float]]] = resolve_place):
+        self.resolve_place = resolve_place
+
+    def match(self, query: str) -> Optional[RoutedLocation]:
+        text = normalize_query(query)
+
+        for pattern in _COORDINATE_PATTERNS:
+            m = pattern.match(text)
+            if m:
+                latitude, longitude = float(m.group("lat")), float(m.group("lon"))
+                if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+                    return RoutedLocation(f"{latitude}, {longitude}", latitude, longitude)
+                return None
+
+        for pattern in _PLACE_PATTERNS:
+            m = pattern.match(text)
+            if m:
+                resolved = self.resolve_place(m.group("place").strip(" ,"))
+                if resolved is not None:
+                    return RoutedLocation(*resolved)
+        return None
@@ -0,0 +1,23 @@
+"""Event types for streaming agent output"""
+
+from typing import NamedTuple
+
+
+class AgentEvent(NamedTuple):
+    """
+    One streamed event from WeatherAgent.stream()/astream().
+
+    type is one of:
+        "tool_start" - a tool was invoked (data: tool name)
+        "token"      - a chunk of the final answer (data: text)
+        "final"      - the complete answer, always the last event on success
+        "error"      - the query failed (data: user-facing message), always last
+    """
+    type: str
+    data: str
+
+
+TOOL_START = "tool_start"
+TOKEN = "token"
+FINAL = "final"
+ERROR = "error"
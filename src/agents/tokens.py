@@ -0,0 +1,108 @@
+"""
+Token accounting for what the agent sends to the LLM.
+
+Provider usage reports (weather_llm_tokens_total) only give a total per
+call. These counts split each prompt into its parts - system prompt, tool
+schemas, user input, earlier assistant turns and tool results - so it is
+visible which part a change to the prompt or tool output actually shrinks.
+
+Counts are exact when TOKEN_ENCODING names a tiktoken encoding available
+locally, and otherwise estimated at ~4 characters per token, which is close
+enough to compare prompt variants.
+"""
+
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from src.config import settings
+from src.logger import setup_logger
+from src.metrics import registry
+
+logger = setup_logger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+PROMPT_TOKENS = registry.counter(
+    "weather_prompt_tokens_total", "Prompt tokens sent to the LLM, counted locally, by part (system/tools/user/assistant/tool)"
+)
+TOOL_OUTPUT_TOKENS = registry.counter(
+    "weather_tool_output_tokens_total", "Tokens of tool results handed back to the LLM, by tool"
+)
+
+# LangChain message types (streamed turns keep their chunk type) -> prompt parts
+_PARTS = {
+    "system": "system", "SystemMessageChunk": "system",
+    "human": "user", "HumanMessageChunk": "user",
+    "ai": "assistant", "AIMessageChunk": "assistant",
+    "tool": "tool", "ToolMessageChunk": "tool", "function": "tool", "FunctionMessageChunk": "tool",
+}
+
+_encoder: Any = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder() -> Any:
+    """The configured tiktoken encoding, or None (loaded once; failures fall back to estimates)"""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        with _encoder_lock:
+            if not _encoder_loaded:
+                if settings.TOKEN_ENCODING:
+                    try:
+                        import tiktoken
+                        _encoder = tiktoken.get_encoding(settings.TOKEN_ENCODING)
+                    except Exception as e:
+                        logger.warning(f"Token encoding {settings.TOKEN_ENCODING!r} unavailable, estimating counts: {e}")
+                _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text (exact with TOKEN_ENCODING, otherwise estimated)"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _content_text(content: Any) -> str:
+    """Text of a message content: a string or a list of content blocks"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block if isinstance(block, str) else str(block.get("text", "")) for block in content)
+    return str(content or "")
+
+
+def prompt_breakdown(messages: Iterable[Any], tools: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, int]:
+    """Tokens per prompt part for a list of LangChain messages and the tool schemas sent with them"""
+    parts: Dict[str, int] = {}
+    tools = list(tools or [])
+    if tools:
+        parts["tools"] = count_tokens(json.dumps(tools, separators=(",", ":")))
+    for message in messages:
+        part = _PARTS.get(getattr(message, "type", ""), "user")
+        tokens = count_tokens(_content_text(getattr(message, "content", message)))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            tokens += count_tokens(json.dumps([
+                {"name": call.get("name"), "args": call.get("args")} for call in tool_calls
+            ], separators=(",", ":")))
+        parts[part] = parts.get(part, 0) + tokens
+    return parts
+
+
+def record_prompt(model: str, parts: Dict[str, int]) -> None:
+    for part, tokens in parts.items():
+        PROMPT_TOKENS.inc(tokens, model=model, part=part)
+
+
+def record_tool_output(tool: str, output: Any) -> int:
+    tokens = count_tokens(_content_text(getattr(output, "content", output)))
+    TOOL_OUTPUT_TOKENS.inc(tokens, tool=tool)
+    return tokens
@@ -1,17 +1,36 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+import queue
+import threading
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from src.batch import BatchResult, arun_batch, run_batch
 from src.config import settings
+from src.cache import GridPointCache, ResponseCache
+from src.client import ApiClient, AsyncApiClient
+from src.tools.geocode_tool import GeocodeTool
+from src.tools.weather_details_tool import WeatherDetailsTool
 from src.tools.weather_tool import WeatherTool
-from src.agents.prompts import WEATHER_AGENT_SYSTEM_PROMPT
+from src.agents.callbacks import MetricsCallbackHandler, QueueCallbackHandler
+from src.agents.memory import Location, SessionMemory, SessionStore, Turn, summarize_turns
+from src.agents.prompts import fast_path_summary_messages, session_summary_messages, system_prompt
+from src.agents.response_cache import AgentResponseCache
+from src.agents.router import QueryRouter, RoutedLocation, normalize_query
+from src.agents.streaming import ERROR, FINAL, TOKEN, TOOL_START, AgentEvent
 from src.logger import setup_logger
+from src.metrics import instrumentation_enabled, record_answer, span, trace
+from src.prefetch import DemandTracker, ForecastPrefetcher
 
 logger = setup_logger(__name__)
 
 
 class WeatherAgent:
-    """AI Agent for weather-related queries using OpenRouter"""
+    """
+    AI Agent for weather-related queries using OpenRouter
+    
+    The LLM and AgentExecutor (and the LangChain/OpenAI imports behind them)
+    are built on first use, so paths that never reach the LLM - cached
+    answers, the fast path, coordinate batches - don't pay for them. Call
+    warm_up() to build them ahead of the first query.
+    """
     
     def __init__(self):
         logger.info("Initializing Weather Agent with OpenRouter")
@@ -23,28 +42,153 @@ class WeatherAgent:
                 "Get your API key from: https://openrouter.ai/"
             )
         
-        # Initialize LLM with OpenRouter
-        self.llm = ChatOpenAI(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            api_key=settings.OPENROUTER_API_KEY,
-            base_url=settings.OPENROUTER_BASE_URL,
-            default_headers={
-                "HTTP-Referer": "https://github.com/wayandarma/learningAiAgent",
-                "X-Title": "Weather AI Agent"
-            }
-        )
+        # Initialize tools sharing one pooled HTTP client per execution model
+        self.response_cache = ResponseCache.from_settings()
+        self.client = ApiClient(response_cache=self.response_cache)
+        self.async_client = AsyncApiClient(response_cache=self.response_cache)
+        self.grid_cache = GridPointCache.from_settings()
+        self.demand = DemandTracker(half_life=settings.PREFETCH_DEMAND_HALF_LIFE)
+        self.tools = [
+            WeatherTool(
+                client=self.client, async_client=self.async_client, grid_cache=self.grid_cache, demand=self.demand
+            ),
+            WeatherDetailsTool(client=self.client, async_client=self.async_client, grid_cache=self.grid_cache),
+            GeocodeTool(),
+        ]
+        self.weather_tool = self.tools[0]
+        logger.info(f"Registered {len(self.tools)} tool(s)")
         
-        logger.info(f"LLM initialized with model: {settings.LLM_MODEL}")
+        # Timing and token accounting for every LLM call and tool result, when instrumentation is on
+        self.metrics_callbacks = [MetricsCallbackHandler(settings.LLM_MODEL)] if instrumentation_enabled() else None
+        for tool in self.tools:
+            tool.callbacks = self.metrics_callbacks
+            if settings.AGENT_PROMPT_COMPACT:
+                # Tool schemas go out with every LLM call; drop the docstring-style indentation
+                tool.description = " ".join(tool.description.split())
         
-        # Initialize tools
-        self.tools = [WeatherTool()]
-        logger.info(f"Registered {len(self.tools)} tool(s)")
+        # Deterministic router: resolves simple queries for the fast path and answer cache
+        self.router = QueryRouter()
+        self.answer_cache = AgentResponseCache.from_settings()
+        
+        # Per-session history for multi-turn conversations (run/stream with a session_id)
+        self.sessions = SessionStore.from_settings()
+        
+        # Keeps the most requested forecasts fresh; started by start_prefetcher()
+        self.prefetcher = ForecastPrefetcher.from_settings(self.client, self.demand)
+        
+        # Built lazily by the llm / agent_executor properties
+        self._llm = None
+        self._agent_executor = None
+        self._build_lock = threading.RLock()
+        
+        logger.info("Weather Agent initialized successfully")
+    
+    @property
+    def llm(self):
+        """The ChatOpenAI client, created on first access"""
+        if self._llm is None:
+            with self._build_lock:
+                if self._llm is None:
+                    self._llm = self._build_llm()
+        return self._llm
+    
+    @llm.setter
+    def llm(self, value) -> None:
+        self._llm = value
+    
+    @property
+    def agent_executor(self):
+        """The tool-calling AgentExecutor, created on first access"""
+        if self._agent_executor is None:
+            with self._build_lock:
+                if self._agent_executor is None:
+                    self._agent_executor = self._build_executor()
+        return self._agent_executor
+    
+    @agent_executor.setter
+    def agent_executor(self, value) -> None:
+        self._agent_executor = value
+    
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Build the LLM and executor now instead of on the first query.
+        
+        With background=True this runs on a daemon thread, which is returned;
+        a query arriving before it finishes waits for the same build.
+        """
+        if not background:
+            self.agent_executor
+            return None
+        thread = threading.Thread(target=lambda: self.agent_executor, name="agent-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def start_prefetcher(self) -> bool:
+        """Start refreshing hot forecasts in the background; False when prefetching is disabled"""
+        if self.prefetcher is None:
+            return False
+        self.prefetcher.start()
+        return True
+    
+    def _build_llm(self):
+        from langchain_openai import ChatOpenAI
+        from src.cassette import openai_http_clients
+        
+        callbacks = self.metrics_callbacks
+        
+        def chat_model(model: str, base_url: str, **kwargs):
+            return ChatOpenAI(
+                model=model,
+                temperature=settings.LLM_TEMPERATURE,
+                max_tokens=settings.LLM_MAX_TOKENS,
+                api_key=settings.OPENROUTER_API_KEY,
+                base_url=base_url,
+                streaming=True,
+                stream_usage=callbacks is not None,
+                default_headers={
+                    "HTTP-Referer": "https://github.com/wayandarma/learningAiAgent",
+                    "X-Title": "Weather AI Agent"
+                },
+                **openai_http_clients(),
+                **kwargs,
+            )
+        
+        if not settings.LLM_FALLBACK_MODELS:
+            # Initialize LLM with OpenRouter
+            llm = chat_model(settings.LLM_MODEL, settings.OPENROUTER_BASE_URL, callbacks=callbacks)
+            logger.info(f"LLM initialized with model: {settings.LLM_MODEL}")
+            return llm
+        
+        from src.agents.llm_pool import PooledChatModel, parse_model_spec
+        
+        specs = [(settings.LLM_MODEL, settings.OPENROUTER_BASE_URL)] + [
+            parse_model_spec(spec, settings.OPENROUTER_BASE_URL) for spec in settings.LLM_FALLBACK_MODELS
+        ]
+        llm = PooledChatModel(
+            # The pool moves on to the next model itself; client retries would only delay that
+            models=[chat_model(model, base_url, max_retries=0) for model, base_url in specs],
+            names=[model if base_url == settings.OPENROUTER_BASE_URL else f"{model}@{base_url}" for model, base_url in specs],
+            hedge_enabled=settings.LLM_HEDGE_ENABLED,
+            hedge_delay=settings.LLM_HEDGE_DELAY,
+            failure_threshold=settings.LLM_FAILURE_THRESHOLD,
+            cooldown=settings.LLM_COOLDOWN,
+            callbacks=callbacks,
+        )
+        logger.info(f"LLM pool initialized with models: {', '.join(llm.names)}")
+        return llm
+    
+    def _build_executor(self):
+        from langchain.agents import create_tool_calling_agent
+        from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+        from src.agents.executor import ParallelAgentExecutor
         
         # Create prompt
         self.prompt = ChatPromptTemplate.from_messages([
-            ("system", WEATHER_AGENT_SYSTEM_PROMPT),
+            # Static content first (system prompt, then the tool schemas the
+            # request carries), per-query content last: keeps a stable prefix
+            # for provider prompt caching
+            ("system", system_prompt(settings.AGENT_PROMPT_COMPACT)),
+            MessagesPlaceholder(variable_name="chat_history", optional=True),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
@@ -56,35 +200,425 @@ class WeatherAgent:
             prompt=self.prompt
         )
         
-        # Create executor
-        self.agent_executor = AgentExecutor(
+        # Create executor; tool calls returned in one turn run concurrently
+        executor = ParallelAgentExecutor(
             agent=self.agent,
             tools=self.tools,
-            verbose=settings.DEBUG,
-            max_iterations=3,
-            handle_parsing_errors=True
+            # Chain traces are printed to stdout inline, outside the log pipeline; keep them to plain text mode
+            verbose=settings.DEBUG and settings.LOG_FORMAT == "text" and not settings.LOG_QUEUE_ENABLED,
+            max_iterations=settings.AGENT_MAX_ITERATIONS,
+            max_execution_time=settings.AGENT_DEADLINE or None,
+            max_tool_concurrency=settings.AGENT_TOOL_CONCURRENCY,
+            tool_timeout=settings.AGENT_TOOL_TIMEOUT or None,
+            handle_parsing_errors=True,
+            # Tool calls and results are kept in session memory for follow-ups
+            return_intermediate_steps=True,
         )
-        
-        logger.info("Weather Agent initialized successfully")
+        logger.info("Agent executor built")
+        return executor
+    
+    def close(self) -> None:
+        """Release the shared HTTP connection pool and cache resources"""
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        self.client.close()
+        if self.grid_cache is not None:
+            self.grid_cache.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.answer_cache is not None:
+            self.answer_cache.close()
     
-    def run(self, query: str) -> str:
+    async def aclose(self) -> None:
+        """Release both the sync and async HTTP connection pools and cache resources"""
+        self.close()
+        await self.async_client.aclose()
+    
+    def __enter__(self) -> "WeatherAgent":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def run(self, query: str, session_id: Optional[str] = None) -> str:
         """
         Run the agent with a user query
         
         Args:
             query: User's weather-related question
+            session_id: Conversation to continue; earlier turns, resolved
+                locations and recent tool results are sent with the query
             
         Returns:
             Agent's response as a string
         """
-        logger.info(f"Processing query: {query}")
-        
         try:
-            result = self.agent_executor.invoke({"input": query})
-            response = result.get("output", "I couldn't generate a response.")
+            return self.answer(query, session_id)
+        except Exception as e:
+            logger.error(f"Agent error: {e}", exc_info=True)
+            return f"Sorry, I encountered an error: {str(e)}"
+    
+    def answer(self, query: str, session_id: Optional[str] = None) -> str:
+        """Like run, but agent errors propagate instead of becoming a reply"""
+        with trace("agent") as timing:
+            logger.info("Processing query: %s", query)
+            memory = self._session(session_id)
+            location = self._route(query)
+            cache_key, cached = self._cached_answer(query, location, memory)
+            if cached is not None:
+                self._record_turn(memory, query, cached, location=location)
+                timing.set(path="cache")
+                record_answer("cache")
+                return cached
+            
+            if location is not None and settings.FAST_PATH_ENABLED:
+                try:
+                    response = self._fast_path(query, location)
+                    self._remember(cache_key, response, location)
+                    self._record_turn(memory, query, response, location=location)
+                    timing.set(path="fast")
+                    record_answer("fast")
+                    return response
+                except Exception as e:
+                    logger.warning(f"Fast path failed, falling back to agent: {e}")
+            
+            timing.set(path="agent")
+            with span("agent.executor"):
+                result = self.agent_executor.invoke(self._inputs(query, memory))
+            record_answer("agent")
+            if "output" not in result:
+                return "I couldn't generate a response."
+            response = result["output"]
+            self._remember(cache_key, response, location)
+            self._record_turn(memory, query, response, result.get("intermediate_steps", ()), location)
             logger.info("Query processed successfully")
             return response
+    
+    async def arun(self, query: str, session_id: Optional[str] = None) -> str:
+        """
+        Run the agent asynchronously with a user query
+        
+        Tool calls go through WeatherTool._arun, so many queries can share one
+        event loop without a thread per query.
+        
+        Args:
+            query: User's weather-related question
+            session_id: Conversation to continue (see run)
             
+        Returns:
+            Agent's response as a string
+        """
+        try:
+            return await self.aanswer(query, session_id)
         except Exception as e:
             logger.error(f"Agent error: {e}", exc_info=True)
             return f"Sorry, I encountered an error: {str(e)}"
+    
+    async def aanswer(self, query: str, session_id: Optional[str] = None) -> str:
+        """Like arun, but agent errors propagate instead of becoming a reply"""
+        with trace("agent") as timing:
+            logger.info("Processing query (async): %s", query)
+            memory = self._session(session_id)
+            location = self._route(query)
+            cache_key, cached = self._cached_answer(query, location, memory)
+            if cached is not None:
+                await self._arecord_turn(memory, query, cached, location=location)
+                timing.set(path="cache")
+                record_answer("cache")
+                return cached
+            
+            if location is not None and settings.FAST_PATH_ENABLED:
+                try:
+                    response = await self._afast_path(query, location)
+                    self._remember(cache_key, response, location)
+                    await self._arecord_turn(memory, query, response, location=location)
+                    timing.set(path="fast")
+                    record_answer("fast")
+                    return response
+                except Exception as e:
+                    logger.warning(f"Fast path failed, falling back to agent: {e}")
+            
+            timing.set(path="agent")
+            with span("agent.executor"):
+                result = await self.agent_executor.ainvoke(self._inputs(query, memory))
+            record_answer("agent")
+            if "output" not in result:
+                return "I couldn't generate a response."
+            response = result["output"]
+            self._remember(cache_key, response, location)
+            await self._arecord_turn(memory, query, response, result.get("intermediate_steps", ()), location)
+            logger.info("Query processed successfully")
+            return response
+    
+    def stream(self, query: str, session_id: Optional[str] = None) -> Iterator[AgentEvent]:
+        """
+        Run the agent and yield events as they happen.
+        
+        Yields tool_start events when a tool is called and token events with
+        chunks of the answer as the LLM produces them, ending with a final
+        event carrying the full answer (or an error event).
+        """
+        logger.info("Streaming query: %s", query)
+        try:
+            memory = self._session(session_id)
+            location = self._route(query)
+            cache_key, cached = self._cached_answer(query, location, memory)
+            if cached is not None:
+                self._record_turn(memory, query, cached, location=location)
+                yield AgentEvent(TOKEN, cached)
+                yield AgentEvent(FINAL, cached)
+                return
+            
+            if location is not None and settings.FAST_PATH_ENABLED:
+                yield AgentEvent(TOOL_START, self.weather_tool.name)
+                try:
+                    forecast = self.weather_tool.forecast(location.latitude, location.longitude)
+                except Exception as e:
+                    logger.warning(f"Fast path failed, falling back to agent: {e}")
+                else:
+                    parts = []
+                    if settings.FAST_PATH_LLM_SUMMARY:
+                        prompt = fast_path_summary_messages(query, forecast)
+                        for chunk in self.llm.stream(prompt):
+                            if chunk.content:
+                                parts.append(chunk.content)
+                                yield AgentEvent(TOKEN, chunk.content)
+                    else:
+                        parts.append(forecast)
+                        yield AgentEvent(TOKEN, forecast)
+                    response = "".join(parts)
+                    self._remember(cache_key, response, location)
+                    self._record_turn(memory, query, response, location=location)
+                    yield AgentEvent(FINAL, response)
+                    return
+            
+            # Run the executor on a worker thread and relay its callback events
+            events: "queue.Queue[Optional[AgentEvent]]" = queue.Queue()
+            outcome: Dict[str, Any] = {}
+            
+            def execute() -> None:
+                try:
+                    outcome["result"] = self.agent_executor.invoke(
+                        self._inputs(query, memory),
+                        config={"callbacks": [QueueCallbackHandler(events)]},
+                    )
+                except Exception as e:
+                    outcome["error"] = e
+                finally:
+                    events.put(None)
+            
+            worker = threading.Thread(target=execute, name="agent-stream", daemon=True)
+            worker.start()
+            event = events.get()
+            while event is not None:
+                yield event
+                event = events.get()
+            worker.join()
+            
+            if "error" in outcome:
+                raise outcome["error"]
+            result = outcome["result"]
+            if "output" not in result:
+                yield AgentEvent(FINAL, "I couldn't generate a response.")
+                return
+            response = result["output"]
+            self._remember(cache_key, response, location)
+            self._record_turn(memory, query, response, result.get("intermediate_steps", ()), location)
+            yield AgentEvent(FINAL, response)
+            
+        except Exception as e:
+            logger.error(f"Agent error: {e}", exc_info=True)
+            yield AgentEvent(ERROR, f"Sorry, I encountered an error: {str(e)}")
+    
+    async def astream(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[AgentEvent]:
+        """Async counterpart of stream, built on AgentExecutor.astream_events"""
+        logger.info("Streaming query (async): %s", query)
+        try:
+            memory = self._session(session_id)
+            location = self._route(query)
+            cache_key, cached = self._cached_answer(query, location, memory)
+            if cached is not None:
+                await self._arecord_turn(memory, query, cached, location=location)
+                yield AgentEvent(TOKEN, cached)
+                yield AgentEvent(FINAL, cached)
+                return
+            
+            if location is not None and settings.FAST_PATH_ENABLED:
+                yield AgentEvent(TOOL_START, self.weather_tool.name)
+                try:
+                    forecast = await self.weather_tool.aforecast(location.latitude, location.longitude)
+                except Exception as e:
+                    logger.warning(f"Fast path failed, falling back to agent: {e}")
+                else:
+                    parts = []
+                    if settings.FAST_PATH_LLM_SUMMARY:
+                        prompt = fast_path_summary_messages(query, forecast)
+                        async for chunk in self.llm.astream(prompt):
+                            if chunk.content:
+                                parts.append(chunk.content)
+                                yield AgentEvent(TOKEN, chunk.content)
+                    else:
+                        parts.append(forecast)
+                        yield AgentEvent(TOKEN, forecast)
+                    response = "".join(parts)
+                    self._remember(cache_key, response, location)
+                    await self._arecord_turn(memory, query, response, location=location)
+                    yield AgentEvent(FINAL, response)
+                    return
+            
+            root_run_id = None
+            response = None
+            steps: Sequence[Tuple[Any, Any]] = ()
+            async for event in self.agent_executor.astream_events(self._inputs(query, memory), version="v2"):
+                kind = event["event"]
+                if root_run_id is None:
+                    root_run_id = event["run_id"]
+                if kind == "on_tool_start":
+                    yield AgentEvent(TOOL_START, event["name"])
+                elif kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield AgentEvent(TOKEN, content)
+                elif kind == "on_chain_end" and event["run_id"] == root_run_id:
+                    output = event["data"].get("output", {})
+                    response = output.get("output")
+                    steps = output.get("intermediate_steps", ())
+            
+            if response is None:
+                yield AgentEvent(FINAL, "I couldn't generate a response.")
+                return
+            self._remember(cache_key, response, location)
+            await self._arecord_turn(memory, query, response, steps, location)
+            yield AgentEvent(FINAL, response)
+            
+        except Exception as e:
+            logger.error(f"Agent error: {e}", exc_info=True)
+            yield AgentEvent(ERROR, f"Sorry, I encountered an error: {str(e)}")
+    
+    def run_many(self, queries: Iterable[str], max_concurrency: Optional[int] = None) -> Iterator[BatchResult]:
+        """
+        Answer many queries on a thread pool, yielding results as they complete.
+        
+        Identical queries (after normalization) run once. Failures are reported
+        per item in BatchResult.error without aborting the batch.
+        """
+        return run_batch(
+            self.answer,
+            queries,
+            max_concurrency=max_concurrency or settings.BATCH_CONCURRENCY,
+            key=normalize_query,
+        )
+    
+    def arun_many(self, queries: Iterable[str], max_concurrency: Optional[int] = None) -> AsyncIterator[BatchResult]:
+        """Async counterpart of run_many, running queries on the event loop"""
+        return arun_batch(
+            self.aanswer,
+            queries,
+            max_concurrency=max_concurrency or settings.BATCH_CONCURRENCY,
+            key=normalize_query,
+        )
+    
+    def _route(self, query: str) -> Optional[RoutedLocation]:
+        """Return the location for a simple query the fast path can answer"""
+        location = self.router.match(query)
+        if location is not None:
+            logger.info("Routed to %s (%s, %s)", location.name, location.latitude, location.longitude)
+        return location
+    
+    def _cached_answer(
+        self, query: str, location: Optional[RoutedLocation], memory: Optional[SessionMemory] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return the answer cache key and a cached answer, if any"""
+        if self.answer_cache is None:
+            return None, None
+        if location is None and memory is not None and memory.has_context():
+            # A follow-up ("and tomorrow?") means something different in every conversation
+            return None, None
+        cache_key = self.answer_cache.key(query, location)
+        return cache_key, self.answer_cache.get(cache_key)
+    
+    def _remember(self, cache_key: Optional[str], response: str, location: Optional[RoutedLocation]) -> None:
+        """Store an answer, expiring it with the forecast it was built from when known"""
+        if cache_key is None:
+            return
+        fresh_until = None
+        if location is not None:
+            fresh_until = self.weather_tool.forecast_fresh_until(location.latitude, location.longitude)
+        self.answer_cache.set(cache_key, response, fresh_until=fresh_until)
+    
+    def reset_session(self, session_id: str) -> None:
+        """Forget a conversation's history"""
+        if self.sessions is not None:
+            self.sessions.discard(session_id)
+    
+    def _session(self, session_id: Optional[str]) -> Optional[SessionMemory]:
+        if session_id is None or self.sessions is None:
+            return None
+        return self.sessions.get(session_id)
+    
+    @staticmethod
+    def _inputs(query: str, memory: Optional[SessionMemory]) -> Dict[str, Any]:
+        """Executor inputs: the query plus the session's history, if any"""
+        return {"input": query, "chat_history": memory.messages() if memory is not None else []}
+    
+    @staticmethod
+    def _add_turn(
+        memory: SessionMemory, query: str, response: str,
+        steps: Sequence[Tuple[Any, Any]], location: Optional[RoutedLocation],
+    ) -> List[Turn]:
+        if location is not None:
+            memory.remember_location(Location(*location))
+        return memory.add_turn(query, response, steps)
+    
+    def _record_turn(
+        self, memory: Optional[SessionMemory], query: str, response: str,
+        steps: Sequence[Tuple[Any, Any]] = (), location: Optional[RoutedLocation] = None,
+    ) -> None:
+        """Add a turn to the session, folding turns over the token budget into its summary"""
+        if memory is None:
+            return
+        dropped = self._add_turn(memory, query, response, steps, location)
+        if not dropped:
+            return
+        summary = None
+        if settings.SESSION_SUMMARY_LLM:
+            try:
+                summary = self.llm.invoke(session_summary_messages(memory.summary, dropped, memory.summary_tokens)).content
+            except Exception as e:
+                logger.warning(f"Session summary failed, summarizing extractively: {e}")
+        memory.fold(summary or summarize_turns(memory.summary, dropped, memory.summary_tokens))
+    
+    async def _arecord_turn(
+        self, memory: Optional[SessionMemory], query: str, response: str,
+        steps: Sequence[Tuple[Any, Any]] = (), location: Optional[RoutedLocation] = None,
+    ) -> None:
+        """Async counterpart of _record_turn"""
+        if memory is None:
+            return
+        dropped = self._add_turn(memory, query, response, steps, location)
+        if not dropped:
+            return
+        summary = None
+        if settings.SESSION_SUMMARY_LLM:
+            try:
+                message = await self.llm.ainvoke(session_summary_messages(memory.summary, dropped, memory.summary_tokens))
+                summary = message.content
+            except Exception as e:
+                logger.warning(f"Session summary failed, summarizing extractively: {e}")
+        memory.fold(summary or summarize_turns(memory.summary, dropped, memory.summary_tokens))
+    
+    def _fast_path(self, query: str, location: RoutedLocation) -> str:
+        """Answer directly from WeatherTool, skipping tool selection by the LLM"""
+        forecast = self.weather_tool.forecast(location.latitude, location.longitude)
+        if not settings.FAST_PATH_LLM_SUMMARY:
+            return forecast
+        message = self.llm.invoke(fast_path_summary_messages(query, forecast))
+        return message.content
+    
+    async def _afast_path(self, query: str, location: RoutedLocation) -> str:
+        """Async counterpart of _fast_path"""
+        forecast = await self.weather_tool.aforecast(location.latitude, location.longitude)
+        if not settings.FAST_PATH_LLM_SUMMARY:
+            return forecast
+        message = await self.llm.ainvoke(fast_path_summary_messages(query, forecast))
+        return message.content
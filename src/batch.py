@@ -0,0 +1,226 @@
+"""Bounded-concurrency batch execution with per-item error reporting"""
+
+import asyncio
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.logger import setup_logger
+from src.metrics import registry
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch item; exactly one of output/error is set"""
+    index: int
+    input: Any
+    output: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_coordinates(line: str) -> Tuple[float, float]:
+    """Parse a 'latitude,longitude' line"""
+    parts = line.replace(" ", ",").split(",")
+    values = [part for part in parts if part]
+    if len(values) != 2:
+        raise ValueError(f"Expected 'latitude,longitude', got {line!r}")
+    return float(values[0]), float(values[1])
+
+
+def _group(items: List[T], key: Callable[[T], Hashable]) -> Dict[Hashable, List[int]]:
+    """Map each distinct key to the indexes of the items that share it"""
+    groups: Dict[Hashable, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append(index)
+    return groups
+
+
+def _timed(fn: Callable[[T], Any], item: T) -> Tuple[Any, Optional[str], float]:
+    started = time.perf_counter()
+    try:
+        return fn(item), None, time.perf_counter() - started
+    except Exception as e:
+        logger.warning(f"Batch item failed: {e}")
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+
+def run_batch(
+    fn: Callable[[T], Any],
+    items: Iterable[T],
+    max_concurrency: int = 8,
+    key: Callable[[T], Hashable] = lambda item: item,
+) -> Iterator[BatchResult]:
+    """
+    Run fn over items on a thread pool, yielding results as they complete.
+
+    Items with the same key are executed once and the result is reported for
+    each of them. A failing item yields a result with error set and never
+    aborts the rest of the batch.
+    """
+    items = list(items)
+    groups = _group(items, key)
+    logger.info(f"Running batch of {len(items)} item(s), {len(groups)} unique, concurrency {max_concurrency}")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = {pool.submit(_timed, fn, items[indexes[0]]): indexes for indexes in groups.values()}
+        for future in as_completed(futures):
+            output, error, elapsed = future.result()
+            for index in futures[future]:
+                yield BatchResult(index, items[index], output, error, elapsed)
+
+
+async def arun_batch(
+    fn: Callable[[T], Awaitable[Any]],
+    items: Iterable[T],
+    max_concurrency: int = 32,
+    key: Callable[[T], Hashable] = lambda item: item,
+) -> AsyncIterator[BatchResult]:
+    """
+    Asyncio counterpart of run_batch: at most max_concurrency coroutines run at once
+    """
+    items = list(items)
+    groups = _group(items, key)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def execute(indexes: List[int]) -> Any:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                output, error = await fn(items[indexes[0]]), None
+            except Exception as e:
+                logger.warning(f"Batch item failed: {e}")
+                output, error = None, f"{type(e).__name__}: {e}"
+            return indexes, output, error, time.perf_counter() - started
+
+    tasks = [asyncio.ensure_future(execute(indexes)) for indexes in groups.values()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indexes, output, error, elapsed = await next_done
+            for index in indexes:
+                yield BatchResult(index, items[index], output, error, elapsed)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# Seconds the parent waits on the result queue before checking that workers are alive
+_POLL_INTERVAL = 0.5
+
+
+def _process_worker(factory: Callable[[], Tuple[Callable[[Any], Any], Callable[[], None]]], tasks: Any, results: Any, threads: int) -> None:
+    """Worker process body: build fn once, run tasks on threads until the queue's sentinel, then report metrics"""
+    try:
+        fn, close = factory()
+    except Exception as e:
+        results.put(("failed", f"{type(e).__name__}: {e}"))
+        return
+
+    def drain() -> None:
+        while True:
+            task = tasks.get()
+            if task is None:
+                # Leave the sentinel for this worker's other threads and the other workers
+                tasks.put(None)
+                return
+            group, item = task
+            results.put(("result", group, *_timed(fn, item)))
+
+    runners = [threading.Thread(target=drain, daemon=True) for _ in range(threads)]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
+    close()
+    results.put(("metrics", registry.snapshot()))
+
+
+def run_batch_processes(
+    factory: Callable[[], Tuple[Callable[[T], Any], Callable[[], None]]],
+    items: Iterable[T],
+    workers: int,
+    max_concurrency: int = 8,
+    key: Callable[[T], Hashable] = lambda item: item,
+) -> Iterator[BatchResult]:
+    """
+    Run a batch across worker processes, yielding results as they complete.
+
+    factory is a module-level function (it is imported by name in each
+    worker) returning (fn, close): every worker builds its own fn once and
+    runs items on max_concurrency / workers threads, pulling them from a
+    shared queue so faster workers take more. Items are deduplicated by key
+    as in run_batch. When the workers are done, their metrics are merged
+    into this process's registry. Items a crashed worker never finished
+    are reported as failed.
+    """
+    items = list(items)
+    groups = list(_group(items, key).values())
+    threads = max(1, math.ceil(max_concurrency / workers))
+    logger.info(
+        f"Running batch of {len(items)} item(s), {len(groups)} unique, "
+        f"{workers} worker process(es) x {threads} thread(s)"
+    )
+
+    # spawn: forking a process that already runs threads (logging, connection pools) is unsafe
+    context = multiprocessing.get_context("spawn")
+    tasks, results = context.Queue(), context.Queue()
+    for group, indexes in enumerate(groups):
+        tasks.put((group, items[indexes[0]]))
+    tasks.put(None)
+    processes = [
+        context.Process(target=_process_worker, args=(factory, tasks, results, threads), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    pending = set(range(len(groups)))
+    finished = 0
+    failure = "Worker process exited"
+    try:
+        while finished < len(processes):
+            try:
+                message = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if message[0] == "result":
+                _, group, output, error, elapsed = message
+                pending.discard(group)
+                for index in groups[group]:
+                    yield BatchResult(index, items[index], output, error, elapsed)
+            else:
+                finished += 1
+                if message[0] == "metrics":
+                    registry.merge(message[1])
+                else:
+                    failure = message[1]
+                    logger.error(f"Batch worker failed to start: {failure}")
+
+        for group in sorted(pending):
+            for index in groups[group]:
+                yield BatchResult(index, items[index], error=failure)
+    finally:
+        # Don't block interpreter exit on tasks no worker is left to take
+        tasks.cancel_join_thread()
+        for process in processes:
+            process.join(timeout=_POLL_INTERVAL)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,419 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from src.config import settings
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CacheBackend:
+    """
+    Minimal key/value cache interface with per-entry TTL.
+
+    Values must be JSON-serializable so that every backend can store them.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at) for a live entry, or None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class MemoryCache(CacheBackend):
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, expires_at
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Persist compact models (e.g. src.forecast.Forecast) as their payload dicts"""
+    if hasattr(value, "to_payload"):
+        return value.to_payload()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Persistent cache stored in a local SQLite file.
+
+    Entries survive restarts; expired rows are ignored on read and pruned
+    together with the least recently written rows once max_entries is exceeded.
+    The file is opened in WAL mode, so several worker processes can share it:
+    readers never block on a writer, and writers wait up to BUSY_TIMEOUT
+    seconds for each other instead of failing.
+    """
+
+    PRUNE_EVERY = 100
+    BUSY_TIMEOUT = 5.0
+
+    def __init__(self, path: str, max_entries: int = 100_000, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.clock = clock
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Durable across process crashes; only an OS crash can lose the last writes, which a cache can afford
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, written_at REAL NOT NULL)"
+            )
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= self.clock():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = self.clock()
+        payload = json.dumps(value, separators=(",", ":"), default=_to_jsonable)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key NOT IN "
+            "(SELECT key FROM cache ORDER BY written_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache(CacheBackend):
+    """
+    In-memory LRU in front of a persistent backend.
+
+    Reads are served from memory when possible; misses fall through to the
+    persistent layer and are promoted back into memory.
+    """
+
+    def __init__(self, memory: MemoryCache, persistent: CacheBackend):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry
+        entry = self.persistent.get_entry(key)
+        if entry is not None:
+            value, expires_at = entry
+            self.memory.set(key, value, expires_at - self.memory.clock())
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.memory.set(key, value, ttl)
+        self.persistent.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        self.persistent.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.persistent.clear()
+
+    def close(self) -> None:
+        self.persistent.close()
+
+
+def format_coordinate(value: float) -> str:
+    """
+    Format a coordinate the way weather.gov does: at most 4 decimals, no trailing zeros
+    """
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def build_backend(max_entries: int, path: Optional[str]) -> CacheBackend:
+    """
+    Build a memory-only cache, or a memory + SQLite tiered cache when a path is given
+    """
+    memory = MemoryCache(max_entries=max_entries)
+    if not path:
+        return memory
+    logger.info(f"Using persistent cache at {path}")
+    return TieredCache(memory, SQLiteCache(path, max_entries=max_entries))
+
+
+class GridPointCache:
+    """
+    Cache for weather.gov /points metadata (grid office, X/Y and forecast URLs).
+
+    Grid assignments practically never change for a location, so entries are
+    kept for a long TTL. Keys use coordinates rounded to the 4-decimal
+    precision weather.gov itself works with.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @classmethod
+    def from_settings(cls) -> Optional["GridPointCache"]:
+        """Build the cache configured in settings, or None when it is disabled"""
+        if not settings.GRID_CACHE_ENABLED:
+            return None
+        backend = build_backend(
+            max_entries=settings.GRID_CACHE_MAX_ENTRIES,
+            path=settings.GRID_CACHE_PATH,
+        )
+        return cls(backend, ttl=settings.GRID_CACHE_TTL)
+
+    @staticmethod
+    def key(latitude: float, longitude: float) -> str:
+        return f"points:{format_coordinate(latitude)},{format_coordinate(longitude)}"
+
+    def get(self, latitude: float, longitude: float) -> Optional[dict]:
+        return self.backend.get(self.key(latitude, longitude))
+
+    def set(self, latitude: float, longitude: float, point_data: dict) -> None:
+        self.backend.set(self.key(latitude, longitude), point_data, self.ttl)
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+class CacheStats:
+    """
+    Thread-safe hit/miss counters for a cache
+    """
+
+    FIELDS = ("hits", "misses", "revalidations", "stores")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into a directive -> argument mapping
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """
+    Seconds a response stays fresh per RFC 9111, or None if it must not be stored.
+
+    max-age wins over Expires; the Age header is subtracted. A response
+    with validators but no explicit lifetime is stored with zero freshness
+    so it can still be revalidated cheaply.
+    """
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives:
+        return None
+    has_validators = bool(headers.get("etag") or headers.get("last-modified"))
+    if "no-cache" in directives:
+        return 0.0 if has_validators else None
+
+    lifetime: Optional[float] = None
+    max_age = directives.get("max-age")
+    if max_age is not None and max_age.isdigit():
+        lifetime = float(max_age)
+    else:
+        expires = _parse_http_date(headers.get("expires"))
+        if expires is not None:
+            date = _parse_http_date(headers.get("date")) or now
+            lifetime = expires - date
+
+    if lifetime is None:
+        return 0.0 if has_validators else None
+    age = headers.get("age")
+    if age and age.isdigit():
+        lifetime -= float(age)
+    return max(lifetime, 0.0)
+
+
+class ResponseCache:
+    """
+    HTTP-semantics aware cache for JSON GET responses.
+
+    Fresh entries are served without touching the network. Stale entries are
+    kept for stale_ttl seconds so they can be revalidated with
+    If-None-Match / If-Modified-Since; a 304 refreshes the entry in place.
+    """
+
+    def __init__(self, backend: CacheBackend, stale_ttl: float, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_settings(cls) -> Optional["ResponseCache"]:
+        """Build the cache configured in settings, or None when it is disabled"""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        backend = build_backend(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            path=settings.RESPONSE_CACHE_PATH,
+        )
+        return cls(backend, stale_ttl=settings.RESPONSE_CACHE_STALE_TTL)
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None, variant: Optional[str] = None) -> str:
+        """Cache key; variant separates bodies stored in a decoded form from raw JSON"""
+        key = f"http:{url}"
+        if params:
+            key += "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        if variant:
+            key += f"#{variant}"
+        return key
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry (fresh or stale), or None"""
+        return self.backend.get(key)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return entry["fresh_until"] > self.clock()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validators to send when revalidating a stale entry"""
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: str, body: Any, headers: Mapping[str, str]) -> None:
+        """Store a 200 response if its headers allow it"""
+        now = self.clock()
+        lifetime = freshness_lifetime(headers, now)
+        if lifetime is None:
+            return
+        entry = {
+            "body": body,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fresh_until": now + lifetime,
+        }
+        self.backend.set(key, entry, lifetime + self.stale_ttl)
+        self.stats.incr("stores")
+
+    def refresh(self, key: str, entry: Dict[str, Any], headers: Mapping[str, str]) -> Dict[str, Any]:
+        """Apply a 304 Not Modified response to a stale entry and return it"""
+        now = self.clock()
+        lifetime = freshness_lifetime(headers, now) or 0.0
+        entry = dict(entry)
+        entry["fresh_until"] = now + lifetime
+        entry["etag"] = headers.get("etag") or entry.get("etag")
+        entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+        self.backend.set(key, entry, lifetime + self.stale_ttl)
+        self.stats.incr("revalidations")
+        return entry
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,386 @@
+"""
+Record and replay of upstream HTTP traffic (weather.gov and the LLM endpoint).
+
+With CASSETTE_MODE=record, every response the API clients and the chat
+model receive is appended to the cassette at CASSETTE_PATH. With
+CASSETTE_MODE=replay, the same requests are answered from the cassette
+without touching the network, with the recorded timing multiplied by
+CASSETTE_TIME_SCALE (0 answers instantly), so production traffic shapes
+can be re-run offline and cache or concurrency changes measured against
+identical upstream behaviour. Timing is kept per chunk: recording passes
+each response through as it arrives, noting when its headers and every
+body chunk came, and replay sends the headers and chunks at those offsets,
+so streamed chat completions reach token streaming and the model pool's
+first-chunk hedging as they did live.
+
+Both modes work at the httpx transport level, below retries, caching and
+coalescing, so those behave in replay exactly as they would against the
+live services. A cassette is JSON lines (gzip-compressed when the path
+ends in .gz), one recorded exchange per line, keyed by a hash of the
+method, path and query, conditional-request headers and body. Request headers are
+not stored, so API keys never end up in a cassette. A request recorded
+several times is replayed in recorded order, repeating the last response
+once they run out; a request that was never recorded fails as a
+connection error. A response the app stopped reading part-way (the
+OpenAI client stops at the [DONE] event; a hedged LLM call may be
+cancelled) is recorded as far as it was read, and replay fails with a
+read error if the app reads past that point.
+"""
+
+import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import httpx
+
+from src.config import settings
+from src.exceptions import ConfigurationError
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+OFF, RECORD, REPLAY = "off", "record", "replay"
+
+# Response headers worth replaying; Date/Expires would be stale by then and are dropped
+_KEPT_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "retry-after")
+# Request headers that change the response and so are part of the key
+_KEYED_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Hash identifying equivalent requests. The host is left out so a cassette
+    recorded against one base URL replays under another (e.g. a local stand-in);
+    replayed bodies have the recorded host rewritten to match.
+    """
+    digest = hashlib.sha256()
+    digest.update(request.method.encode() + b" " + request.url.raw_path + b"\n")
+    for name in _KEYED_HEADERS:
+        value = request.headers.get(name)
+        if value is not None:
+            digest.update(f"{name}: {value}\n".encode())
+    digest.update(request.content)
+    return digest.hexdigest()[:32]
+
+
+def _open(path: str, mode: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """Recorded exchanges by request key; appends are thread-safe and written through"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._exchanges: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._replayed: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls(path)
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    cassette._exchanges[exchange["key"]].append(exchange)
+        logger.info(f"Loaded {len(cassette)} recorded exchange(s) from {path}")
+        return cassette
+
+    def __len__(self) -> int:
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def record(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        body: bytes,
+        elapsed: float,
+        first_byte: Optional[float] = None,
+        chunks: Sequence[Tuple[float, int]] = (),
+        partial: bool = False,
+    ) -> None:
+        """
+        Append an exchange. elapsed is when the body was complete and
+        first_byte when the headers arrived (both seconds after the request
+        was sent); chunks are the (arrival offset, length) of each body chunk,
+        and partial marks a body the app stopped reading before its end.
+        """
+        exchange: Dict[str, Any] = {
+            "key": request_key(request),
+            "method": request.method,
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "elapsed": round(elapsed, 4),
+            "first_byte": round(elapsed if first_byte is None else first_byte, 4),
+        }
+        if len(chunks) > 1:
+            exchange["chunks"] = [[round(offset, 4), length] for offset, length in chunks]
+        if partial:
+            exchange["partial"] = True
+        try:
+            exchange["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            exchange["body_b64"] = base64.b64encode(body).decode("ascii")
+        line = json.dumps(exchange, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._exchanges[exchange["key"]].append(exchange)
+            if self._file is None:
+                self._file = _open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def next_exchange(self, request: httpx.Request) -> Optional[Dict[str, Any]]:
+        """The recorded exchange to replay for request, or None if it was never recorded"""
+        key = request_key(request)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                return None
+            index = min(self._replayed[key], len(exchanges) - 1)
+            self._replayed[key] += 1
+            return exchanges[index]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _origin(url: httpx.URL) -> str:
+    return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+
+def _parts(request: httpx.Request, exchange: Dict[str, Any]) -> List[Tuple[float, bytes]]:
+    """The recorded body as (offset, chunk) pairs to send"""
+    if "body_b64" in exchange:
+        content = base64.b64decode(exchange["body_b64"])
+        rewritten = False
+    else:
+        body = exchange.get("body", "")
+        # Bodies link to the recorded host (e.g. /points -> forecast URLs); point them at the replayed one
+        recorded, replayed = _origin(httpx.URL(exchange["url"])), _origin(request.url)
+        rewritten = recorded != replayed and recorded in body
+        if rewritten:
+            body = body.replace(recorded, replayed)
+        content = body.encode("utf-8")
+    chunks = exchange.get("chunks")
+    if not chunks or rewritten:
+        # Rewriting moves the recorded chunk boundaries, so the body goes out whole
+        return [(exchange["elapsed"], content)]
+    parts, position = [], 0
+    for offset, length in chunks:
+        parts.append((offset, content[position:position + length]))
+        position += length
+    return parts
+
+
+class _ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Yields recorded chunks at their recorded offsets (times time_scale) from started"""
+
+    def __init__(self, request: httpx.Request, exchange: Dict[str, Any], started: float, time_scale: float):
+        self.request = request
+        self.parts = _parts(request, exchange)
+        self.partial = exchange.get("partial", False)
+        self.started = started
+        self.time_scale = time_scale
+
+    def _cut_short(self) -> httpx.ReadError:
+        return httpx.ReadError("The recorded response ends here; the app stopped reading it while recording", request=self.request)
+
+    def _delay(self, offset: float) -> float:
+        return self.started + offset * self.time_scale - time.monotonic()
+
+    def __iter__(self) -> Iterator[bytes]:
+        for offset, chunk in self.parts:
+            delay = self._delay(offset)
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+        if self.partial:
+            raise self._cut_short()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for offset, chunk in self.parts:
+            delay = self._delay(offset)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
+        if self.partial:
+            raise self._cut_short()
+
+
+class _RecordingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Passes a response body through as it arrives and records it, with its timing, once complete"""
+
+    def __init__(self, cassette: Cassette, request: httpx.Request, response: httpx.Response, started: float):
+        self.cassette = cassette
+        self.request = request
+        self.response = response
+        self.started = started
+        self.first_byte = time.monotonic() - started
+        self._chunks: List[Tuple[float, bytes]] = []
+        self._recorded = False
+
+    def _add(self, chunk: bytes) -> bytes:
+        self._chunks.append((time.monotonic() - self.started, chunk))
+        return chunk
+
+    def _record(self, partial: bool = False) -> None:
+        if self._recorded:
+            return
+        self._recorded = True
+        body = b"".join(chunk for _, chunk in self._chunks)
+        elapsed = self._chunks[-1][0] if self._chunks else self.first_byte
+        timing = [(offset, len(chunk)) for offset, chunk in self._chunks]
+        self.cassette.record(self.request, self.response, body, elapsed, self.first_byte, timing, partial)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.response.iter_bytes():
+            yield self._add(chunk)
+        self._record()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.response.aiter_bytes():
+            yield self._add(chunk)
+        self._record()
+
+    def close(self) -> None:
+        # Closed before the end of the body: keep what the app read
+        self._record(partial=True)
+        self.response.close()
+
+    async def aclose(self) -> None:
+        self._record(partial=True)
+        await self.response.aclose()
+
+
+def _passed_through(request: httpx.Request, response: httpx.Response, stream: _RecordingStream) -> httpx.Response:
+    """Copy of response whose decoded body is read through stream"""
+    headers = [
+        (name, value) for name, value in response.headers.multi_items()
+        if name not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+    return httpx.Response(response.status_code, headers=headers, stream=stream, request=request)
+
+
+def _miss(request: httpx.Request) -> httpx.ConnectError:
+    return httpx.ConnectError(f"No recorded response for {request.method} {request.url}", request=request)
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Sends requests through inner and appends each response to the cassette as it is read"""
+
+    def __init__(self, cassette: Cassette, inner: Any):
+        self.cassette = cassette
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = self.inner.handle_request(request)
+        return _passed_through(request, response, _RecordingStream(self.cassette, request, response, started))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        return _passed_through(request, response, _RecordingStream(self.cassette, request, response, started))
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Answers requests from the cassette with the recorded timing times time_scale"""
+
+    def __init__(self, cassette: Cassette, time_scale: float = 1.0):
+        self.cassette = cassette
+        self.time_scale = time_scale
+
+    def _response(self, request: httpx.Request, exchange: Dict[str, Any], started: float) -> httpx.Response:
+        stream = _ReplayStream(request, exchange, started, self.time_scale)
+        return httpx.Response(exchange["status"], headers=exchange["headers"], stream=stream, request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        exchange = self.cassette.next_exchange(request)
+        if exchange is None:
+            raise _miss(request)
+        if self.time_scale > 0:
+            time.sleep(exchange.get("first_byte", exchange["elapsed"]) * self.time_scale)
+        return self._response(request, exchange, started)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        exchange = self.cassette.next_exchange(request)
+        if exchange is None:
+            raise _miss(request)
+        if self.time_scale > 0:
+            await asyncio.sleep(exchange.get("first_byte", exchange["elapsed"]) * self.time_scale)
+        return self._response(request, exchange, started)
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The process-wide cassette configured in settings, or None when CASSETTE_MODE is off"""
+    global _cassette
+    mode = settings.CASSETTE_MODE.lower()
+    if mode == OFF:
+        return None
+    if mode not in (RECORD, REPLAY):
+        raise ConfigurationError(f"CASSETTE_MODE must be off, record or replay, not {settings.CASSETTE_MODE!r}")
+    if not settings.CASSETTE_PATH:
+        raise ConfigurationError(f"CASSETTE_MODE={mode} needs CASSETTE_PATH")
+    if _cassette is None or _cassette.path != settings.CASSETTE_PATH:
+        with _cassette_lock:
+            if _cassette is None or _cassette.path != settings.CASSETTE_PATH:
+                if mode == REPLAY:
+                    _cassette = Cassette.load(settings.CASSETTE_PATH)
+                else:
+                    _cassette = Cassette(settings.CASSETTE_PATH)
+                    # A gzip cassette is only readable once its stream is closed
+                    atexit.register(_cassette.close)
+    return _cassette
+
+
+def transport(async_: bool = False, **transport_kwargs: Any) -> Optional[Any]:
+    """
+    httpx transport for the configured cassette mode, or None to use httpx's
+    default. transport_kwargs (http2, limits, ...) configure the real
+    transport used while recording.
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return None
+    if settings.CASSETTE_MODE.lower() == REPLAY:
+        return ReplayTransport(cassette, settings.CASSETTE_TIME_SCALE)
+    inner = httpx.AsyncHTTPTransport(**transport_kwargs) if async_ else httpx.HTTPTransport(**transport_kwargs)
+    return RecordingTransport(cassette, inner)
+
+
+def openai_http_clients() -> Dict[str, Any]:
+    """http_client/http_async_client arguments routing a ChatOpenAI through the cassette ({} when off)"""
+    sync_transport = transport()
+    if sync_transport is None:
+        return {}
+    return {
+        "http_client": httpx.Client(transport=sync_transport),
+        "http_async_client": httpx.AsyncClient(transport=transport(async_=True)),
+    }
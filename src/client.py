@@ -1,15 +1,86 @@
+import asyncio
+import threading
+import time
 import httpx
-from typing import Any, Dict, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from typing import Any, Callable, Dict, Optional, Tuple
+from tenacity import retry, stop_after_attempt, retry_if_exception_type
 
+from src.cache import ResponseCache
+from src.cassette import transport as cassette_transport
 from src.config import settings
 from src.logger import setup_logger
-from src.exceptions import APIError, APIConnectionError, APITimeoutError
+from src.metrics import record_retry_sleep, span
+from src.resilience import (
+    CIRCUIT_REJECTED, RATE_LIMITED, THROTTLE_WAIT_SECONDS, breaker_for, build_retry_wait, limiter_for, parse_retry_after,
+)
+from src.singleflight import AsyncSingleFlight, SingleFlight
+from src.exceptions import (
+    APIError, APIConnectionError, APIRateLimitError, APITimeoutError, CircuitOpenError, ConfigurationError,
+    RateLimitExceededError,
+)
 
 logger = setup_logger(__name__)
 
-class ApiClient:
-    def __init__(self, base_url: str = settings.API_BASE_URL, api_key: Optional[str] = settings.API_KEY):
+# Shared retry policy so the sync and async clients behave identically:
+# jittered exponential backoff, or the server's Retry-After on 429/503
+RETRY_POLICY = dict(
+    stop=stop_after_attempt(settings.RETRY_MAX_ATTEMPTS),
+    wait=build_retry_wait(),
+    retry=retry_if_exception_type((httpx.ConnectError, httpx.TimeoutException, APIConnectionError, APIRateLimitError)),
+    before_sleep=record_retry_sleep,
+    reraise=True,
+)
+
+# Responses that mean the API is shedding load rather than rejecting the request
+LOAD_SHEDDING_STATUSES = (429, 503)
+
+# Turns a response body into the value returned (and cached) by get()
+Decoder = Callable[[bytes], Any]
+
+# Sentinel: build the response cache from settings unless one (or None) is passed
+_CACHE_FROM_SETTINGS: Any = object()
+
+
+def build_limits() -> httpx.Limits:
+    """
+    Build connection pool limits from settings
+    """
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def check_http2_support(http2: bool) -> None:
+    """
+    Fail early with a clear message when HTTP/2 is requested without the h2 package
+    """
+    if not http2:
+        return
+    try:
+        import h2  # noqa: F401
+    except ImportError as e:
+        raise ConfigurationError(
+            "HTTP2_ENABLED is set but the 'h2' package is not installed. "
+            "Install it with: pip install 'httpx[http2]'"
+        ) from e
+
+
+class BaseApiClient:
+    """
+    Configuration and response handling shared by the sync and async clients
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.API_BASE_URL,
+        api_key: Optional[str] = settings.API_KEY,
+        timeout: Optional[float] = None,
+        limits: Optional[httpx.Limits] = None,
+        http2: Optional[bool] = None,
+        response_cache: Optional[ResponseCache] = _CACHE_FROM_SETTINGS,
+    ):
         self.base_url = base_url
         self.api_key = api_key
         self.headers = {
@@ -18,43 +89,162 @@ class ApiClient:
         }
         if self.api_key:
              self.headers["Authorization"] = f"Bearer {self.api_key}"
-        self.timeout = settings.API_TIMEOUT
+        self.timeout = timeout if timeout is not None else settings.API_TIMEOUT
+        self.limits = limits or build_limits()
+        self.http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        if response_cache is _CACHE_FROM_SETTINGS:
+            response_cache = ResponseCache.from_settings()
+        self.response_cache = response_cache
+        # Shared with every other client of the same host
+        self.host = httpx.URL(base_url).host
+        self.rate_limiter = limiter_for(self.host)
+        self.circuit_breaker = breaker_for(self.host)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((httpx.ConnectError, httpx.TimeoutException, APIConnectionError))
-    )
-    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def cache_stats(self) -> Dict[str, int]:
         """
-        Perform a GET request with retries
+        Hit/miss/revalidation counters of the response cache (empty if disabled)
         """
-        url =f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.info(f"Making GET request to {url}")
-        
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url, headers=self.headers, params=params)
-                self._handle_response(response)
-                return response.json()
-        except httpx.ConnectError as e:
-            logger.error(f"Connection error: {e}")
-            raise APIConnectionError(f"Failed to connect to {url}") from e
-        except httpx.TimeoutException as e:
-            logger.error(f"Timeout error: {e}")
-            raise APITimeoutError(f"Request to {url} timed out") from e
-        except httpx.HTTPStatusError as e:
-             # Caught by _handle_response usually, but good fallback
-            logger.error(f"HTTP error: {e}")
-            raise APIError(f"HTTP error occurred: {e}", status_code=e.response.status_code) from e
-        except Exception as e:
-            logger.exception(f"Unexpected error during GET request: {e}")
-            raise APIError(f"Unexpected error: {str(e)}") from e
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.stats.snapshot()
+
+    def cached_fresh_until(
+        self, endpoint: str, params: Optional[Dict[str, Any]] = None, decode: Optional[Decoder] = None
+    ) -> Optional[float]:
+        """
+        Timestamp until which the cached response for an endpoint is fresh, if cached
+        """
+        _, entry = self._cache_lookup(self._build_url(endpoint), params, decode)
+        return entry["fresh_until"] if entry is not None else None
+
+    def upstream_status(self) -> Dict[str, Any]:
+        """
+        Circuit breaker state for this client's API host
+        """
+        if self.circuit_breaker is None:
+            return {"host": self.host, "circuit": "disabled"}
+        return {
+            "host": self.host,
+            "circuit": self.circuit_breaker.state,
+            "consecutive_failures": self.circuit_breaker.failures,
+        }
+
+    def _build_url(self, endpoint: str) -> str:
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    @staticmethod
+    def _request_key(url: str, params: Optional[Dict[str, Any]], decode: Optional[Decoder]) -> str:
+        if decode is None:
+            return ResponseCache.key(url, params)
+        # Inherited classmethods share a __qualname__, so name the bound class too
+        owner = getattr(decode, "__self__", None)
+        variant = f"{owner.__qualname__}.{decode.__name__}" if isinstance(owner, type) else decode.__qualname__
+        return ResponseCache.key(url, params, variant=variant)
+
+    def _cache_lookup(
+        self, url: str, params: Optional[Dict[str, Any]], decode: Optional[Decoder] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Return the response cache key and any stored entry (fresh or stale)
+        """
+        if self.response_cache is None:
+            return None, None
+        key = self._request_key(url, params, decode)
+        return key, self.response_cache.lookup(key)
+
+    def _fresh_body(self, entry: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """
+        Return the cached body if the entry can be served without a request
+        """
+        if entry is None:
+            if self.response_cache is not None:
+                self.response_cache.stats.incr("misses")
+            return None
+        if self.response_cache.is_fresh(entry):
+            self.response_cache.stats.incr("hits")
+            return entry["body"]
+        return None
+
+    def _circuit_fallback(self, url: str, entry: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """
+        While the circuit is open, return a stale cached body to serve instead
+        of calling the API, or raise CircuitOpenError. Returns None when the
+        request may go ahead.
+        """
+        if self.circuit_breaker is None or self.circuit_breaker.allow():
+            return None
+        if entry is not None and settings.CIRCUIT_SERVE_STALE:
+            CIRCUIT_REJECTED.inc(host=self.host, outcome="stale")
+            logger.warning(f"Circuit open for {self.host}; serving stale response for {url}")
+            return entry["body"]
+        CIRCUIT_REJECTED.inc(host=self.host, outcome="error")
+        raise CircuitOpenError(f"{self.host} is failing; not sending request to {url}")
+
+    def _throttle_delay(self, url: str) -> float:
+        """
+        Seconds to wait for the host's rate limiter; raises RateLimitExceededError
+        instead of waiting longer than RATE_LIMIT_MAX_WAIT
+        """
+        wait = self.rate_limiter.reserve(settings.RATE_LIMIT_MAX_WAIT)
+        if wait is None:
+            raise RateLimitExceededError(f"Rate limit for {self.host} exceeded; not sending request to {url}")
+        if wait > 0:
+            THROTTLE_WAIT_SECONDS.inc(wait, host=self.host)
+        return wait
+
+    def _record_outcome(self, error: Optional[Exception] = None, status_code: Optional[int] = None) -> None:
+        """
+        Feed the circuit breaker: transport errors, load shedding and 5xx are
+        failures, anything else the API answered is a success
+        """
+        if self.circuit_breaker is None:
+            return
+        if error is not None or (status_code is not None and (status_code in LOAD_SHEDDING_STATUSES or status_code >= 500)):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _request_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if entry is None:
+            return self.headers
+        return {**self.headers, **ResponseCache.conditional_headers(entry)}
+
+    def _process_response(
+        self, response: httpx.Response, key: Optional[str], entry: Optional[Dict[str, Any]], decode: Optional[Decoder] = None
+    ) -> Any:
+        """
+        Decode a response (JSON unless decode is given), applying 304
+        revalidation and storing cacheable bodies
+        """
+        if response.status_code == 304 and entry is not None:
+            logger.debug("Revalidated cached response for %s", key)
+            return self.response_cache.refresh(key, entry, response.headers)["body"]
+        self._handle_response(response)
+        data = decode(response.content) if decode is not None else response.json()
+        if self.response_cache is not None:
+            if entry is not None:
+                # Stale entry that the server replaced with a full response
+                self.response_cache.stats.incr("misses")
+            self.response_cache.store(key, data, response.headers)
+        return data
 
     def _handle_response(self, response: httpx.Response) -> None:
         """
         Handle API response and raise exceptions for error status codes
         """
+        if response.status_code in LOAD_SHEDDING_STATUSES:
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            RATE_LIMITED.inc(host=self.host, status=response.status_code)
+            if retry_after:
+                # Hold back every request to this host, not just this caller's retry
+                self.rate_limiter.pause(min(retry_after, settings.RATE_LIMIT_MAX_WAIT))
+            logger.warning(f"API is shedding load ({response.status_code}), retry after {retry_after}s")
+            raise APIRateLimitError(
+                message=f"API Request failed: {response.status_code}",
+                status_code=response.status_code,
+                details={"response_text": response.text},
+                retry_after=retry_after,
+            )
         try:
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
@@ -64,3 +254,246 @@ class ApiClient:
                 status_code=response.status_code,
                 details={"response_text": response.text}
             ) from e
+
+    def _translate_error(self, url: str, e: Exception) -> APIError:
+        """
+        Map an exception raised while sending a request to the app's API exceptions
+        """
+        if isinstance(e, httpx.ConnectError):
+            logger.error(f"Connection error: {e}")
+            return APIConnectionError(f"Failed to connect to {url}")
+        if isinstance(e, httpx.TimeoutException):
+            logger.error(f"Timeout error: {e}")
+            return APITimeoutError(f"Request to {url} timed out")
+        if isinstance(e, httpx.HTTPStatusError):
+            # Caught by _handle_response usually, but good fallback
+            logger.error(f"HTTP error: {e}")
+            return APIError(f"HTTP error occurred: {e}", status_code=e.response.status_code)
+        logger.exception(f"Unexpected error during GET request: {e}")
+        return APIError(f"Unexpected error: {str(e)}")
+
+
+class ApiClient(BaseApiClient):
+    """
+    HTTP client for the weather API backed by a long-lived connection pool.
+
+    The underlying httpx.Client is created on first use and reused for every
+    request, so keep-alive connections survive between calls. Call close()
+    (or use the client as a context manager) to release the pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self._flights = SingleFlight() if settings.REQUEST_COALESCING_ENABLED else None
+
+    @property
+    def client(self) -> httpx.Client:
+        """
+        Return the pooled httpx.Client, creating it on first access
+        """
+        if self._client is None or self._client.is_closed:
+            with self._lock:
+                if self._client is None or self._client.is_closed:
+                    check_http2_support(self.http2)
+                    self._client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=self.limits,
+                        http2=self.http2,
+                        # weather.gov redirects non-canonical /points coordinates
+                        follow_redirects=True,
+                        # Records to or replays from a cassette when CASSETTE_MODE is set
+                        transport=cassette_transport(http2=self.http2, limits=self.limits),
+                    )
+                    logger.debug(f"Opened connection pool (http2={self.http2})")
+        return self._client
+
+    def close(self) -> None:
+        """
+        Close the connection pool. The client reopens it on next use.
+        """
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+                logger.debug("Closed connection pool")
+
+    def __enter__(self) -> "ApiClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @retry(**RETRY_POLICY)
+    def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        decode: Optional[Decoder] = None,
+        refresh: bool = False,
+    ) -> Any:
+        """
+        Perform a GET request with retries.
+
+        Concurrent identical requests (same URL and params) share one upstream call.
+        decode turns the body into the returned (and cached) value instead of
+        parsed JSON, e.g. Forecast.from_json to keep only what is rendered.
+        refresh revalidates a cached response even while it is still fresh.
+        """
+        url = self._build_url(endpoint)
+        key, entry = self._cache_lookup(url, params, decode)
+        cached = None if refresh else self._fresh_body(entry)
+        if cached is not None:
+            logger.debug("Serving cached response for %s", url)
+            return cached
+        stale = self._circuit_fallback(url, entry)
+        if stale is not None:
+            return stale
+
+        if self._flights is None:
+            return self._send(url, params, key, entry, decode)
+        return self._flights.do(
+            self._request_key(url, params, decode),
+            lambda: self._send(url, params, key, entry, decode),
+        )
+
+    def _send(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        key: Optional[str],
+        entry: Optional[Dict[str, Any]],
+        decode: Optional[Decoder] = None,
+    ) -> Any:
+        wait = self._throttle_delay(url)
+        if wait:
+            time.sleep(wait)
+        logger.info("Making GET request to %s", url)
+        client = self.client
+
+        try:
+            with span("http.attempt", url=url) as timing:
+                response = client.get(url, headers=self._request_headers(entry), params=params)
+                timing.set(status=response.status_code)
+        except Exception as e:
+            self._record_outcome(error=e)
+            raise self._translate_error(url, e) from e
+        self._record_outcome(status_code=response.status_code)
+        try:
+            return self._process_response(response, key, entry, decode)
+        except APIError:
+            raise
+        except Exception as e:
+            raise self._translate_error(url, e) from e
+
+
+class AsyncApiClient(BaseApiClient):
+    """
+    Asyncio counterpart of ApiClient built on httpx.AsyncClient.
+
+    Retries and exception mapping match ApiClient.get. The pool is bound to
+    the event loop that first uses it, so create one client per loop and
+    release it with aclose() (or ``async with``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._flights = AsyncSingleFlight() if settings.REQUEST_COALESCING_ENABLED else None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled httpx.AsyncClient, creating it on first access.
+
+        Creation never awaits, so no lock is needed within a single event loop.
+        """
+        if self._client is None or self._client.is_closed:
+            check_http2_support(self.http2)
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                follow_redirects=True,
+                transport=cassette_transport(async_=True, http2=self.http2, limits=self.limits),
+            )
+            logger.debug(f"Opened async connection pool (http2={self.http2})")
+        return self._client
+
+    async def aclose(self) -> None:
+        """
+        Close the connection pool. The client reopens it on next use.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.debug("Closed async connection pool")
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    @retry(**RETRY_POLICY)
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        decode: Optional[Decoder] = None,
+        refresh: bool = False,
+    ) -> Any:
+        """
+        Perform an async GET request with retries.
+
+        Concurrent identical requests (same URL and params) share one upstream call.
+        decode turns the body into the returned (and cached) value instead of
+        parsed JSON, e.g. Forecast.from_json to keep only what is rendered.
+        refresh revalidates a cached response even while it is still fresh.
+        """
+        url = self._build_url(endpoint)
+        key, entry = self._cache_lookup(url, params, decode)
+        cached = None if refresh else self._fresh_body(entry)
+        if cached is not None:
+            logger.debug("Serving cached response for %s", url)
+            return cached
+        stale = self._circuit_fallback(url, entry)
+        if stale is not None:
+            return stale
+
+        if self._flights is None:
+            return await self._send(url, params, key, entry, decode)
+        return await self._flights.do(
+            self._request_key(url, params, decode),
+            lambda: self._send(url, params, key, entry, decode),
+        )
+
+    async def _send(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        key: Optional[str],
+        entry: Optional[Dict[str, Any]],
+        decode: Optional[Decoder] = None,
+    ) -> Any:
+        wait = self._throttle_delay(url)
+        if wait:
+            await asyncio.sleep(wait)
+        logger.info("Making async GET request to %s", url)
+        client = self.client
+
+        try:
+            with span("http.attempt", url=url) as timing:
+                response = await client.get(url, headers=self._request_headers(entry), params=params)
+                timing.set(status=response.status_code)
+        except Exception as e:
+            self._record_outcome(error=e)
+            raise self._translate_error(url, e) from e
+        self._record_outcome(status_code=response.status_code)
+        try:
+            return self._process_response(response, key, entry, decode)
+        except APIError:
+            raise
+        except Exception as e:
+            raise self._translate_error(url, e) from e
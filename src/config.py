@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -12,8 +12,57 @@ class Settings(BaseSettings):
     API_BASE_URL: str = Field(..., description="Base URL for the API")
     API_KEY: Optional[str] = Field(None, description="API Key for authentication")
     API_TIMEOUT: int = Field(30, description="Default timeout in seconds")
+
+    # HTTP connection pool
+    HTTP_MAX_CONNECTIONS: int = Field(20, description="Maximum concurrent connections in the pool")
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(10, description="Maximum idle keep-alive connections kept open")
+    HTTP_KEEPALIVE_EXPIRY: float = Field(30.0, description="Seconds an idle keep-alive connection is kept")
+    HTTP2_ENABLED: bool = Field(False, description="Use HTTP/2 (requires the httpx[http2] extra)")
+    REQUEST_COALESCING_ENABLED: bool = Field(True, description="Share one upstream call between concurrent identical GETs")
+    
+    # weather.gov /points grid metadata cache
+    GRID_CACHE_ENABLED: bool = Field(True, description="Cache /points grid lookups")
+    GRID_CACHE_TTL: int = Field(7 * 24 * 3600, description="Seconds a cached grid lookup stays valid")
+    GRID_CACHE_MAX_ENTRIES: int = Field(1024, description="Maximum grid lookups kept in memory")
+    GRID_CACHE_PATH: Optional[str] = Field(None, description="SQLite file for a persistent grid cache (memory only if unset)")
+    
+    # HTTP response cache (honours Cache-Control/Expires and ETag revalidation)
+    RESPONSE_CACHE_ENABLED: bool = Field(True, description="Cache API responses per their HTTP caching headers")
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(512, description="Maximum responses kept in memory")
+    RESPONSE_CACHE_STALE_TTL: int = Field(24 * 3600, description="Seconds a stale response is kept for revalidation")
+    RESPONSE_CACHE_PATH: Optional[str] = Field(None, description="SQLite file for a persistent response cache (memory only if unset)")
+    
+    # Upstream protection: retries, per-host rate limit and circuit breaker
+    RETRY_MAX_ATTEMPTS: int = Field(3, description="Attempts per API call, including the first")
+    RETRY_BACKOFF_BASE: float = Field(0.5, description="Base of the jittered exponential backoff between attempts, in seconds")
+    RETRY_MAX_WAIT: float = Field(8.0, description="Longest wait before a retry, including Retry-After waits")
+    RATE_LIMIT_PER_SECOND: float = Field(0.0, description="Requests per second allowed per API host (0 disables the steady-state limit)")
+    RATE_LIMIT_BURST: int = Field(10, description="Requests allowed in a burst above the per-second rate")
+    RATE_LIMIT_MAX_WAIT: float = Field(10.0, description="Fail instead of waiting longer than this for the rate limiter")
+    CIRCUIT_BREAKER_ENABLED: bool = Field(True, description="Fail fast while the API is failing repeatedly")
+    CIRCUIT_FAILURE_THRESHOLD: int = Field(5, description="Consecutive failures that open the circuit")
+    CIRCUIT_RESET_TIMEOUT: float = Field(30.0, description="Seconds the circuit stays open before a probe request")
+    CIRCUIT_SERVE_STALE: bool = Field(True, description="Serve stale cached responses while the circuit is open")
+    
+    # Record/replay of weather.gov and LLM traffic
+    CASSETTE_MODE: str = Field("off", description="off, record (append upstream responses to CASSETTE_PATH) or replay (serve them offline)")
+    CASSETTE_PATH: Optional[str] = Field(None, description="Cassette file, JSON lines (.gz for gzip)")
+    CASSETTE_TIME_SCALE: float = Field(1.0, description="Replay delay as a multiple of the recorded response time (0 answers instantly)")
     
+    # Background refresh of the most requested forecasts (REPL and service mode)
+    PREFETCH_ENABLED: bool = Field(True, description="Revalidate hot forecasts before their cached copy expires")
+    PREFETCH_TOP_N: int = Field(20, description="Most requested forecast grid points kept warm")
+    PREFETCH_INTERVAL: float = Field(60.0, description="Seconds between prefetch passes (jittered by 20%)")
+    PREFETCH_LEAD_TIME: float = Field(120.0, description="Refresh forecasts that expire within this many seconds")
+    PREFETCH_BUDGET_PER_MINUTE: float = Field(30.0, description="Most background forecast requests per minute")
+    PREFETCH_DEMAND_HALF_LIFE: float = Field(3600.0, description="Seconds after which a past request counts half toward popularity")
+    
+    # Logging
     LOG_LEVEL: str = Field("INFO", description="Logging level")
+    LOG_FORMAT: str = Field("text", description="Log line format: text, or json for one object per line")
+    LOG_QUEUE_ENABLED: bool = Field(False, description="Hand records to a background writer thread instead of writing them inline")
+    LOG_QUEUE_SIZE: int = Field(10000, description="Records buffered for the writer thread; records beyond it are dropped")
+    LOG_SAMPLE_RATE: float = Field(1.0, description="Fraction of queries whose INFO/DEBUG lines are logged (warnings always are)")
     
     # OpenRouter LLM Configuration
     OPENROUTER_API_KEY: Optional[str] = Field(None, description="OpenRouter API Key")
@@ -22,6 +71,70 @@ class Settings(BaseSettings):
     LLM_TEMPERATURE: float = Field(0.0, description="LLM temperature for responses")
     LLM_MAX_TOKENS: int = Field(1000, description="Maximum tokens for LLM responses")
     
+    # LLM provider pool: hedged requests and fallback across models
+    LLM_FALLBACK_MODELS: List[str] = Field(default_factory=list, description="Further models as 'model' or 'model@base_url' (a JSON list); enables the pool")
+    LLM_HEDGE_ENABLED: bool = Field(True, description="Also send a call to the next model when the first is slower than its p95")
+    LLM_HEDGE_DELAY: float = Field(2.0, description="Seconds before hedging while a model has too few calls for its own p95")
+    LLM_FAILURE_THRESHOLD: int = Field(3, description="Consecutive failures after which a model is tried last")
+    LLM_COOLDOWN: float = Field(30.0, description="Seconds a failing model stays at the back of the pool")
+    
+    # Agent loop
+    AGENT_MAX_ITERATIONS: int = Field(3, description="LLM turns the agent may take before it must answer")
+    AGENT_TOOL_CONCURRENCY: int = Field(4, description="Tool calls from one LLM turn run concurrently (1 runs them in order)")
+    AGENT_DEADLINE: Optional[float] = Field(30.0, description="Seconds an agent run may take (0 or unset: no limit)")
+    AGENT_TOOL_TIMEOUT: Optional[float] = Field(15.0, description="Seconds one turn's tool calls may take; late calls are reported to the LLM as timed out")
+    
+    # Prompt and tool-output token budget
+    AGENT_PROMPT_COMPACT: bool = Field(True, description="Use the short system prompt (no embedded city coordinate table)")
+    TOOL_OUTPUT_COMPACT: bool = Field(True, description="Return tool results to the LLM in a dense one-line-per-entry form")
+    TOOL_OUTPUT_DETAIL_CHARS: int = Field(160, description="Longest free-text detail kept per entry in compact tool output (0 drops it)")
+    TOKEN_ENCODING: Optional[str] = Field(None, description="tiktoken encoding for token counts (estimated from text length if unset)")
+    
+    # Fast path for simple "weather in <city>" queries (skips the agent loop)
+    FAST_PATH_ENABLED: bool = Field(True, description="Answer simple known-location queries without the agent")
+    FAST_PATH_LLM_SUMMARY: bool = Field(False, description="Phrase fast-path answers with one LLM call instead of a template")
+    
+    # Cache of final agent answers
+    AGENT_CACHE_ENABLED: bool = Field(True, description="Reuse answers to equivalent recent questions")
+    AGENT_CACHE_TTL: int = Field(900, description="Maximum seconds an answer is reused")
+    AGENT_CACHE_PERIOD: int = Field(3600, description="Forecast period in seconds; answers are never reused across periods")
+    AGENT_CACHE_MAX_ENTRIES: int = Field(1024, description="Maximum answers kept in memory")
+    AGENT_CACHE_PATH: Optional[str] = Field(None, description="SQLite file for a persistent answer cache (memory only if unset)")
+    
+    # Multi-turn session memory (run/stream with a session_id)
+    SESSION_MEMORY_ENABLED: bool = Field(True, description="Keep per-session history, resolved locations and recent tool results")
+    SESSION_HISTORY_TOKENS: int = Field(1500, description="Token budget for a session's kept turns and tool results")
+    SESSION_SUMMARY_TOKENS: int = Field(200, description="Longest rolling summary of turns dropped from the history")
+    SESSION_SUMMARY_LLM: bool = Field(False, description="Summarize dropped turns with an LLM call instead of extractively")
+    SESSION_TOOL_RESULTS: int = Field(3, description="Most recent tool results kept per session")
+    SESSION_TOOL_RESULT_TTL: int = Field(900, description="Seconds a kept tool result is offered for reuse")
+    SESSION_IDLE_TTL: int = Field(1800, description="Seconds of inactivity after which a session is evicted")
+    SESSION_MAX_SESSIONS: int = Field(1000, description="Maximum sessions kept in memory (least recently used evicted)")
+    
+    # Offline place-name lookup
+    GAZETTEER_PATH: Optional[str] = Field(None, description="Gazetteer data file (the bundled US file if unset)")
+    GAZETTEER_MIN_POPULATION: int = Field(20000, description="Smallest place the fast path resolves from a name without a state")
+    
+    # Batch runs
+    BATCH_CONCURRENCY: int = Field(8, description="Default number of batch items processed concurrently")
+    
+    # Service mode (python -m src.main serve)
+    SERVER_HOST: str = Field("127.0.0.1", description="Interface the HTTP service binds to")
+    SERVER_PORT: int = Field(8000, description="Port the HTTP service listens on")
+    SERVER_MAX_CONCURRENCY: int = Field(64, description="Requests processed concurrently")
+    SERVER_QUEUE_DEPTH: int = Field(256, description="Requests allowed to wait for a slot before 503s")
+    SERVER_REQUEST_TIMEOUT: float = Field(60.0, description="Per-request timeout in seconds")
+    SERVER_SHUTDOWN_TIMEOUT: float = Field(30.0, description="Seconds to drain in-flight requests on shutdown")
+    
+    # Multi-process workers for batch and service mode
+    WORKERS: int = Field(1, description="Worker processes for batch and service mode (1 runs everything in this process)")
+    WORKER_STATE_DIR: Optional[str] = Field(None, description="Directory for the caches and metrics workers share (a temporary directory if unset)")
+    WORKER_METRICS_INTERVAL: float = Field(5.0, description="Seconds between a service worker's metrics snapshots")
+    
+    # Instrumentation
+    METRICS_ENABLED: bool = Field(False, description="Record stage timings, token counts and retry backoff as metrics")
+    TRACE_PATH: Optional[str] = Field(None, description="Append a JSON trace record per timed stage to this file (also enables timing)")
+    
     # App Config
     DEBUG: bool = Field(False, description="Enable debug mode")
 
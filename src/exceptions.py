@@ -20,3 +20,17 @@ class APIConnectionError(APIError):
 class APITimeoutError(APIError):
     """Raised when API request times out"""
     pass
+
+class APIRateLimitError(APIError):
+    """Raised when the API sheds load (429/503); retry_after is the server's requested delay in seconds"""
+    def __init__(self, message: str, status_code: int = None, details: dict = None, retry_after: float = None):
+        super().__init__(message, status_code=status_code, details=details)
+        self.retry_after = retry_after
+
+class CircuitOpenError(APIError):
+    """Raised without contacting the API while its circuit breaker is open"""
+    pass
+
+class RateLimitExceededError(APIError):
+    """Raised without contacting the API when its rate limiter would wait longer than RATE_LIMIT_MAX_WAIT; not retried"""
+    pass
@@ -0,0 +1,389 @@
+"""
+Compact models for weather.gov payloads.
+
+A forecast response is ~20-40KB of GeoJSON (grid polygon, 14 periods with
+dewpoint, humidity, icons...), and raw gridpoint data runs to hundreds of KB,
+yet the tools render a handful of fields from the first few entries. Each
+model's from_json decodes the body (with orjson when installed), keeps just
+those fields in __slots__ objects and drops the rest, so the response cache
+holds a few hundred bytes per entry instead of the full parsed document.
+
+to_payload() returns a trimmed dict in the original weather.gov shape, so
+from_payload() accepts either a full response or a persisted copy.
+"""
+
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Entries kept per decoded response
+FORECAST_PERIODS = 3
+HOURLY_PERIODS = 48
+GRIDPOINT_VALUES = 12
+MAX_ALERTS = 10
+
+# Raw gridpoint layers worth showing (the API returns ~60)
+GRIDPOINT_LAYERS = (
+    "temperature",
+    "probabilityOfPrecipitation",
+    "quantitativePrecipitation",
+    "skyCover",
+    "windSpeed",
+    "windGust",
+    "relativeHumidity",
+)
+
+
+def loads(raw: bytes) -> Any:
+    """Decode a JSON body, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def truncate(text: str, limit: int) -> str:
+    """Shorten text to at most limit characters, at a sentence or word boundary"""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    if limit <= 0:
+        return ""
+    cut = text[:limit]
+    sentence = cut.rfind(". ")
+    if sentence >= limit // 2:
+        return cut[:sentence + 1]
+    if " " not in cut:
+        return cut
+    return cut[:cut.rfind(" ")].rstrip(",;:") + "..."
+
+
+def _local_time(timestamp: str) -> str:
+    """'2026-10-18T15:00:00-05:00' -> '2026-10-18 15:00' (the point's local time)"""
+    return timestamp[:16].replace("T", " ")
+
+
+class Model:
+    """Base for the compact models: slot-wise equality and the decode entry points"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "Model":
+        raise NotImplementedError
+
+    def to_payload(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "Model":
+        """Decode a response body; used as the client's decode hook"""
+        return cls.from_payload(loads(raw))
+
+    @classmethod
+    def coerce(cls, value: Any) -> "Model":
+        """Accept a model or a payload dict (e.g. restored from a persistent cache)"""
+        if isinstance(value, cls):
+            return value
+        return cls.from_payload(value)
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+# 12-hour forecast
+
+
+class ForecastPeriod(Model):
+    """One forecast period, holding only the fields that are rendered"""
+
+    __slots__ = ("name", "temperature", "temperature_unit", "short_forecast", "detailed_forecast")
+
+    def __init__(self, name: str, temperature: Any, temperature_unit: str, short_forecast: str, detailed_forecast: str):
+        self.name = name
+        self.temperature = temperature
+        self.temperature_unit = temperature_unit
+        self.short_forecast = short_forecast
+        self.detailed_forecast = detailed_forecast
+
+    @classmethod
+    def from_payload(cls, period: Dict[str, Any]) -> "ForecastPeriod":
+        return cls(
+            # Period names and units repeat across every cached forecast
+            sys.intern(period["name"]),
+            period["temperature"],
+            sys.intern(period["temperatureUnit"]),
+            period["shortForecast"],
+            period["detailedForecast"],
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "temperature": self.temperature,
+            "temperatureUnit": self.temperature_unit,
+            "shortForecast": self.short_forecast,
+            "detailedForecast": self.detailed_forecast,
+        }
+
+
+class Forecast(Model):
+    """The first few periods of a forecast"""
+
+    __slots__ = ("periods",)
+
+    def __init__(self, periods: Tuple[ForecastPeriod, ...]):
+        self.periods = periods
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], limit: int = FORECAST_PERIODS) -> "Forecast":
+        """Build from a parsed weather.gov forecast (or a to_payload() copy of one)"""
+        periods = data.get("properties", {}).get("periods", [])[:limit]
+        return cls(tuple(ForecastPeriod.from_payload(period) for period in periods))
+
+    def to_payload(self) -> Dict[str, Any]:
+        """A weather.gov-shaped dict with only the kept fields, for JSON persistence"""
+        return {"properties": {"periods": [period.to_payload() for period in self.periods]}}
+
+    def render(self, city: str, state: str) -> str:
+        """Format the periods as text for the agent"""
+        if not self.periods:
+            return f"No forecast data available for {city}, {state}"
+        lines: List[str] = [f"Weather forecast for {city}, {state}:", ""]
+        for period in self.periods:
+            lines.append(f"**{period.name}**: {period.temperature}°{period.temperature_unit}")
+            lines.append(f"Conditions: {period.short_forecast}")
+            lines.append(f"Details: {period.detailed_forecast}")
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    def render_compact(self, city: str, state: str, detail_chars: int) -> str:
+        """One line per period, details cut to detail_chars, for LLM consumption"""
+        if not self.periods:
+            return f"No forecast data available for {city}, {state}"
+        lines = [f"Forecast for {city}, {state}:"]
+        for period in self.periods:
+            line = f"{period.name}: {period.temperature}°{period.temperature_unit}, {period.short_forecast}"
+            details = truncate(period.detailed_forecast, detail_chars)
+            lines.append(f"{line}. {details}" if details else line)
+        return "\n".join(lines)
+
+
+# Hourly forecast
+
+
+class HourlyPeriod(Model):
+    """One hour of the hourly forecast"""
+
+    __slots__ = ("start_time", "temperature", "temperature_unit", "precipitation", "wind_speed", "short_forecast")
+
+    def __init__(
+        self,
+        start_time: str,
+        temperature: Any,
+        temperature_unit: str,
+        precipitation: Optional[int],
+        wind_speed: str,
+        short_forecast: str,
+    ):
+        self.start_time = start_time
+        self.temperature = temperature
+        self.temperature_unit = temperature_unit
+        self.precipitation = precipitation
+        self.wind_speed = wind_speed
+        self.short_forecast = short_forecast
+
+    @classmethod
+    def from_payload(cls, period: Dict[str, Any]) -> "HourlyPeriod":
+        precipitation = period.get("probabilityOfPrecipitation") or {}
+        return cls(
+            period["startTime"],
+            period["temperature"],
+            sys.intern(period["temperatureUnit"]),
+            precipitation.get("value"),
+            sys.intern(period.get("windSpeed") or ""),
+            sys.intern(period.get("shortForecast") or ""),
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "startTime": self.start_time,
+            "temperature": self.temperature,
+            "temperatureUnit": self.temperature_unit,
+            "probabilityOfPrecipitation": {"value": self.precipitation},
+            "windSpeed": self.wind_speed,
+            "shortForecast": self.short_forecast,
+        }
+
+    def render(self) -> str:
+        parts = [f"{self.temperature}°{self.temperature_unit}", self.short_forecast]
+        if self.precipitation is not None:
+            parts.append(f"{self.precipitation}% chance of precipitation")
+        if self.wind_speed:
+            parts.append(f"wind {self.wind_speed}")
+        return f"- {_local_time(self.start_time)}: " + ", ".join(parts)
+
+
+class HourlyForecast(Model):
+    """The next hours of an hourly forecast"""
+
+    __slots__ = ("periods",)
+
+    def __init__(self, periods: Tuple[HourlyPeriod, ...]):
+        self.periods = periods
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], limit: int = HOURLY_PERIODS) -> "HourlyForecast":
+        periods = data.get("properties", {}).get("periods", [])[:limit]
+        return cls(tuple(HourlyPeriod.from_payload(period) for period in periods))
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"properties": {"periods": [period.to_payload() for period in self.periods]}}
+
+    def render(self, city: str, state: str, hours: int = 12) -> str:
+        if not self.periods:
+            return f"No hourly forecast available for {city}, {state}"
+        lines = [f"Hourly forecast for {city}, {state} (local time):"]
+        lines.extend(period.render() for period in self.periods[:hours])
+        return "\n".join(lines)
+
+
+# Raw gridpoint data
+
+
+class GridLayer(Model):
+    """One quantity from the raw gridpoint data: unit and (valid time, value) pairs"""
+
+    __slots__ = ("name", "unit", "values")
+
+    def __init__(self, name: str, unit: str, values: Tuple[Tuple[str, Any], ...]):
+        self.name = name
+        self.unit = unit
+        self.values = values
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], name: str = "", limit: int = GRIDPOINT_VALUES) -> "GridLayer":
+        unit = (data.get("uom") or "").rpartition(":")[2]
+        values = tuple((value["validTime"], value["value"]) for value in data.get("values", [])[:limit])
+        return cls(name, sys.intern(unit), values)
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "uom": f"wmoUnit:{self.unit}",
+            "values": [{"validTime": valid_time, "value": value} for valid_time, value in self.values],
+        }
+
+    def render(self) -> str:
+        # validTime is "<UTC start>/<ISO duration>", e.g. "2026-10-18T12:00:00+00:00/PT2H"
+        readings = ", ".join(
+            f"{valid_time[5:16].replace('T', ' ')} {value if value is not None else '-'}"
+            for valid_time, value in self.values
+        )
+        unit = f" ({self.unit})" if self.unit else ""
+        return f"- {self.name}{unit}: {readings}"
+
+
+class GridpointData(Model):
+    """Selected layers of a forecastGridData response"""
+
+    __slots__ = ("layers",)
+
+    def __init__(self, layers: Tuple[GridLayer, ...]):
+        self.layers = layers
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "GridpointData":
+        properties = data.get("properties", {})
+        return cls(tuple(
+            GridLayer.from_payload(properties[name], name=name)
+            for name in GRIDPOINT_LAYERS if isinstance(properties.get(name), dict)
+        ))
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"properties": {layer.name: layer.to_payload() for layer in self.layers}}
+
+    def render(self, city: str, state: str) -> str:
+        if not self.layers:
+            return f"No gridpoint data available for {city}, {state}"
+        lines = [f"Gridpoint data for {city}, {state} (times UTC, value from that time on):"]
+        lines.extend(layer.render() for layer in self.layers)
+        return "\n".join(lines)
+
+
+# Active alerts
+
+
+class Alert(Model):
+    """One active alert"""
+
+    __slots__ = ("event", "severity", "headline", "ends", "instruction")
+
+    def __init__(self, event: str, severity: str, headline: str, ends: Optional[str], instruction: Optional[str]):
+        self.event = event
+        self.severity = severity
+        self.headline = headline
+        self.ends = ends
+        self.instruction = instruction
+
+    @classmethod
+    def from_payload(cls, feature: Dict[str, Any]) -> "Alert":
+        properties = feature.get("properties", {})
+        return cls(
+            properties.get("event") or "Alert",
+            sys.intern(properties.get("severity") or "Unknown"),
+            properties.get("headline") or "",
+            properties.get("ends") or properties.get("expires"),
+            properties.get("instruction"),
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"properties": {
+            "event": self.event,
+            "severity": self.severity,
+            "headline": self.headline,
+            "ends": self.ends,
+            "instruction": self.instruction,
+        }}
+
+    def render(self, detail_chars: Optional[int] = None) -> str:
+        until = f" until {_local_time(self.ends)}" if self.ends else ""
+        line = f"- **{self.event}** ({self.severity}){until}: {self.headline}"
+        if self.instruction:
+            instruction = " ".join(self.instruction.split()) if detail_chars is None else truncate(self.instruction, detail_chars)
+            if instruction:
+                line += f"\n  Instructions: {instruction}"
+        return line
+
+
+class Alerts(Model):
+    """Active alerts for an area, most severe first as returned by the API"""
+
+    __slots__ = ("alerts",)
+
+    def __init__(self, alerts: Tuple[Alert, ...]):
+        self.alerts = alerts
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], limit: int = MAX_ALERTS) -> "Alerts":
+        return cls(tuple(Alert.from_payload(feature) for feature in data.get("features", [])[:limit]))
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"features": [alert.to_payload() for alert in self.alerts]}
+
+    def render(self, city: str, state: str, detail_chars: Optional[int] = None) -> str:
+        """Format the alerts; detail_chars shortens instructions (compact tool output)"""
+        if not self.alerts:
+            return f"No active weather alerts for {city}, {state}."
+        lines = [f"Active weather alerts for {city}, {state}:"]
+        lines.extend(alert.render(detail_chars) for alert in self.alerts)
+        return "\n".join(lines)
@@ -0,0 +1,324 @@
+"""
+Offline US gazetteer: place name <-> coordinates without an LLM or network call.
+
+The bundled data file (src/data/us_places.gaz, built by
+scripts/build_gazetteer.py from GeoNames) is memory-mapped on first use and
+never parsed as a whole, so importing this module or creating a Gazetteer
+costs nothing. Layout, little-endian:
+
+    header   magic "USGZ", version u16, state count u16, record count u32,
+             names offset u32, k-d offset u32
+    states   2-byte state codes
+    records  20 bytes each, sorted by normalized name then population desc:
+             lat*1e5 i32, lon*1e5 i32, population u32, names-blob offset u32,
+             state index u8, key length u8, display-name length u8, pad
+    names    per record: normalized key bytes then display name (UTF-8)
+    k-d      record ids (u32) laid out as an implicit 2-d tree: the median
+             of each [lo, hi) range sits at (lo + hi) // 2, splitting on
+             latitude at even depths and longitude at odd depths
+
+Name lookups are binary searches over the sorted records; reverse lookups
+walk the k-d tree.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from src.config import settings
+
+MAGIC = b"USGZ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+RECORD = struct.Struct("<iiIIBBBx")
+KD_ENTRY = struct.Struct("<I")
+COORD_SCALE = 100_000
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "us_places.gaz")
+
+US_STATES = {
+    "AL": "alabama", "AK": "alaska", "AZ": "arizona", "AR": "arkansas", "CA": "california",
+    "CO": "colorado", "CT": "connecticut", "DE": "delaware", "DC": "district of columbia",
+    "FL": "florida", "GA": "georgia", "HI": "hawaii", "ID": "idaho", "IL": "illinois",
+    "IN": "indiana", "IA": "iowa", "KS": "kansas", "KY": "kentucky", "LA": "louisiana",
+    "ME": "maine", "MD": "maryland", "MA": "massachusetts", "MI": "michigan", "MN": "minnesota",
+    "MS": "mississippi", "MO": "missouri", "MT": "montana", "NE": "nebraska", "NV": "nevada",
+    "NH": "new hampshire", "NJ": "new jersey", "NM": "new mexico", "NY": "new york",
+    "NC": "north carolina", "ND": "north dakota", "OH": "ohio", "OK": "oklahoma", "OR": "oregon",
+    "PA": "pennsylvania", "RI": "rhode island", "SC": "south carolina", "SD": "south dakota",
+    "TN": "tennessee", "TX": "texas", "UT": "utah", "VT": "vermont", "VA": "virginia",
+    "WA": "washington", "WV": "west virginia", "WI": "wisconsin", "WY": "wyoming",
+}
+_STATE_BY_NAME = {name: code for code, name in US_STATES.items()}
+
+# Abbreviations folded so "Saint Paul", "St. Paul" and "st paul" share a key
+_ABBREVIATIONS = {"saint": "st", "sainte": "ste", "mount": "mt", "fort": "ft"}
+
+
+class Place(NamedTuple):
+    """A gazetteer entry"""
+    name: str
+    state: str
+    latitude: float
+    longitude: float
+    population: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}, {self.state}"
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key: ASCII-folded, lowercase, punctuation-free, common abbreviations folded"""
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = re.sub(r"[^a-z0-9 ]+", " ", folded.lower().replace(".", "").replace("'", "")).split()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def split_state(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Split "Portland, OR", "Portland OR" or "Portland, Oregon" into a name
+    and a state code (None when no state is given)
+    """
+    if "," in text:
+        name, _, suffix = text.rpartition(",")
+        code = _state_code(suffix)
+        if code is not None:
+            return name.strip(), code
+        return text.strip(), None
+    parts = text.strip().rsplit(" ", 1)
+    if len(parts) == 2 and len(parts[1]) == 2:
+        code = _state_code(parts[1])
+        if code is not None:
+            return parts[0].strip(), code
+    return text.strip(), None
+
+
+def _state_code(text: str) -> Optional[str]:
+    text = text.strip().rstrip(".")
+    if text.upper() in US_STATES:
+        return text.upper()
+    return _STATE_BY_NAME.get(text.lower())
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance (haversine)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    """Read-only view of a gazetteer file, memory-mapped on first use"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._data: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> mmap.mmap:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    with open(self.path, "rb") as f:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    magic, version, state_count, count, names_offset, kd_offset = HEADER.unpack_from(data, 0)
+                    if magic != MAGIC or version != VERSION:
+                        data.close()
+                        raise ValueError(f"{self.path} is not a version {VERSION} gazetteer file")
+                    states_offset = HEADER.size
+                    self._states = [
+                        data[states_offset + 2 * i:states_offset + 2 * i + 2].decode() for i in range(state_count)
+                    ]
+                    self._count = count
+                    self._records_offset = states_offset + 2 * state_count
+                    self._names_offset = names_offset
+                    self._kd_offset = kd_offset
+                    self._data = data
+        return self._data
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+                self._data = None
+
+    # Record access
+
+    def _record(self, index: int) -> Tuple[int, int, int, int, int, int, int]:
+        return RECORD.unpack_from(self._data, self._records_offset + index * RECORD.size)
+
+    def _key(self, index: int) -> str:
+        _, _, _, offset, _, key_len, _ = self._record(index)
+        start = self._names_offset + offset
+        return self._data[start:start + key_len].decode()
+
+    def _coordinates(self, index: int) -> Tuple[float, float]:
+        lat, lon = struct.unpack_from("<ii", self._data, self._records_offset + index * RECORD.size)
+        return lat / COORD_SCALE, lon / COORD_SCALE
+
+    def _place(self, index: int) -> Place:
+        lat, lon, population, offset, state, key_len, name_len = self._record(index)
+        start = self._names_offset + offset + key_len
+        name = self._data[start:start + name_len].decode()
+        return Place(name, self._states[state], lat / COORD_SCALE, lon / COORD_SCALE, population)
+
+    def _lower_bound(self, key: str) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix: str, limit: int) -> Iterator[int]:
+        """Indexes of records whose key starts with prefix, at most limit of them"""
+        index = self._lower_bound(prefix)
+        end = min(self._count, index + limit)
+        while index < end and self._key(index).startswith(prefix):
+            yield index
+            index += 1
+
+    # Name lookups
+
+    def lookup(self, name: str, state: Optional[str] = None) -> List[Place]:
+        """Places whose name matches exactly (after normalization), most populous first"""
+        self._open()
+        key = normalize_name(name)
+        if not key:
+            return []
+        places = []
+        index = self._lower_bound(key)
+        while index < self._count and self._key(index) == key:
+            place = self._place(index)
+            if state is None or place.state == state:
+                places.append(place)
+            index += 1
+        return places
+
+    def search(self, prefix: str, limit: int = 5, state: Optional[str] = None) -> List[Place]:
+        """Places whose name starts with prefix, most populous first"""
+        self._open()
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        places = (self._place(i) for i in self._prefix_range(key, limit=5000))
+        if state is not None:
+            places = (p for p in places if p.state == state)
+        return heapq.nlargest(limit, places, key=lambda p: p.population)
+
+    def fuzzy(self, name: str, limit: int = 5, cutoff: float = 0.8, state: Optional[str] = None) -> List[Place]:
+        """
+        Places whose name is close to name (typos, missing letters). Candidates
+        share the query's first letter; ties go to the larger place.
+        """
+        import difflib
+
+        self._open()
+        key = normalize_name(name)
+        if not key:
+            return []
+        scored = []
+        matcher = difflib.SequenceMatcher(b=key)
+        for index in self._prefix_range(key[0], limit=self._count):
+            candidate = self._key(index)
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                place = self._place(index)
+                if state is None or place.state == state:
+                    scored.append((score, place.population, place))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [place for _, _, place in scored[:limit]]
+
+    def geocode(self, text: str, limit: int = 5) -> List[Place]:
+        """
+        Best matches for free text such as "Portland, OR" or "Spokan":
+        exact name, then name prefix, then fuzzy matches
+        """
+        name, state = split_state(text)
+        for strategy in (
+            lambda: self.lookup(name, state)[:limit],
+            lambda: self.search(name, limit, state),
+            lambda: self.fuzzy(name, limit, state=state),
+        ):
+            places = strategy()
+            if places:
+                return places
+        return []
+
+    def resolve(self, text: str, min_population: int = 0) -> Optional[Place]:
+        """
+        The single place text unambiguously names, or None.
+
+        With a state ("Portland, OR") the most populous exact match wins.
+        Without one, the name must match exactly one place with at least
+        min_population people ("Portland" alone is ambiguous).
+        """
+        name, state = split_state(text)
+        places = self.lookup(name, state)
+        if not places:
+            return None
+        if state is not None:
+            return places[0]
+        if len(places) == 1 and places[0].population >= min_population:
+            return places[0]
+        return None
+
+    # Reverse lookup
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[Place, float]]:
+        """The k places closest to a point, with distances in km, closest first"""
+        self._open()
+        scale = math.cos(math.radians(latitude))
+        best: List[Tuple[float, int]] = []  # max-heap of (-squared distance, record index)
+
+        def visit(lo: int, hi: int, depth: int) -> None:
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            index = KD_ENTRY.unpack_from(self._data, self._kd_offset + mid * KD_ENTRY.size)[0]
+            lat, lon = self._coordinates(index)
+            d2 = (lat - latitude) ** 2 + ((lon - longitude) * scale) ** 2
+            if len(best) < k:
+                heapq.heappush(best, (-d2, index))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, index))
+
+            diff = (latitude - lat) if depth % 2 == 0 else (longitude - lon) * scale
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(near[0], near[1], depth + 1)
+            if len(best) < k or diff * diff < -best[0][0]:
+                visit(far[0], far[1], depth + 1)
+
+        visit(0, self._count, 0)
+        results = []
+        for _, index in sorted(best, reverse=True):
+            place = self._place(index)
+            results.append((place, distance_km(latitude, longitude, place.latitude, place.longitude)))
+        return results
+
+
+_default: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer (GAZETTEER_PATH or the bundled file); opens nothing until used"""
+    global _default
+    if _default is None:
+        _default = Gazetteer(settings.GAZETTEER_PATH or DEFAULT_PATH)
+    return _default
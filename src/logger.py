@@ -1,39 +1,181 @@
+"""
+Logging setup shared by every module.
+
+All loggers write through one handler. By default it formats and writes
+each record to stdout in the calling thread. With LOG_QUEUE_ENABLED the
+calling thread only puts the record on a bounded queue and a QueueListener
+thread formats and writes it, so a slow terminal or log collector never
+holds up a request; when the queue is full, records are dropped and counted
+in weather_log_dropped_total.
+
+LOG_FORMAT=json writes one JSON object per line. Every record carries the
+trace id of the query being logged (see src.metrics.trace), so all lines of
+one request can be correlated. LOG_SAMPLE_RATE keeps INFO and DEBUG lines
+for that fraction of queries; warnings and errors are always written.
+
+Call sites pass arguments %-style (logger.info("GET %s", url)) so nothing
+is formatted for records below the configured level.
+"""
+
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+import threading
+import time
+import zlib
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO, Tuple
+
 from src.config import settings
+from src.metrics import current_trace_id, registry
+
+LOG_DROPPED = registry.counter("weather_log_dropped_total", "Log records dropped because the log queue was full")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that aren't user-supplied extra={...} fields
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "trace_id"}
+
+_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+_handler_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the trace id and any extra={...} fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamps records with the current trace id; runs in the logging thread, before any queue hand-off"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records at or below max_level. Records of a trace
+    are kept or dropped together, so a sampled query's lines are complete.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate >= 1:
+            return True
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            return zlib.crc32(trace_id.encode()) % 10000 < self.rate * 10000
+        return random.random() < self.rate
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process listener. The stock prepare() formats the
+    message in the calling thread; records are passed on as they are so the
+    listener does all the formatting, and a full queue drops the record
+    instead of blocking.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+
+def output_level() -> int:
+    """Lowest level written: LOG_LEVEL in debug mode, otherwise warnings and up to keep the console clean"""
+    level = logging.getLevelName(settings.LOG_LEVEL.upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+    return level if settings.DEBUG else max(level, logging.WARNING)
+
+
+def build_handler(stream: TextIO = sys.stdout) -> Tuple[logging.Handler, Optional[QueueListener]]:
+    """
+    The handler loggers write to, configured from settings, and the started
+    QueueListener behind it in queue mode (None otherwise)
+    """
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT.lower() == "json" else logging.Formatter(TEXT_FORMAT))
+
+    listener = None
+    if settings.LOG_QUEUE_ENABLED:
+        handler: logging.Handler = _LocalQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        listener = QueueListener(handler.queue, output)
+        listener.start()
+    else:
+        handler = output
+
+    handler.setLevel(output_level())
+    handler.addFilter(CorrelationFilter())
+    if settings.LOG_SAMPLE_RATE < 1:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE))
+    return handler, listener
+
+
+def _shared_handler() -> logging.Handler:
+    global _handler, _listener
+    if _handler is None:
+        with _handler_lock:
+            if _handler is None:
+                _handler, _listener = build_handler()
+                if _listener is not None:
+                    atexit.register(stop_logging)
+    return _handler
+
+
+def stop_logging() -> None:
+    """Write out records still queued and stop the writer thread (no-op unless in queue mode)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logger(name: str) -> logging.Logger:
     """
-    Configure and return a logger instance with industry standard formatting
+    Configure and return a logger instance writing through the shared handler
     """
     logger = logging.getLogger(name)
-    
+
     # Check if logger is already configured to prevent duplicate logs
     if logger.hasHandlers():
         return logger
-        
-    logger.setLevel(settings.LOG_LEVEL)
-    
-    handler = logging.StreamHandler(sys.stdout)
-    
-    # In production/default mode, we only want to show WARNINGs and above to console
-    # To keep the UI clean
-    if settings.DEBUG:
-        handler.setLevel(settings.LOG_LEVEL)
-    else:
-        handler.setLevel(logging.WARNING)
-    
-    # JSON-like structured format is often preferred in production, 
-    # but a readable format is better for development. 
-    # Here is a robust human-readable standard format.
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    
-    logger.addHandler(handler)
-    
+
+    # Match the handler's level so calls below it return before building a record
+    logger.setLevel(output_level())
+    logger.addHandler(_shared_handler())
+
     # Prevent propagation to root logger to avoid double logging if root is configured
     logger.propagate = False
-    
+
     return logger
@@ -1,10 +1,15 @@
+import time
+_STARTED = time.perf_counter()
+
 import sys
+import json
 import argparse
 import warnings
 import threading
 import itertools
-import time
-from src.agents.weather_agent import WeatherAgent
+# LangChain/OpenAI-backed modules (WeatherAgent, WeatherTool) are imported
+# lazily where they are needed to keep CLI startup fast
+from src.agents.streaming import ERROR, FINAL, TOKEN, TOOL_START
 from src.logger import setup_logger
 from src.exceptions import AppError
 from src.config import settings
@@ -15,6 +20,9 @@ def suppress_warnings():
         warnings.filterwarnings("ignore", category=UserWarning, module="urllib3")
         warnings.filterwarnings("ignore", message=".*ssl.*")
 
+# Session id of the interactive conversation
+REPL_SESSION = "repl"
+
 class Spinner:
     """A simple spinner for console feedback during long operations"""
     def __init__(self, message="Thinking..."):
@@ -41,36 +49,279 @@ class Spinner:
             sys.stdout.flush()
             time.sleep(0.1)
 
+class StartupProfiler:
+    """Records how long each startup stage takes, for --profile-startup"""
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.stages = []
+        self._last = _STARTED
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        print("\n⏱️  Startup profile:", file=sys.stderr)
+        for stage, elapsed in self.stages:
+            print(f"  {stage:<32} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+        total = self._last - _STARTED
+        print(f"  {'total (since main module load)':<32} {total * 1000:8.1f} ms", file=sys.stderr)
+
+def print_streamed_response(agent, query: str, session_id=None) -> None:
+    """Print the agent's answer token by token, with a spinner until the first token"""
+    spinner = None if settings.DEBUG else Spinner("Checking weather data...")
+    if spinner:
+        spinner.start()
+    started = False
+    try:
+        for event in agent.stream(query, session_id=session_id):
+            if event.type == TOOL_START:
+                if spinner:
+                    spinner.stop()
+                    spinner = Spinner("Fetching weather data...")
+                    spinner.start()
+                continue
+            if spinner:
+                spinner.stop()
+                spinner = None
+            if event.type == TOKEN:
+                if not started:
+                    print("\n\033[1;32m🤖 Agent:\033[0m ", end="")
+                    started = True
+                print(event.data, end="", flush=True)
+            elif event.type == FINAL and not started:
+                print(f"\n\033[1;32m🤖 Agent:\033[0m {event.data}", end="")
+                started = True
+            elif event.type == ERROR:
+                print(f"\n\033[1;31m❌ Error:\033[0m {event.data}", end="")
+                started = True
+    finally:
+        if spinner:
+            spinner.stop()
+    print("\n")
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Weather AI Agent")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import and initialization timings (waits for the agent to be fully built)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch = subparsers.add_parser(
+        "batch",
+        help="Answer many queries from a file or stdin, writing JSONL results",
+        description="Process one query per line with bounded concurrency. "
+                    "Results are written as JSON lines in completion order; "
+                    "exits with status 1 if any item failed.",
+    )
+    batch.add_argument("input", nargs="?", default="-", help="Input file, one item per line ('-' for stdin)")
+    batch.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    batch.add_argument(
+        "--coordinates",
+        action="store_true",
+        help="Lines are 'latitude,longitude' pairs; fetch forecasts directly without the LLM",
+    )
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.BATCH_CONCURRENCY,
+        help=f"Items processed concurrently (default: {settings.BATCH_CONCURRENCY})",
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS,
+        help=f"Worker processes sharing the concurrency and caches (default: {settings.WORKERS})",
+    )
+    
+    serve = subparsers.add_parser(
+        "serve",
+        help="Expose the agent over a local HTTP API",
+        description="Run an ASGI service (requires uvicorn) sharing one agent, "
+                    "connection pool and cache set across requests.",
+    )
+    serve.add_argument("--host", default=settings.SERVER_HOST, help=f"Bind address (default: {settings.SERVER_HOST})")
+    serve.add_argument("--port", type=int, default=settings.SERVER_PORT, help=f"Port (default: {settings.SERVER_PORT})")
+    serve.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=settings.SERVER_MAX_CONCURRENCY,
+        help=f"Requests processed concurrently (default: {settings.SERVER_MAX_CONCURRENCY})",
+    )
+    serve.add_argument(
+        "--queue-depth",
+        type=int,
+        default=settings.SERVER_QUEUE_DEPTH,
+        help=f"Requests allowed to wait before 503s (default: {settings.SERVER_QUEUE_DEPTH})",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=float,
+        default=settings.SERVER_REQUEST_TIMEOUT,
+        help=f"Per-request timeout in seconds (default: {settings.SERVER_REQUEST_TIMEOUT})",
+    )
+    serve.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS,
+        help=f"Worker processes, each with its own concurrency limits (default: {settings.WORKERS})",
+    )
+    
     args = parser.parse_args()
     
     # Update global settings based on args
     if args.debug:
         settings.DEBUG = True
-        print("🔧 Debug mode enabled")
+        print("🔧 Debug mode enabled", file=sys.stderr)
+    return args
+
+def _open_stream(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8")
+
+def run_batch_command(args, profiler: StartupProfiler) -> int:
+    """Run the batch subcommand and return the process exit code"""
+    from src.batch import parse_coordinates, run_batch
+    from src.cache import GridPointCache
+    
+    source = _open_stream(args.input, "r")
+    try:
+        items = [line.strip() for line in source if line.strip()]
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    
+    def coordinate_key(line: str):
+        try:
+            return GridPointCache.key(*parse_coordinates(line))
+        except ValueError:
+            return line
+    
+    closer = None
+    if args.workers > 1:
+        from src.agents.router import normalize_query
+        from src.batch import run_batch_processes
+        from src.workers import agent_worker, forecast_worker, prepare_shared_state
+        prepare_shared_state(args.workers)
+        results = run_batch_processes(
+            forecast_worker if args.coordinates else agent_worker,
+            items,
+            workers=args.workers,
+            max_concurrency=args.concurrency,
+            key=coordinate_key if args.coordinates else normalize_query,
+        )
+    elif args.coordinates:
+        from src.tools.weather_tool import WeatherTool
+        profiler.mark("tool module import")
+        tool = WeatherTool()
+        profiler.mark("tool init")
+        
+        results = run_batch(
+            lambda line: tool.forecast(*parse_coordinates(line)),
+            items,
+            max_concurrency=args.concurrency,
+            key=coordinate_key,
+        )
+        closer = tool.client
+    else:
+        from src.agents.weather_agent import WeatherAgent
+        profiler.mark("agent module import")
+        agent = WeatherAgent()
+        profiler.mark("agent init")
+        results = agent.run_many(items, max_concurrency=args.concurrency)
+        closer = agent
+    
+    profiler.report()
+    
+    failures = 0
+    sink = _open_stream(args.output, "w")
+    try:
+        for result in results:
+            failures += not result.ok
+            sink.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+            sink.flush()
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        if closer is not None:
+            closer.close()
+    
+    print(f"Processed {len(items)} item(s), {failures} failed", file=sys.stderr)
+    return 1 if failures else 0
 
 def main():
-    parse_args()
+    args = parse_args()
     suppress_warnings()
+    profiler = StartupProfiler(args.profile_startup)
+    profiler.mark("core imports + arg parsing")
     
     # Setup logger after configuring settings
     logger = setup_logger("main")
     logger.info("Starting Weather AI Agent")
     
+    if args.command == "batch":
+        try:
+            sys.exit(run_batch_command(args, profiler))
+        except AppError as e:
+            logger.error(f"Application error: {e}")
+            print(f"\n❌ Application Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    if args.command == "serve":
+        from src.server import WeatherService, serve
+        from src.workers import share_settings
+        profiler.mark("server module import")
+        profiler.report()
+        service = None
+        if args.workers > 1:
+            # Each worker process builds its own service from settings
+            share_settings(
+                SERVER_MAX_CONCURRENCY=args.max_concurrency,
+                SERVER_QUEUE_DEPTH=args.queue_depth,
+                SERVER_REQUEST_TIMEOUT=args.timeout,
+            )
+        else:
+            service = WeatherService(
+                max_concurrency=args.max_concurrency,
+                queue_depth=args.queue_depth,
+                request_timeout=args.timeout,
+            )
+        workers = f" with {args.workers} workers" if args.workers > 1 else ""
+        print(f"🌤️  Serving Weather AI Agent on http://{args.host}:{args.port}{workers}", file=sys.stderr)
+        try:
+            serve(args.host, args.port, service, workers=args.workers)
+        except AppError as e:
+            logger.error(f"Application error: {e}")
+            print(f"\n❌ Application Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    agent = None
     try:
-        # Initialize agent
+        # Initialize agent; the LLM and executor are built lazily
         if not settings.DEBUG:
             print("\n🌤️  Initializing Weather AI Agent...")
-            spinner = Spinner("Connecting to weather services...")
-            spinner.start()
-            try:
-                agent = WeatherAgent()
-            finally:
-                spinner.stop()
+        from src.agents.weather_agent import WeatherAgent
+        profiler.mark("agent module import")
+        agent = WeatherAgent()
+        profiler.mark("agent init")
+        
+        if profiler.enabled:
+            agent.warm_up(background=False)
+            profiler.mark("LLM + executor build")
+            profiler.report()
         else:
-            agent = WeatherAgent()
+            # Build the executor while the banner prints and the user types
+            agent.warm_up(background=True)
+        # Keep forecasts for places asked about repeatedly fresh between questions
+        agent.start_prefetcher()
         
         # Interactive mode
         print("\n" + "="*60)
@@ -81,7 +332,8 @@ def main():
         print("  - What's the weather in New York?")
         print("  - Will it rain in Seattle tomorrow?")
         print("  - Get forecast for latitude 39.7456, longitude -97.0892")
-        print("\nType 'quit' or 'exit' to leave\n")
+        print("\nFollow-up questions (\"and tomorrow?\") continue the conversation.")
+        print("Type 'reset' to start over, 'quit' or 'exit' to leave\n")
         
         while True:
             try:
@@ -94,18 +346,13 @@ def main():
                 if not query:
                     continue
                 
-                # Get response from agent
-                if not settings.DEBUG:
-                    spinner = Spinner("Checking weather data...")
-                    spinner.start()
-                    try:
-                        response = agent.run(query)
-                    finally:
-                        spinner.stop()
-                else:
-                    response = agent.run(query)
+                if query.lower() == 'reset':
+                    agent.reset_session(REPL_SESSION)
+                    print("\n🧹 Conversation cleared.\n")
+                    continue
                 
-                print(f"\n\033[1;32m🤖 Agent:\033[0m {response}\n")
+                # Stream the response from the agent
+                print_streamed_response(agent, query, REPL_SESSION)
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye! Stay safe in any weather!")
@@ -122,6 +369,9 @@ def main():
         logger.exception(f"Unexpected error: {e}")
         print(f"\n❌ Unexpected Error: {e}")
         sys.exit(1)
+    finally:
+        if agent is not None:
+            agent.close()
 
 
 if __name__ == "__main__":
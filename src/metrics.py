@@ -0,0 +1,355 @@
+"""
+Latency instrumentation: timing spans, counters and histograms.
+
+Spans time a named stage (agent run, LLM call, points/forecast lookup, each
+HTTP attempt) into the weather_stage_duration_seconds histogram and, when
+TRACE_PATH is set, append a JSON trace record per span. Everything is
+exported in Prometheus text format by render_prometheus().
+
+When both METRICS_ENABLED and TRACE_PATH are off, span() returns a shared
+no-op context manager, so instrumented code pays one settings lookup.
+"""
+
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.config import settings
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Correlates every span recorded while serving one query
+current_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_trace_id", default=None)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = ",".join(f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return "{" + escaped + "}"
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, key, None, value
+
+    def state(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def merge(self, state: Iterable[Tuple[LabelKey, float]]) -> None:
+        """Add another process's values (see MetricsRegistry.snapshot)"""
+        with self._lock:
+            for key, value in state:
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(_label_key(labels))
+        return int(state[-1]) if state else 0
+
+    def samples(self) -> Iterator[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                yield f"{self.name}_bucket", key, ("le", repr(bound)), count
+            yield f"{self.name}_bucket", key, ("le", "+Inf"), state[-1]
+            yield f"{self.name}_sum", key, None, state[-2]
+            yield f"{self.name}_count", key, None, state[-1]
+
+    def state(self) -> List[Tuple[LabelKey, List[float]]]:
+        with self._lock:
+            return [(key, list(state)) for key, state in self._values.items()]
+
+    def merge(self, state: Iterable[Tuple[LabelKey, List[float]]]) -> None:
+        """Add another process's observations; bucket bounds must match"""
+        with self._lock:
+            for key, values in state:
+                current = self._values.get(key)
+                if current is None:
+                    self._values[key] = list(values)
+                else:
+                    self._values[key] = [a + b for a, b in zip(current, values)]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help_text, buckets))
+
+    def _register(self, name: str, factory: Any) -> Any:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of every metric's values, for merging in another process"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                "kind": metric.kind,
+                "help": metric.help,
+                "buckets": list(getattr(metric, "buckets", ())),
+                "values": [[list(map(list, key)), value] for key, value in metric.state()],
+            }
+            for metric in metrics
+        }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the values of a snapshot taken in another process (counters and histograms sum)"""
+        for name, data in snapshot.items():
+            if data["kind"] == "histogram":
+                metric = self.histogram(name, data["help"], data["buckets"])
+            else:
+                metric = self.counter(name, data["help"])
+            metric.merge((tuple(map(tuple, key)), value) for key, value in data["values"])
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric.samples():
+                number = int(value) if float(value).is_integer() else value
+                lines.append(f"{name}{_format_labels(key, extra)} {number}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "weather_stage_duration_seconds", "Duration of agent, LLM, tool and HTTP stages"
+)
+STAGE_ERRORS = registry.counter(
+    "weather_stage_errors_total", "Stages that ended with an exception"
+)
+LLM_TOKENS = registry.counter(
+    "weather_llm_tokens_total", "LLM tokens used, by kind (prompt/completion)"
+)
+AGENT_ANSWERS = registry.counter(
+    "weather_agent_answers_total", "Agent answers by path (cache/fast/agent)"
+)
+RETRY_SLEEP_SECONDS = registry.counter(
+    "weather_api_retry_sleep_seconds_total", "Seconds spent in retry backoff before API attempts"
+)
+
+
+class TraceWriter:
+    """Appends JSON trace records to a file, one per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_trace_writer: Optional[TraceWriter] = None
+_trace_lock = threading.Lock()
+
+
+def get_trace_writer() -> Optional[TraceWriter]:
+    """Return the trace writer for TRACE_PATH, opening it on first use"""
+    global _trace_writer
+    if not settings.TRACE_PATH:
+        return None
+    if _trace_writer is None or _trace_writer.path != settings.TRACE_PATH:
+        with _trace_lock:
+            if _trace_writer is None or _trace_writer.path != settings.TRACE_PATH:
+                _trace_writer = TraceWriter(settings.TRACE_PATH)
+    return _trace_writer
+
+
+def instrumentation_enabled() -> bool:
+    return settings.METRICS_ENABLED or bool(settings.TRACE_PATH)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Times one stage; attributes added with set() go into the trace record"""
+
+    __slots__ = ("stage", "attrs", "_start", "_wall_start")
+
+    def __init__(self, stage: str, attrs: Dict[str, Any]):
+        self.stage = stage
+        self.attrs = attrs
+
+    def __enter__(self) -> "Span":
+        self._wall_start = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        record_span(
+            self.stage,
+            time.perf_counter() - self._start,
+            self._wall_start,
+            error=exc_type.__name__ if exc_type is not None else None,
+            **self.attrs,
+        )
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+def record_span(stage: str, elapsed: float, started_at: float, error: Optional[str] = None, **attrs: Any) -> None:
+    """Record a finished stage measured outside a Span (e.g. from callbacks)"""
+    STAGE_SECONDS.observe(elapsed, stage=stage)
+    if error is not None:
+        STAGE_ERRORS.inc(stage=stage, error=error)
+    writer = get_trace_writer()
+    if writer is not None:
+        record = {
+            "trace_id": current_trace_id.get(),
+            "stage": stage,
+            "start": round(started_at, 6),
+            "duration_ms": round(elapsed * 1000, 3),
+            "error": error,
+        }
+        if attrs:
+            record["attrs"] = attrs
+        writer.write(record)
+
+
+def span(stage: str, **attrs: Any) -> Any:
+    """Context manager timing a stage; a no-op when instrumentation is off"""
+    if not instrumentation_enabled():
+        return _NOOP_SPAN
+    return Span(stage, attrs)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def trace(stage: str, **attrs: Any) -> Iterator[Any]:
+    """
+    Root span: everything recorded or logged inside it shares a trace id -
+    the caller's (e.g. the service's request id) if one is set, else a new one
+    """
+    token = current_trace_id.set(new_trace_id()) if current_trace_id.get() is None else None
+    try:
+        if not instrumentation_enabled():
+            yield _NOOP_SPAN
+            return
+        with Span(stage, attrs) as root:
+            yield root
+    finally:
+        if token is not None:
+            current_trace_id.reset(token)
+
+
+def record_retry_sleep(retry_state: Any) -> None:
+    """tenacity before_sleep hook: account for time spent in backoff"""
+    if not instrumentation_enabled():
+        return
+    sleep = retry_state.next_action.sleep if retry_state.next_action else 0.0
+    RETRY_SLEEP_SECONDS.inc(sleep)
+    record_span("http.retry_backoff", sleep, time.time(), attempt=retry_state.attempt_number)
+
+
+def record_llm_usage(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    if not instrumentation_enabled():
+        return
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+
+
+def record_answer(path: str) -> None:
+    if instrumentation_enabled():
+        AGENT_ANSWERS.inc(path=path)
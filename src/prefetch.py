@@ -0,0 +1,194 @@
+"""
+Background refresh of popular forecasts.
+
+WeatherTool reports every forecast it serves to a DemandTracker, which
+keeps an exponentially decaying request count per forecast endpoint (one
+per NWS grid point, shared by all coordinates in that grid cell). A
+ForecastPrefetcher thread wakes every PREFETCH_INTERVAL seconds (jittered),
+takes the PREFETCH_TOP_N hottest endpoints and revalidates those whose
+cached response expires within PREFETCH_LEAD_TIME, so requests for popular
+places keep hitting a fresh cache entry instead of waiting on weather.gov.
+
+Refreshes are conditional requests (a 304 when the forecast hasn't
+changed), go one at a time, are capped at PREFETCH_BUDGET_PER_MINUTE and
+are skipped while the API's circuit breaker is open.
+"""
+
+import heapq
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.client import ApiClient
+from src.config import settings
+from src.forecast import Forecast
+from src.logger import setup_logger
+from src.metrics import registry, span
+from src.resilience import CircuitBreaker, TokenBucket
+
+logger = setup_logger(__name__)
+
+PREFETCH_REFRESHES = registry.counter(
+    "weather_prefetch_refreshes_total", "Background forecast refreshes, by outcome (ok/error/budget)"
+)
+
+
+class DemandTracker:
+    """
+    Thread-safe request counts per key that halve every half_life seconds,
+    so the hottest keys reflect recent traffic. At most max_entries keys
+    are tracked; the coldest are dropped first.
+    """
+
+    def __init__(self, half_life: float = 3600, max_entries: int = 4096, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self.clock = clock
+        self._scores: Dict[str, Tuple[float, float]] = {}  # key -> (score, updated_at)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, key: str) -> None:
+        now = self.clock()
+        with self._lock:
+            score, updated_at = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, updated_at, now) + 1, now)
+            if len(self._scores) > self.max_entries:
+                self._prune(now)
+
+    def score(self, key: str) -> float:
+        with self._lock:
+            entry = self._scores.get(key)
+        return self._decayed(*entry, self.clock()) if entry is not None else 0.0
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """The n hottest keys with their current scores, hottest first"""
+        now = self.clock()
+        with self._lock:
+            scores = [(key, self._decayed(score, updated_at, now)) for key, (score, updated_at) in self._scores.items()]
+        return heapq.nlargest(n, scores, key=lambda item: item[1])
+
+    def _prune(self, now: float) -> None:
+        """Drop the coldest tenth of the keys"""
+        keep = heapq.nlargest(
+            self.max_entries * 9 // 10,
+            self._scores.items(),
+            key=lambda item: self._decayed(item[1][0], item[1][1], now),
+        )
+        self._scores = dict(keep)
+
+
+class ForecastPrefetcher:
+    """
+    Keeps the hottest forecasts fresh in the client's response cache from a
+    daemon thread. run_once() performs a single pass and can be called
+    directly (e.g. in tests or from a scheduler of your own).
+    """
+
+    def __init__(
+        self,
+        client: ApiClient,
+        demand: DemandTracker,
+        top_n: int = 20,
+        interval: float = 60.0,
+        lead_time: float = 120.0,
+        budget_per_minute: float = 30.0,
+        jitter: float = 0.2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.client = client
+        self.demand = demand
+        self.top_n = top_n
+        self.interval = interval
+        self.lead_time = lead_time
+        self.jitter = jitter
+        self.clock = clock
+        self.budget = TokenBucket(rate=budget_per_minute / 60, burst=max(int(budget_per_minute), 1))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, client: ApiClient, demand: DemandTracker) -> Optional["ForecastPrefetcher"]:
+        """Build the prefetcher configured in settings, or None when disabled or there is no cache to warm"""
+        if not settings.PREFETCH_ENABLED or client.response_cache is None:
+            return None
+        return cls(
+            client,
+            demand,
+            top_n=settings.PREFETCH_TOP_N,
+            interval=settings.PREFETCH_INTERVAL,
+            lead_time=settings.PREFETCH_LEAD_TIME,
+            budget_per_minute=settings.PREFETCH_BUDGET_PER_MINUTE,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background thread (no-op if it is running)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="forecast-prefetch", daemon=True)
+        self._thread.start()
+        logger.info(f"Prefetching the {self.top_n} most requested forecasts every ~{self.interval:.0f}s")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the thread, waiting up to timeout for an in-flight refresh"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def due(self) -> List[str]:
+        """Hot endpoints whose cached forecast is missing or expires within the (jittered) lead time"""
+        now = self.clock()
+        endpoints = []
+        for endpoint, _ in self.demand.top(self.top_n):
+            fresh_until = self.client.cached_fresh_until(endpoint, decode=Forecast.from_json)
+            # Jitter the lead so entries cached together aren't all refreshed in the same pass
+            lead = self.lead_time * (1 + random.uniform(0, self.jitter))
+            if fresh_until is None or fresh_until - now <= lead:
+                endpoints.append(endpoint)
+        return endpoints
+
+    def run_once(self) -> int:
+        """Refresh the due endpoints within the budget; returns how many were refreshed"""
+        breaker: Optional[CircuitBreaker] = self.client.circuit_breaker
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            logger.debug("Circuit open; skipping prefetch pass")
+            return 0
+        refreshed = 0
+        for endpoint in self.due():
+            if self._stop.is_set():
+                break
+            if self.budget.reserve(max_wait=0) is None:
+                PREFETCH_REFRESHES.inc(outcome="budget")
+                logger.debug("Prefetch budget exhausted for this pass")
+                break
+            try:
+                with span("prefetch.refresh"):
+                    self.client.get(endpoint, decode=Forecast.from_json, refresh=True)
+            except Exception as e:
+                PREFETCH_REFRESHES.inc(outcome="error")
+                logger.warning(f"Prefetch of {endpoint} failed: {e}")
+                continue
+            PREFETCH_REFRESHES.inc(outcome="ok")
+            refreshed += 1
+        return refreshed
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)):
+            try:
+                refreshed = self.run_once()
+                if refreshed:
+                    logger.debug(f"Prefetched {refreshed} forecast(s)")
+            except Exception as e:
+                logger.error(f"Prefetch pass failed: {e}")
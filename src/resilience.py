@@ -0,0 +1,208 @@
+"""
+Upstream protection shared by ApiClient and AsyncApiClient.
+
+Per host, every client in the process shares one TokenBucket (steady-state
+rate limit plus pauses requested through Retry-After) and one
+CircuitBreaker (fail fast after repeated upstream failures). Retries wait
+for Retry-After when the server sent one and use jittered exponential
+backoff otherwise, so a brownout doesn't synchronize retries.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from tenacity import wait_random_exponential
+from tenacity.wait import wait_base
+
+from src.config import settings
+from src.logger import setup_logger
+from src.metrics import registry
+
+logger = setup_logger(__name__)
+
+RATE_LIMITED = registry.counter(
+    "weather_api_rate_limited_total", "429/503 responses received from the API"
+)
+THROTTLE_WAIT_SECONDS = registry.counter(
+    "weather_api_throttle_wait_seconds_total", "Seconds requests waited for the per-host rate limiter"
+)
+CIRCUIT_REJECTED = registry.counter(
+    "weather_api_circuit_rejected_total", "Requests not sent because the circuit was open, by outcome (stale/error)"
+)
+CIRCUIT_TRANSITIONS = registry.counter(
+    "weather_api_circuit_transitions_total", "Circuit breaker state changes"
+)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(moment - (time.time() if now is None else now), 0.0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. rate=0 disables the steady-state limit, but
+    pause() (driven by Retry-After) still holds requests back.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Take a token and return how long to wait before using it, or None
+        (taking nothing) when that would exceed max_wait
+        """
+        with self._lock:
+            now = self.clock()
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens < 1:
+                    wait = max(wait, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            if self.rate > 0:
+                self._tokens -= 1
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for the next seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. While open, allow()
+    is False; after reset_timeout one probe request is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = "", clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.clock = clock
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = self.clock()
+            if now - self._opened_at >= self.reset_timeout:
+                # Let one probe through; others keep failing fast until it reports
+                # back (or for another reset_timeout, in case it never does)
+                self._opened_at = now
+                if self._state != self.HALF_OPEN:
+                    self._transition(self.HALF_OPEN)
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self._opened_at = self.clock()
+                self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"Circuit for {self.name or 'upstream'} {self._state} -> {state}")
+        self._state = state
+        CIRCUIT_TRANSITIONS.inc(host=self.name, state=state)
+
+
+class wait_retry_after(wait_base):
+    """Wait the Retry-After of a rate-limit error (capped), else the fallback strategy"""
+
+    def __init__(self, fallback: wait_base, max_wait: float):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, self.max_wait)
+        return self.fallback(retry_state)
+
+
+def build_retry_wait() -> wait_base:
+    """Jittered exponential backoff that honours Retry-After, from settings"""
+    return wait_retry_after(
+        wait_random_exponential(multiplier=settings.RETRY_BACKOFF_BASE, max=settings.RETRY_MAX_WAIT),
+        max_wait=settings.RETRY_MAX_WAIT,
+    )
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def limiter_for(host: str) -> TokenBucket:
+    """The process-wide rate limiter for a host"""
+    with _registry_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+        return _limiters[host]
+
+
+def breaker_for(host: str) -> Optional[CircuitBreaker]:
+    """The process-wide circuit breaker for a host, or None when disabled"""
+    if not settings.CIRCUIT_BREAKER_ENABLED:
+        return None
+    with _registry_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT, name=host
+            )
+        return _breakers[host]
+
+
+def reset() -> None:
+    """Forget all per-host limiters and breakers (for tests)"""
+    with _registry_lock:
+        _limiters.clear()
+        _breakers.clear()
@@ -0,0 +1,385 @@
+"""
+ASGI service exposing WeatherAgent and WeatherTool over HTTP.
+
+Endpoints:
+    POST /v1/query     {"query": "...", "session_id": ".."}  -> {"answer": "..."}
+    GET  /v1/forecast  ?latitude=..&longitude=..          -> {"forecast": "..."}
+    GET  /healthz                                         -> service status
+    GET  /metrics                                         -> Prometheus text metrics
+
+One WeatherAgent (and so one connection pool and set of caches) is shared
+by all requests. A query with a session_id continues that conversation;
+without one it is answered on its own. Admission control bounds concurrent work and the number
+of requests allowed to wait for a slot; excess load is rejected with 503
+instead of queueing without limit.
+
+With WORKERS > 1, serve() runs that many uvicorn worker processes, each
+with its own agent and admission limits, sharing caches and metrics as
+described in src.workers.
+"""
+
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from src.config import settings
+from src.exceptions import APIError, APIRateLimitError, APITimeoutError, AppError, ConfigurationError
+from src.logger import setup_logger
+from src.metrics import current_trace_id, new_trace_id, registry, span
+from src.workers import MetricsPublisher, aggregated_metrics, prepare_shared_state
+
+logger = setup_logger(__name__)
+
+MAX_SESSION_ID_LENGTH = 128
+
+# A caller-supplied X-Request-ID is used as the trace id if it looks like one
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class ServiceOverloadedError(AppError):
+    """Raised when the request queue is full or the service is shutting down"""
+    pass
+
+
+class AdmissionController:
+    """
+    Bounds concurrent requests and the depth of the queue waiting for a slot
+    """
+
+    def __init__(self, max_concurrency: int, queue_depth: int):
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.draining = False
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.draining:
+            self.rejected += 1
+            raise ServiceOverloadedError("Service is shutting down")
+        if self._semaphore.locked() and self.waiting >= self.queue_depth:
+            self.rejected += 1
+            raise ServiceOverloadedError("Too many queued requests")
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting requests and wait for in-flight ones; False on timeout"""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "draining": self.draining,
+        }
+
+
+class HTTPError(Exception):
+    """An error response to send back to the client"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _default_agent_factory():
+    from src.agents.weather_agent import WeatherAgent
+    return WeatherAgent()
+
+
+class WeatherService:
+    """
+    The ASGI application. Handles lifespan events: the shared agent is built
+    on startup, and on shutdown in-flight requests are drained before the
+    agent's connection pools are closed.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Any] = _default_agent_factory,
+        max_concurrency: Optional[int] = None,
+        queue_depth: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+        shutdown_timeout: Optional[float] = None,
+    ):
+        self.agent_factory = agent_factory
+        self.max_concurrency = max_concurrency or settings.SERVER_MAX_CONCURRENCY
+        self.queue_depth = queue_depth if queue_depth is not None else settings.SERVER_QUEUE_DEPTH
+        self.request_timeout = request_timeout or settings.SERVER_REQUEST_TIMEOUT
+        self.shutdown_timeout = shutdown_timeout or settings.SERVER_SHUTDOWN_TIMEOUT
+        self.agent = None
+        self.admission: Optional[AdmissionController] = None
+        self.metrics_publisher: Optional[MetricsPublisher] = None
+
+    async def startup(self) -> None:
+        self.admission = AdmissionController(self.max_concurrency, self.queue_depth)
+        self.agent = self.agent_factory()
+        if hasattr(self.agent, "warm_up"):
+            self.agent.warm_up(background=True)
+        if hasattr(self.agent, "start_prefetcher"):
+            self.agent.start_prefetcher()
+        if settings.WORKERS > 1 and settings.WORKER_STATE_DIR:
+            self.metrics_publisher = MetricsPublisher(settings.WORKER_STATE_DIR, settings.WORKER_METRICS_INTERVAL)
+            self.metrics_publisher.start()
+        logger.info(
+            f"Service started (concurrency={self.max_concurrency}, queue_depth={self.queue_depth}, "
+            f"timeout={self.request_timeout}s)"
+        )
+
+    async def shutdown(self) -> None:
+        if self.admission is not None:
+            drained = await self.admission.drain(self.shutdown_timeout)
+            if not drained:
+                logger.warning(f"Shutdown timeout: {self.admission.in_flight} request(s) still in flight")
+        if self.agent is not None:
+            await self.agent.aclose()
+        if self.metrics_publisher is not None:
+            self.metrics_publisher.stop()
+        logger.info("Service stopped")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception(f"Service startup failed: {e}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        method, path = scope["method"], scope["path"]
+        # Correlates the request's log lines and trace records; echoed back to the caller
+        request_id = _request_id(scope)
+        token = current_trace_id.set(request_id)
+        headers = {"x-request-id": request_id}
+        try:
+            if path == "/healthz" and method == "GET":
+                status = 503 if self.admission is None or self.admission.draining else 200
+                body = {"status": "ok" if status == 200 else "unavailable"}
+                if self.admission is not None:
+                    body.update(self.admission.status())
+                await _send_json(send, status, body)
+                return
+            if path == "/metrics" and method == "GET":
+                await _send_text(send, 200, self._render_metrics(), "text/plain; version=0.0.4")
+                return
+
+            handler = self._routes().get((method, path))
+            if handler is None:
+                raise HTTPError(404, f"No route for {method} {path}")
+            if self.admission is None:
+                raise HTTPError(503, "Service is not ready")
+
+            request_body = await _read_body(receive) if method == "POST" else b""
+            try:
+                async with self.admission.slot():
+                    with span("server.request", path=path):
+                        result = await asyncio.wait_for(handler(scope, request_body), self.request_timeout)
+            except ServiceOverloadedError as e:
+                raise HTTPError(503, str(e), {"retry-after": "1"})
+            except asyncio.TimeoutError:
+                raise HTTPError(504, f"Request timed out after {self.request_timeout}s")
+            await _send_json(send, 200, result, headers)
+
+        except HTTPError as e:
+            await _send_json(send, e.status, {"error": e.message}, {**e.headers, **headers})
+        except Exception as e:
+            logger.exception(f"Unhandled error serving {method} {path}: {e}")
+            await _send_json(send, 500, {"error": "Internal server error"}, headers)
+        finally:
+            current_trace_id.reset(token)
+
+    def _render_metrics(self) -> str:
+        if self.metrics_publisher is None:
+            return registry.render_prometheus()
+        return aggregated_metrics(self.metrics_publisher.directory).render_prometheus()
+
+    def _routes(self) -> Dict[Any, Callable]:
+        return {
+            ("POST", "/v1/query"): self._query,
+            ("GET", "/v1/forecast"): self._forecast,
+        }
+
+    async def _query(self, scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        query = payload.get("query") if isinstance(payload, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "'query' must be a non-empty string")
+        session_id = payload.get("session_id")
+        if session_id is not None and (
+            not isinstance(session_id, str) or not 0 < len(session_id) <= MAX_SESSION_ID_LENGTH
+        ):
+            raise HTTPError(400, f"'session_id' must be a string of 1-{MAX_SESSION_ID_LENGTH} characters")
+        # aanswer, not arun: arun turns failures into a "Sorry..." reply that would be sent as a 200
+        try:
+            answer = await self.agent.aanswer(query.strip(), session_id=session_id)
+        except _upstream_failures() as e:
+            logger.error("Query failed: %s", e, exc_info=True)
+            raise _upstream_error(e)
+        if session_id is None:
+            return {"answer": answer}
+        return {"answer": answer, "session_id": session_id}
+
+    async def _forecast(self, scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        params = parse_qs(scope.get("query_string", b"").decode())
+        try:
+            latitude = float(params["latitude"][0])
+            longitude = float(params["longitude"][0])
+        except (KeyError, ValueError):
+            raise HTTPError(400, "'latitude' and 'longitude' query parameters are required")
+        try:
+            forecast = await self.agent.weather_tool.aforecast(latitude, longitude)
+        except AppError as e:
+            raise _upstream_error(e)
+        return {"forecast": forecast}
+
+
+def _upstream_failures() -> tuple:
+    """Errors from weather.gov, the LLM client or a timeout; anything else is a bug and a 500"""
+    failures: tuple = (AppError, asyncio.TimeoutError)
+    try:
+        from openai import OpenAIError
+        failures += (OpenAIError,)
+    except ImportError:
+        pass
+    return failures
+
+
+def _upstream_error(error: Exception) -> HTTPError:
+    """
+    504 for a weather.gov, LLM or agent-deadline timeout; 404 or 400 when
+    weather.gov rejects the request itself (e.g. a point outside the US);
+    502 for any other upstream failure.
+    """
+    timeouts: tuple = (APITimeoutError, asyncio.TimeoutError)
+    try:
+        from openai import APITimeoutError as LLMTimeoutError
+        timeouts += (LLMTimeoutError,)
+    except ImportError:
+        pass
+    if isinstance(error, timeouts):
+        return HTTPError(504, f"Upstream timed out: {error}")
+    status = getattr(error, "status_code", None) if isinstance(error, APIError) else None
+    if status is not None and 400 <= status < 500 and not isinstance(error, APIRateLimitError):
+        return HTTPError(404 if status == 404 else 400, f"Upstream rejected the request: {error}")
+    return HTTPError(502, f"Upstream error: {error}")
+
+
+def _request_id(scope: Dict[str, Any]) -> str:
+    for name, value in scope.get("headers", ()):
+        if name.lower() == b"x-request-id":
+            candidate = value.decode("latin-1").strip()
+            if _REQUEST_ID_RE.match(candidate):
+                return candidate
+            break
+    return new_trace_id()
+
+
+async def _read_body(receive: Callable) -> bytes:
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _send_json(send: Callable, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+    await _send_text(send, status, json.dumps(body, ensure_ascii=False), "application/json", headers)
+
+
+async def _send_text(
+    send: Callable, status: int, text: str, content_type: str, headers: Optional[Dict[str, str]] = None
+) -> None:
+    payload = text.encode()
+    raw_headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(payload)).encode())]
+    raw_headers.extend((k.encode(), v.encode()) for k, v in (headers or {}).items())
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+def create_service() -> WeatherService:
+    """Service configured from settings; the app factory each uvicorn worker process calls"""
+    return WeatherService()
+
+
+def serve(host: str, port: int, service: Optional[WeatherService] = None, workers: int = 1) -> None:
+    """
+    Run the service with uvicorn (an optional dependency). With workers > 1
+    each worker process builds its own service from settings, so the
+    SERVER_* options must be set in settings rather than on a passed service.
+    """
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ConfigurationError(
+            "Service mode requires uvicorn. Install it with: pip install uvicorn"
+        ) from e
+
+    if workers > 1:
+        if service is not None:
+            raise ConfigurationError("A service instance can't be shared by worker processes; configure it through settings")
+        prepare_shared_state(workers)
+        app: Any = "src.server:create_service"
+    else:
+        app = service or WeatherService()
+
+    uvicorn.run(
+        app,
+        factory=workers > 1,
+        workers=workers if workers > 1 else None,
+        host=host,
+        port=port,
+        lifespan="on",
+        timeout_graceful_shutdown=int(settings.SERVER_SHUTDOWN_TIMEOUT),
+        log_level="debug" if settings.DEBUG else "warning",
+    )
@@ -0,0 +1,73 @@
+import re
+from typing import Optional, Type
+from pydantic import BaseModel, Field
+from langchain_core.tools import BaseTool
+from langchain_core.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+
+from src.gazetteer import Gazetteer, get_gazetteer
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_COORDINATES = re.compile(r"^\s*(-?\d{1,3}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+class GeocodeInput(BaseModel):
+    """Input schema for geocode tool"""
+    query: str = Field(..., description="US place name, optionally with state (e.g. 'Portland, OR'), or 'latitude, longitude' to find the nearest place")
+
+
+class GeocodeTool(BaseTool):
+    """Tool for resolving US place names to coordinates from the bundled gazetteer"""
+
+    name: str = "geocode_place"
+    description: str = """
+    Looks up the latitude and longitude of a US city or town, offline.
+    Input is a place name, optionally with a state ("Springfield, IL"); misspelled
+    names return the closest matches. Input "latitude, longitude" instead to find
+    the nearest named place. Use it before get_weather_forecast instead of guessing coordinates.
+    """
+    args_schema: Type[BaseModel] = GeocodeInput
+
+    gazetteer: Optional[Gazetteer] = Field(default=None, exclude=True)
+    max_results: int = 5
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.gazetteer is None:
+            self.gazetteer = get_gazetteer()
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        """Execute the tool to look up a place"""
+        try:
+            match = _COORDINATES.match(query)
+            if match:
+                return self._reverse(float(match.group(1)), float(match.group(2)))
+            return self._forward(query)
+        except Exception as e:
+            logger.error(f"Error geocoding {query!r}: {e}")
+            return f"Error looking up {query!r}: {str(e)}"
+
+    async def _arun(self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
+        # Lookups are in-memory and take well under a millisecond
+        return self._run(query)
+
+    def _forward(self, query: str) -> str:
+        places = self.gazetteer.geocode(query, limit=self.max_results)
+        if not places:
+            return f"No US place found matching {query!r}."
+        lines = [f"Places matching {query!r} (most likely first):"]
+        for place in places:
+            lines.append(f"- {place.label}: {place.latitude}, {place.longitude} (population {place.population:,})")
+        return "\n".join(lines)
+
+    def _reverse(self, latitude: float, longitude: float) -> str:
+        nearest = self.gazetteer.nearest(latitude, longitude, k=3)
+        if not nearest:
+            return f"No named place found near {latitude}, {longitude}."
+        lines = [f"Places nearest to {latitude}, {longitude}:"]
+        for place, distance in nearest:
+            lines.append(f"- {place.label}: {distance:.1f} km away")
+        return "\n".join(lines)
@@ -0,0 +1,209 @@
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Sequence, Type
+from pydantic import BaseModel, Field
+from langchain_core.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+
+from src.batch import BatchResult, arun_batch, run_batch
+from src.cache import format_coordinate
+from src.config import settings
+from src.forecast import Alerts, Forecast, GridpointData, HourlyForecast, Model
+from src.logger import setup_logger
+from src.metrics import span
+from src.tools.weather_tool import WeatherApiTool
+
+logger = setup_logger(__name__)
+
+Section = Literal["forecast", "hourly", "gridpoint", "alerts"]
+DEFAULT_SECTIONS = ("hourly", "alerts")
+
+# points field holding each section's URL, and the model that decodes it
+_SECTION_SOURCES = {
+    "forecast": ("forecast", Forecast),
+    "hourly": ("forecastHourly", HourlyForecast),
+    "gridpoint": ("forecastGridData", GridpointData),
+}
+_SECTION_TITLES = {
+    "forecast": "forecast",
+    "hourly": "hourly forecast",
+    "gridpoint": "gridpoint data",
+    "alerts": "alerts",
+}
+
+
+class WeatherDetailsInput(BaseModel):
+    """Input schema for weather details tool"""
+    latitude: float = Field(..., description="Latitude of the location")
+    longitude: float = Field(..., description="Longitude of the location")
+    sections: List[Section] = Field(
+        default=list(DEFAULT_SECTIONS),
+        description=(
+            "What to fetch, all in one call: 'hourly' (hour-by-hour temperature, precipitation chance, wind), "
+            "'alerts' (active watches and warnings), 'gridpoint' (raw numeric data such as precipitation amount "
+            "and sky cover), 'forecast' (12-hour periods)"
+        ),
+    )
+    hours: int = Field(default=12, ge=1, le=48, description="Hours of hourly forecast to include")
+
+
+class SectionRequest(NamedTuple):
+    """One endpoint to fetch for a section"""
+    section: str
+    endpoint: str
+    params: Optional[Dict[str, Any]]
+    model: Type[Model]
+
+
+class WeatherDetailsTool(WeatherApiTool):
+    """
+    Tool for hourly forecasts, raw gridpoint data and active alerts.
+
+    One /points lookup (usually a grid cache hit) yields every URL; the
+    requested sections are then fetched concurrently and rendered together,
+    so a question about both the afternoon and any warnings costs one tool
+    call and one round of parallel requests.
+    """
+
+    name: str = "get_weather_details"
+    description: str = """
+    Useful for detailed or time-specific US weather questions: hour-by-hour forecasts
+    ("will it rain at 3pm?"), active weather alerts and warnings, and raw numeric
+    gridpoint data. Input is latitude and longitude plus the sections to fetch;
+    request every section the question needs in a single call.
+    """
+    args_schema: Type[BaseModel] = WeatherDetailsInput
+
+    def _run(
+        self,
+        latitude: float,
+        longitude: float,
+        sections: Optional[Sequence[str]] = None,
+        hours: int = 12,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> str:
+        """Execute the tool to fetch the requested sections"""
+        try:
+            return self.details(latitude, longitude, sections, hours)
+        except Exception as e:
+            logger.error(f"Error fetching weather details: {e}")
+            return self._error_message(e)
+
+    async def _arun(
+        self,
+        latitude: float,
+        longitude: float,
+        sections: Optional[Sequence[str]] = None,
+        hours: int = 12,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Execute the tool asynchronously on the async HTTP client"""
+        try:
+            return await self.adetails(latitude, longitude, sections, hours)
+        except Exception as e:
+            logger.error(f"Error fetching weather details: {e}")
+            return self._error_message(e)
+
+    def details(
+        self, latitude: float, longitude: float, sections: Optional[Sequence[str]] = None, hours: int = 12
+    ) -> str:
+        """
+        Fetch and render the requested sections. A failing section is reported
+        in the output; only a failed /points lookup raises.
+        """
+        sections = self._normalize_sections(sections)
+        logger.info("Fetching weather details %s for coordinates: %s, %s", sections, latitude, longitude)
+
+        with span("tool.points"):
+            point_data = self._get_point_data(latitude, longitude)
+
+        requests = self._section_requests(point_data, latitude, longitude, sections)
+        results: List[BatchResult] = []
+        if requests:
+            with span("tool.details", sections=",".join(request.section for request in requests)):
+                results = list(run_batch(
+                    lambda request: self.client.get(request.endpoint, request.params, decode=request.model.from_json),
+                    requests,
+                    max_concurrency=len(requests),
+                    key=lambda request: request.section,
+                ))
+        return self._render(point_data, sections, results, hours)
+
+    async def adetails(
+        self, latitude: float, longitude: float, sections: Optional[Sequence[str]] = None, hours: int = 12
+    ) -> str:
+        """Async counterpart of details"""
+        sections = self._normalize_sections(sections)
+        logger.info("Fetching weather details (async) %s for coordinates: %s, %s", sections, latitude, longitude)
+
+        with span("tool.points"):
+            point_data = await self._aget_point_data(latitude, longitude)
+
+        requests = self._section_requests(point_data, latitude, longitude, sections)
+        results: List[BatchResult] = []
+        if requests:
+            with span("tool.details", sections=",".join(request.section for request in requests)):
+                results = [
+                    result async for result in arun_batch(
+                        lambda request: self.async_client.get(
+                            request.endpoint, request.params, decode=request.model.from_json
+                        ),
+                        requests,
+                        max_concurrency=len(requests),
+                        key=lambda request: request.section,
+                    )
+                ]
+        return self._render(point_data, sections, results, hours)
+
+    @staticmethod
+    def _normalize_sections(sections: Optional[Sequence[str]]) -> List[str]:
+        """Known sections in the order given, without duplicates (defaults when empty)"""
+        sections = [section for section in dict.fromkeys(sections or ()) if section in _SECTION_TITLES]
+        return sections or list(DEFAULT_SECTIONS)
+
+    def _section_requests(
+        self, point_data: dict, latitude: float, longitude: float, sections: List[str]
+    ) -> List[SectionRequest]:
+        """Endpoints for the sections whose URL the points data provides"""
+        requests = []
+        for section in sections:
+            if section == "alerts":
+                requests.append(self._alerts_request(point_data, latitude, longitude))
+                continue
+            field, model = _SECTION_SOURCES[section]
+            endpoint = self._point_endpoint(point_data, field)
+            if endpoint:
+                requests.append(SectionRequest(section, endpoint, None, model))
+        return requests
+
+    def _alerts_request(self, point_data: dict, latitude: float, longitude: float) -> SectionRequest:
+        """Active alerts for the point's forecast zone, or for the point itself when no zone is given"""
+        zone_url = point_data.get('properties', {}).get('forecastZone')
+        if zone_url:
+            zone = zone_url.rstrip("/").rpartition("/")[2]
+            return SectionRequest("alerts", f"alerts/active/zone/{zone}", None, Alerts)
+        point = f"{format_coordinate(latitude)},{format_coordinate(longitude)}"
+        return SectionRequest("alerts", "alerts/active", {"point": point}, Alerts)
+
+    def _render(self, point_data: dict, sections: List[str], results: List[BatchResult], hours: int) -> str:
+        city, state = self._location(point_data)
+        by_section = {result.input.section: result for result in results}
+        blocks = []
+        for section in sections:
+            result = by_section.get(section)
+            title = _SECTION_TITLES[section]
+            if result is None:
+                blocks.append(f"No {title} available for {city}, {state}")
+            elif not result.ok:
+                blocks.append(f"Could not fetch {title} for {city}, {state}: {result.error}")
+            else:
+                # A model from the client, or a payload dict from a persistent cache
+                blocks.append(self._render_section(section, result.input.model.coerce(result.output), city, state, hours))
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def _render_section(section: str, model: Any, city: str, state: str, hours: int) -> str:
+        if section == "hourly":
+            return model.render(city, state, hours)
+        if settings.TOOL_OUTPUT_COMPACT and section == "forecast":
+            return model.render_compact(city, state, settings.TOOL_OUTPUT_DETAIL_CHARS)
+        if settings.TOOL_OUTPUT_COMPACT and section == "alerts":
+            return model.render(city, state, settings.TOOL_OUTPUT_DETAIL_CHARS)
+        return model.render(city, state)
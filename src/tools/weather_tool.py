@@ -1,10 +1,16 @@
-from typing import Optional, Type
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Tuple, Type
 from pydantic import BaseModel, Field
-from langchain.tools import BaseTool
-from langchain.callbacks.manager import CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from langchain_core.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 
-from src.client import ApiClient
+from src.batch import BatchResult, arun_batch, run_batch
+from src.cache import GridPointCache, format_coordinate
+from src.client import ApiClient, AsyncApiClient
+from src.config import settings
+from src.forecast import Forecast
 from src.logger import setup_logger
+from src.metrics import span
+from src.prefetch import DemandTracker
 
 logger = setup_logger(__name__)
 
@@ -15,26 +21,103 @@ class WeatherInput(BaseModel):
     longitude: float = Field(..., description="Longitude of the location")
 
 
-class WeatherTool(BaseTool):
+class WeatherApiTool(BaseTool):
+    """
+    Base for tools built on a weather.gov /points lookup: holds the shared
+    HTTP clients and grid cache, and resolves coordinates to the point's
+    metadata (forecast, hourly, gridpoint and zone URLs)
+    """
+    
+    # Shared HTTP client; pass one in to reuse its connection pool across tools
+    client: Optional[ApiClient] = Field(default=None, exclude=True)
+    async_client: Optional[AsyncApiClient] = Field(default=None, exclude=True)
+    # Cache for /points lookups; built from settings unless passed explicitly (None disables it)
+    grid_cache: Optional[GridPointCache] = Field(default=None, exclude=True)
+    # Counts forecast requests per endpoint so a ForecastPrefetcher can keep hot ones warm
+    demand: Optional[DemandTracker] = Field(default=None, exclude=True)
+    
+    model_config = {"arbitrary_types_allowed": True, "extra": "allow"}
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if "grid_cache" not in kwargs:
+            self.grid_cache = GridPointCache.from_settings()
+        if self.client is None:
+            self.client = ApiClient()
+        if self.async_client is None:
+            self.async_client = AsyncApiClient(
+                base_url=self.client.base_url,
+                api_key=self.client.api_key,
+                response_cache=self.client.response_cache,
+            )
+    
+    def _get_point_data(self, latitude: float, longitude: float) -> dict:
+        """Return /points metadata, from the grid cache when available"""
+        if self.grid_cache is not None:
+            cached = self.grid_cache.get(latitude, longitude)
+            if cached is not None:
+                logger.debug("Grid cache hit for %s, %s", latitude, longitude)
+                return cached
+        point_data = self.client.get(self._points_endpoint(latitude, longitude))
+        if self.grid_cache is not None:
+            self.grid_cache.set(latitude, longitude, point_data)
+        return point_data
+    
+    async def _aget_point_data(self, latitude: float, longitude: float) -> dict:
+        """Async counterpart of _get_point_data"""
+        if self.grid_cache is not None:
+            cached = self.grid_cache.get(latitude, longitude)
+            if cached is not None:
+                logger.debug("Grid cache hit for %s, %s", latitude, longitude)
+                return cached
+        point_data = await self.async_client.get(self._points_endpoint(latitude, longitude))
+        if self.grid_cache is not None:
+            self.grid_cache.set(latitude, longitude, point_data)
+        return point_data
+    
+    @staticmethod
+    def _points_endpoint(latitude: float, longitude: float) -> str:
+        return f"points/{format_coordinate(latitude)},{format_coordinate(longitude)}"
+    
+    def _point_endpoint(self, point_data: dict, field: str) -> Optional[str]:
+        """Extract a URL field of points data as an endpoint relative to the API base URL"""
+        url = point_data.get('properties', {}).get(field)
+        if not url:
+            return None
+        return url.replace(self.client.base_url + "/", "")
+    
+    def _forecast_endpoint(self, point_data: dict) -> Optional[str]:
+        """Extract the forecast endpoint (relative to the API base URL) from points data"""
+        return self._point_endpoint(point_data, 'forecast')
+    
+    def _record_demand(self, endpoint: str) -> None:
+        if self.demand is not None:
+            self.demand.record(endpoint)
+    
+    @staticmethod
+    def _location(point_data: dict) -> Tuple[str, str]:
+        """City and state of the point, from its relativeLocation"""
+        location_props = point_data.get('properties', {})
+        relative_location = location_props.get('relativeLocation', {}).get('properties', {})
+        return relative_location.get('city', 'Unknown'), relative_location.get('state', 'Unknown')
+    
+    @staticmethod
+    def _error_message(e: Exception) -> str:
+        return f"Error fetching weather data: {str(e)}. Please ensure the coordinates are within the United States."
+
+
+class WeatherTool(WeatherApiTool):
     """Tool for fetching weather data from weather.gov API"""
     
     name: str = "get_weather_forecast"
     description: str = """
     Useful for getting weather forecast for a specific location in the United States.
     Input should be latitude and longitude coordinates.
-    Returns detailed weather forecast information including temperature, conditions, and alerts.
+    Returns detailed weather forecast information including temperature and conditions.
     Only works for locations within the United States.
     """
     args_schema: Type[BaseModel] = WeatherInput
     
-    # Allow extra fields for client
-    model_config = {"arbitrary_types_allowed": True, "extra": "allow"}
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Initialize client after parent init
-        object.__setattr__(self, 'client', ApiClient())
-    
     def _run(
         self,
         latitude: float,
@@ -43,48 +126,120 @@ class WeatherTool(BaseTool):
     ) -> str:
         """Execute the tool to fetch weather data"""
         try:
-            logger.info(f"Fetching weather for coordinates: {latitude}, {longitude}")
-            
-            # Step 1: Get grid point data
-            endpoint = f"points/{latitude},{longitude}"
-            point_data = self.client.get(endpoint)
-            
-            # Extract location information
-            location_props = point_data.get('properties', {})
-            relative_location = location_props.get('relativeLocation', {}).get('properties', {})
-            city = relative_location.get('city', 'Unknown')
-            state = relative_location.get('state', 'Unknown')
-            
-            # Step 2: Get forecast URL
-            forecast_url = location_props.get('forecast')
-            if not forecast_url:
-                return f"Unable to get forecast URL for coordinates {latitude}, {longitude}"
-            
-            # Extract endpoint from full URL
-            forecast_endpoint = forecast_url.replace(self.client.base_url + "/", "")
-            
-            # Step 3: Get actual forecast
-            forecast_data = self.client.get(forecast_endpoint)
-            
-            # Format the response
-            periods = forecast_data.get('properties', {}).get('periods', [])[:3]  # Get next 3 periods
-            
-            if not periods:
-                return f"No forecast data available for {city}, {state}"
-            
-            result = f"Weather forecast for {city}, {state}:\n\n"
-            
-            for period in periods:
-                result += f"**{period['name']}**: {period['temperature']}°{period['temperatureUnit']}\n"
-                result += f"Conditions: {period['shortForecast']}\n"
-                result += f"Details: {period['detailedForecast']}\n\n"
-            
-            return result.strip()
-            
+            return self.forecast(latitude, longitude, compact=settings.TOOL_OUTPUT_COMPACT)
         except Exception as e:
             logger.error(f"Error fetching weather: {e}")
-            return f"Error fetching weather data: {str(e)}. Please ensure the coordinates are within the United States."
+            return self._error_message(e)
+    
+    async def _arun(
+        self,
+        latitude: float,
+        longitude: float,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Execute the tool asynchronously on the async HTTP client"""
+        try:
+            return await self.aforecast(latitude, longitude, compact=settings.TOOL_OUTPUT_COMPACT)
+        except Exception as e:
+            logger.error(f"Error fetching weather: {e}")
+            return self._error_message(e)
+    
+    def forecast(self, latitude: float, longitude: float, compact: bool = False) -> str:
+        """
+        Fetch and format the forecast for a location.
+        
+        Unlike _run, API errors propagate to the caller instead of being
+        turned into a message for the LLM. compact selects the dense form
+        the tool hands to the LLM; callers showing the text to users keep
+        the default.
+        """
+        logger.info("Fetching weather for coordinates: %s, %s", latitude, longitude)
+        
+        # Step 1: Get grid point data
+        with span("tool.points"):
+            point_data = self._get_point_data(latitude, longitude)
+        
+        # Step 2: Get forecast URL
+        forecast_endpoint = self._forecast_endpoint(point_data)
+        if not forecast_endpoint:
+            return f"Unable to get forecast URL for coordinates {latitude}, {longitude}"
+        
+        # Step 3: Get actual forecast
+        self._record_demand(forecast_endpoint)
+        with span("tool.forecast"):
+            forecast = self.client.get(forecast_endpoint, decode=Forecast.from_json)
+        
+        with span("tool.format"):
+            return self._format_forecast(point_data, forecast, compact)
+    
+    async def aforecast(self, latitude: float, longitude: float, compact: bool = False) -> str:
+        """Async counterpart of forecast"""
+        logger.info("Fetching weather (async) for coordinates: %s, %s", latitude, longitude)
+        
+        with span("tool.points"):
+            point_data = await self._aget_point_data(latitude, longitude)
+        
+        forecast_endpoint = self._forecast_endpoint(point_data)
+        if not forecast_endpoint:
+            return f"Unable to get forecast URL for coordinates {latitude}, {longitude}"
+        
+        self._record_demand(forecast_endpoint)
+        with span("tool.forecast"):
+            forecast = await self.async_client.get(forecast_endpoint, decode=Forecast.from_json)
+        
+        with span("tool.format"):
+            return self._format_forecast(point_data, forecast, compact)
+    
+    def forecast_many(
+        self,
+        coordinates: Iterable[Tuple[float, float]],
+        max_concurrency: Optional[int] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Fetch forecasts for many locations concurrently, yielding results as they complete.
+        
+        Coordinates that round to the same grid point are fetched once; distinct
+        points in the same forecast grid share the forecast request through the
+        client's request coalescing and response cache.
+        """
+        return run_batch(
+            lambda point: self.forecast(*point),
+            coordinates,
+            max_concurrency=max_concurrency or settings.BATCH_CONCURRENCY,
+            key=lambda point: GridPointCache.key(*point),
+        )
+    
+    def aforecast_many(
+        self,
+        coordinates: Iterable[Tuple[float, float]],
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Async counterpart of forecast_many"""
+        return arun_batch(
+            lambda point: self.aforecast(*point),
+            coordinates,
+            max_concurrency=max_concurrency or settings.BATCH_CONCURRENCY,
+            key=lambda point: GridPointCache.key(*point),
+        )
+    
+    def forecast_fresh_until(self, latitude: float, longitude: float) -> Optional[float]:
+        """Timestamp until which the cached forecast for a location is fresh, if known"""
+        if self.grid_cache is None:
+            return None
+        point_data = self.grid_cache.get(latitude, longitude)
+        if point_data is None:
+            return None
+        forecast_endpoint = self._forecast_endpoint(point_data)
+        if not forecast_endpoint:
+            return None
+        return self.client.cached_fresh_until(forecast_endpoint, decode=Forecast.from_json)
     
-    async def _arun(self, *args, **kwargs):
-        """Async version (not implemented)"""
-        raise NotImplementedError("Async execution not implemented yet")
+    @classmethod
+    def _format_forecast(cls, point_data: dict, forecast: Any, compact: bool = False) -> str:
+        """Render the next forecast periods as text for the agent"""
+        city, state = cls._location(point_data)
+        # A Forecast from the client, or a payload dict from a persistent cache
+        forecast = Forecast.coerce(forecast)
+        if compact:
+            return forecast.render_compact(city, state, settings.TOOL_OUTPUT_DETAIL_CHARS)
+        return forecast.render(city, state)
@@ -0,0 +1,181 @@
+"""
+Multi-process worker mode for batch and service runs.
+
+One process is bound by the GIL for JSON parsing, pydantic validation and
+LangChain overhead. With WORKERS > 1, batch runs (src.batch.run_batch_processes)
+and the service (uvicorn workers) spread that work over processes, each
+with its own agent, connection pool and rate limiter.
+
+The workers share state through WORKER_STATE_DIR:
+
+- the grid-point, response and answer caches default to SQLite files
+  there (WAL mode, see src.cache.SQLiteCache), so a forecast fetched by
+  one worker is served from cache by the others;
+- each service worker writes a snapshot of its metrics there every
+  WORKER_METRICS_INTERVAL seconds, and GET /metrics on any worker merges
+  them with its own live values. A worker removes its snapshot when it
+  stops, and snapshots of processes that are no longer running (a worker
+  that crashed, say) are skipped, so a restarted worker is not counted
+  twice.
+"""
+
+import atexit
+import glob
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from src.batch import parse_coordinates
+from src.config import settings
+from src.logger import setup_logger
+from src.metrics import MetricsRegistry, registry
+
+logger = setup_logger(__name__)
+
+METRICS_DIR = "metrics"
+
+# Cache path settings pointed into the state directory unless already set
+_SHARED_CACHES = (
+    ("GRID_CACHE_PATH", "grid.sqlite"),
+    ("RESPONSE_CACHE_PATH", "responses.sqlite"),
+    ("AGENT_CACHE_PATH", "answers.sqlite"),
+)
+
+
+def share_settings(**values: Any) -> None:
+    """Set values in settings and in the environment, so worker processes started afterwards see them too"""
+    for name, value in values.items():
+        setattr(settings, name, value)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value if isinstance(value, str) else json.dumps(value)
+
+
+def prepare_shared_state(workers: int) -> str:
+    """
+    Create the state directory workers share, point unset cache paths into
+    it and export the settings workers need. Returns the directory; a
+    temporary one is removed when this process exits.
+    """
+    directory = settings.WORKER_STATE_DIR
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="weather-workers-")
+        atexit.register(shutil.rmtree, directory, True)
+    metrics_dir = os.path.join(directory, METRICS_DIR)
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Snapshots from an earlier run would be counted again
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        os.remove(path)
+
+    shared = {"WORKERS": workers, "WORKER_STATE_DIR": directory, "DEBUG": settings.DEBUG}
+    for name, filename in _SHARED_CACHES:
+        if not getattr(settings, name):
+            shared[name] = os.path.join(directory, filename)
+    share_settings(**shared)
+    logger.info(f"Sharing caches and metrics between {workers} workers in {directory}")
+    return directory
+
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, METRICS_DIR, f"{pid}.json")
+
+
+def _pid_running(pid: int) -> bool:
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_metrics_snapshot(directory: str) -> None:
+    """Replace this process's snapshot file atomically, so readers never see a partial one"""
+    path = _snapshot_path(directory, os.getpid())
+    partial = path + ".tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f, separators=(",", ":"))
+    os.replace(partial, path)
+
+
+def remove_metrics_snapshot(directory: str) -> None:
+    try:
+        os.remove(_snapshot_path(directory, os.getpid()))
+    except FileNotFoundError:
+        pass
+
+
+def aggregated_metrics(directory: str) -> MetricsRegistry:
+    """This process's live metrics plus the latest snapshot of every other running worker"""
+    merged = MetricsRegistry()
+    merged.merge(registry.snapshot())
+    for path in glob.glob(os.path.join(directory, METRICS_DIR, "*.json")):
+        name = os.path.splitext(os.path.basename(path))[0]
+        pid = int(name) if name.isdigit() else None
+        if pid == os.getpid():
+            continue
+        if pid is not None and not _pid_running(pid):
+            logger.debug(f"Skipping metrics snapshot of exited worker {pid}")
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable metrics snapshot {path}: {e}")
+    return merged
+
+
+class MetricsPublisher:
+    """Writes this worker's metrics snapshot every interval seconds, and removes it on stop()"""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="metrics-publisher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            remove_metrics_snapshot(self.directory)
+        except OSError as e:
+            logger.warning(f"Could not remove metrics snapshot: {e}")
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._publish()
+
+    def _publish(self) -> None:
+        try:
+            write_metrics_snapshot(self.directory)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def forecast_worker() -> Tuple[Callable[[str], str], Callable[[], None]]:
+    """run_batch_processes factory: 'latitude,longitude' lines to forecasts"""
+    from src.tools.weather_tool import WeatherTool
+    tool = WeatherTool()
+    return (lambda line: tool.forecast(*parse_coordinates(line))), tool.client.close
+
+
+def agent_worker() -> Tuple[Callable[[str], str], Callable[[], None]]:
+    """run_batch_processes factory: queries to agent answers"""
+    from src.agents.weather_agent import WeatherAgent
+    agent = WeatherAgent()
+    return agent.answer, agent.close
@@ -0,0 +1,10 @@
+import pytest
+from src import resilience
+
+
+@pytest.fixture(autouse=True)
+def reset_upstream_state():
+    """Per-host rate limiters and circuit breakers are process-wide; isolate tests"""
+    resilience.reset()
+    yield
+    resilience.reset()
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+from langchain.agents import create_tool_calling_agent
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+from src.agents.executor import ParallelAgentExecutor
+
+CITIES = ["Seattle", "Miami", "Denver"]
+
+
+class ScriptedChatModel(GenericFakeChatModel):
+    """Replays scripted messages; tool schemas are accepted and ignored"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class Tracker:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def exit(self):
+        with self.lock:
+            self.active -= 1
+
+
+def _executor(delays, **kwargs):
+    tracker = Tracker()
+
+    @tool
+    def lookup(city: str) -> str:
+        """Look up the weather for a city"""
+        tracker.enter()
+        try:
+            time.sleep(delays[city])
+        finally:
+            tracker.exit()
+        return f"{city}: sunny"
+
+    @tool
+    async def alookup(city: str) -> str:
+        """Look up the weather for a city"""
+        tracker.enter()
+        try:
+            await asyncio.sleep(delays[city])
+        finally:
+            tracker.exit()
+        return f"{city}: sunny"
+
+    lookup.coroutine = alookup.coroutine
+    calls = [{"name": "lookup", "args": {"city": city}, "id": f"call_{i}"} for i, city in enumerate(delays)]
+    llm = ScriptedChatModel(
+        messages=iter([AIMessage(content="", tool_calls=calls), AIMessage(content="All sunny.")]), disable_streaming=True
+    )
+    prompt = ChatPromptTemplate.from_messages([
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    agent = create_tool_calling_agent(llm, [lookup], prompt)
+    executor = ParallelAgentExecutor(agent=agent, tools=[lookup], return_intermediate_steps=True, **kwargs)
+    return executor, tracker
+
+
+def test_tool_calls_of_one_turn_run_concurrently():
+    executor, tracker = _executor({city: 0.2 for city in CITIES})
+
+    started = time.perf_counter()
+    result = executor.invoke({"input": "Seattle vs Miami vs Denver"})
+    elapsed = time.perf_counter() - started
+
+    assert result["output"] == "All sunny."
+    assert [observation for _, observation in result["intermediate_steps"]] == [f"{city}: sunny" for city in CITIES]
+    assert tracker.peak == 3
+    assert elapsed < 0.5
+
+
+def test_concurrency_is_bounded_per_turn():
+    executor, tracker = _executor({city: 0.05 for city in CITIES}, max_tool_concurrency=2)
+
+    executor.invoke({"input": "Seattle vs Miami vs Denver"})
+
+    assert tracker.peak == 2
+
+
+def test_calls_missing_the_deadline_get_a_timeout_observation():
+    executor, _ = _executor({"Seattle": 0.01, "Miami": 2.0}, max_execution_time=0.3)
+
+    started = time.perf_counter()
+    result = executor.invoke({"input": "Seattle vs Miami"})
+
+    assert time.perf_counter() - started < 1.5
+    assert result["output"].startswith("Agent stopped")
+    observations = [observation for _, observation in result["intermediate_steps"]]
+    assert observations[0] == "Seattle: sunny"
+    assert "did not finish before the deadline" in observations[1]
+
+
+def test_async_calls_are_bounded_and_time_out():
+    executor, tracker = _executor(
+        {"Seattle": 0.05, "Miami": 0.05, "Denver": 2.0}, max_tool_concurrency=2, tool_timeout=0.3, max_execution_time=5
+    )
+
+    result = asyncio.run(executor.ainvoke({"input": "Seattle vs Miami vs Denver"}))
+
+    assert result["output"] == "All sunny."
+    observations = [observation for _, observation in result["intermediate_steps"]]
+    assert observations[:2] == ["Seattle: sunny", "Miami: sunny"]
+    assert "did not finish before the deadline" in observations[2]
+    assert tracker.peak == 2
@@ -0,0 +1,54 @@
+import pytest
+from src.agents.response_cache import AgentResponseCache
+from src.agents.router import QueryRouter
+from src.cache import MemoryCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 7200.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return AgentResponseCache(MemoryCache(clock=clock), ttl=900, period=3600, clock=clock)
+
+
+def test_equivalent_location_queries_share_a_key(cache):
+    router = QueryRouter()
+    first = cache.key("weather in Seattle?", router.match("weather in Seattle?"))
+    second = cache.key("Seattle weather", router.match("Seattle weather"))
+    assert first == second
+
+
+def test_unrouted_queries_are_keyed_on_their_words_in_order(cache):
+    assert cache.key("Will it rain in  Seattle tomorrow?") == cache.key("will it rain in seattle tomorrow")
+    assert cache.key("Will it rain in Seattle tomorrow?") != cache.key("Will it snow in Seattle tomorrow?")
+    assert cache.key("Is it colder in Seattle than Miami?") != cache.key("Is it colder in Miami than Seattle?")
+    assert cache.key("Will it rain in Seattle today?") != cache.key("Will it rain in Seattle now?")
+
+
+def test_answers_expire_with_ttl_and_forecast_freshness(cache, clock):
+    cache.set("a", "sunny")
+    cache.set("b", "rainy", fresh_until=clock.now + 60)
+
+    clock.now += 61
+    assert cache.get("a") == "sunny"
+    assert cache.get("b") is None
+
+    clock.now += 900
+    assert cache.get("a") is None
+
+
+def test_answers_are_not_reused_across_forecast_periods(cache, clock):
+    before = cache.key("Will it rain tomorrow?")
+    clock.now += 3600
+    assert cache.key("Will it rain tomorrow?") != before
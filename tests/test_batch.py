@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from src.batch import arun_batch, parse_coordinates, run_batch
+
+
+def test_run_batch_dedupes_and_reports_each_item():
+    calls = []
+
+    def fetch(item):
+        calls.append(item)
+        return item.upper()
+
+    results = sorted(run_batch(fetch, ["a", "b", "a"], max_concurrency=2), key=lambda r: r.index)
+
+    assert [r.output for r in results] == ["A", "B", "A"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_run_batch_isolates_failures():
+    def fetch(item):
+        if item == "bad":
+            raise ValueError("no such place")
+        return "ok"
+
+    results = {r.input: r for r in run_batch(fetch, ["good", "bad"])}
+
+    assert results["good"].ok and results["good"].output == "ok"
+    assert results["bad"].error == "ValueError: no such place"
+
+
+def test_arun_batch_bounds_concurrency():
+    active = 0
+    peak = 0
+
+    async def fetch(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return item
+
+    async def scenario():
+        return [r async for r in arun_batch(fetch, range(10), max_concurrency=3)]
+
+    results = asyncio.run(scenario())
+
+    assert sorted(r.output for r in results) == list(range(10))
+    assert peak == 3
+
+
+def test_parse_coordinates():
+    assert parse_coordinates("39.7456, -97.0892") == (39.7456, -97.0892)
+    with pytest.raises(ValueError):
+        parse_coordinates("Seattle")
@@ -0,0 +1,47 @@
+from benchmarks.fake_servers import FakeServerConfig, FakeUpstreamServer
+from benchmarks.harness import percentile, run_sync
+from benchmarks.run import compare
+from src.client import ApiClient
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"tool.sync": {"rps": 100.0, "p95_ms": 10.0}}
+    results = {"tool.sync": {"rps": 70.0, "p95_ms": 10.5}}
+
+    regressions = compare(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("tool.sync rps")
+
+
+def test_fake_server_serves_points_and_forecast():
+    with FakeUpstreamServer() as server:
+        client = ApiClient(base_url=server.base_url, response_cache=None)
+        try:
+            points = client.get("points/39.7456,-97.0892")
+            endpoint = points["properties"]["forecast"].replace(server.base_url + "/", "")
+            forecast = client.get(endpoint)
+        finally:
+            client.close()
+
+    assert len(forecast["properties"]["periods"]) == 14
+    assert server.requests["weather"] == 2
+
+
+def test_fake_server_injects_errors():
+    with FakeUpstreamServer(FakeServerConfig(error_rate=1.0)) as server:
+        client = ApiClient(base_url=server.base_url, response_cache=None)
+        try:
+            result = run_sync("client.sync", lambda i: client.get("points/1,1"), requests=3)
+        finally:
+            client.close()
+
+    assert result.errors == 3
+    assert result.to_dict()["requests"] == 3
@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import MagicMock
+from src.client import ApiClient
+from src.cache import (
+    GridPointCache,
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    build_backend,
+    format_coordinate,
+    freshness_lifetime,
+)
+from src.tools.weather_tool import WeatherTool
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_memory_cache_expires_entries(clock):
+    cache = MemoryCache(max_entries=10, clock=clock)
+    cache.set("a", {"v": 1}, ttl=60)
+    assert cache.get("a") == {"v": 1}
+
+    clock.now += 61
+    assert cache.get("a") is None
+
+
+def test_memory_cache_evicts_least_recently_used(clock):
+    cache = MemoryCache(max_entries=2, clock=clock)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_sqlite_cache_survives_reopen(tmp_path, clock):
+    path = str(tmp_path / "grid.sqlite")
+    cache = SQLiteCache(path, clock=clock)
+    cache.set("points:1,2", {"forecast": "url"}, ttl=60)
+    cache.close()
+
+    reopened = SQLiteCache(path, clock=clock)
+    assert reopened.get("points:1,2") == {"forecast": "url"}
+    clock.now += 61
+    assert reopened.get("points:1,2") is None
+    reopened.close()
+
+
+def test_sqlite_cache_is_shared_between_connections(tmp_path, clock):
+    path = str(tmp_path / "grid.sqlite")
+    writer, reader = SQLiteCache(path, clock=clock), SQLiteCache(path, clock=clock)
+
+    writer.set("points:1,2", {"forecast": "url"}, ttl=60)
+
+    assert reader.get("points:1,2") == {"forecast": "url"}
+    assert reader._conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    writer.close()
+    reader.close()
+
+
+def test_tiered_cache_promotes_persistent_hits(tmp_path, clock):
+    persistent = SQLiteCache(str(tmp_path / "grid.sqlite"), clock=clock)
+    persistent.set("k", "v", ttl=30)
+    memory = MemoryCache(clock=clock)
+    cache = TieredCache(memory, persistent)
+
+    assert cache.get("k") == "v"
+    # Promoted entry keeps the persistent expiry rather than a fresh TTL
+    assert memory.get_entry("k") == ("v", clock.now + 30)
+    persistent.close()
+
+
+def test_persistent_tier_evicts_at_the_configured_limit(tmp_path):
+    cache = build_backend(max_entries=5, path=str(tmp_path / "grid.sqlite"))
+
+    for i in range(SQLiteCache.PRUNE_EVERY):
+        cache.set(f"points:{i}", i, ttl=60)
+
+    (rows,) = cache.persistent._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+    assert rows == 5
+    cache.persistent.close()
+
+
+def test_grid_point_cache_rounds_coordinates():
+    assert format_coordinate(39.74561234) == "39.7456"
+    assert format_coordinate(-97.0) == "-97"
+    assert GridPointCache.key(39.74561234, -97.08921) == GridPointCache.key(39.7456, -97.0892)
+
+
+def test_weather_tool_uses_grid_cache():
+    point_data = {"properties": {"forecast": "https://api.weather.gov/gridpoints/TOP/32,81/forecast"}}
+    forecast_data = {"properties": {"periods": []}}
+    mock_client = MagicMock(spec=ApiClient(base_url="https://api.weather.gov"))
+    mock_client.base_url = "https://api.weather.gov"
+    mock_client.get.side_effect = [point_data, forecast_data, forecast_data]
+    tool = WeatherTool(client=mock_client, grid_cache=GridPointCache(MemoryCache(), ttl=60))
+
+    tool._run(latitude=39.7456, longitude=-97.0892)
+    tool._run(latitude=39.74561, longitude=-97.08921)
+
+    endpoints = [call.args[0] for call in mock_client.get.call_args_list]
+    assert endpoints == [
+        "points/39.7456,-97.0892",
+        "gridpoints/TOP/32,81/forecast",
+        "gridpoints/TOP/32,81/forecast",
+    ]
+
+
+def test_freshness_lifetime_prefers_max_age_and_subtracts_age():
+    headers = {"cache-control": "public, max-age=300", "age": "100", "expires": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    assert freshness_lifetime(headers, now=0) == 200
+
+
+def test_freshness_lifetime_uses_expires_relative_to_date():
+    headers = {
+        "date": "Sat, 17 Oct 2026 12:00:00 GMT",
+        "expires": "Sat, 17 Oct 2026 12:05:00 GMT",
+    }
+    assert freshness_lifetime(headers, now=0) == 300
+
+
+def test_freshness_lifetime_without_lifetime_needs_validators():
+    assert freshness_lifetime({}, now=0) is None
+    assert freshness_lifetime({"etag": '"abc"'}, now=0) == 0.0
+    assert freshness_lifetime({"cache-control": "no-store", "etag": '"abc"'}, now=0) is None
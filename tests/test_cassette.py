@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.cassette import Cassette, RecordingTransport, ReplayTransport, request_key
+from src.client import ApiClient
+from src.config import settings
+from src.exceptions import APIConnectionError
+
+
+def _upstream(request):
+    """Counts calls per path so repeated requests get different answers"""
+    _upstream.calls[request.url.path] = _upstream.calls.get(request.url.path, 0) + 1
+    if request.url.path == "/points/1,2":
+        return httpx.Response(200, json={"forecast": "https://api.weather.gov/gridpoints/TOP/1,2/forecast"})
+    return httpx.Response(
+        200,
+        json={"call": _upstream.calls[request.url.path]},
+        headers={"Cache-Control": "max-age=60", "Expires": "Thu, 01 Jan 2015 00:00:00 GMT"},
+    )
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    _upstream.calls = {}
+    path = str(tmp_path / "upstream.jsonl.gz")
+    cassette = Cassette(path)
+    with httpx.Client(transport=RecordingTransport(cassette, httpx.MockTransport(_upstream))) as client:
+        assert client.get("https://api.weather.gov/forecast").json() == {"call": 1}
+        assert client.get("https://api.weather.gov/forecast").json() == {"call": 2}
+        client.get("https://api.weather.gov/points/1,2")
+        client.post("https://openrouter.ai/api/v1/chat/completions", json={"messages": ["hi"]})
+    cassette.close()
+    return path
+
+
+def test_replay_serves_recorded_responses_in_order(recorded):
+    cassette = Cassette.load(recorded)
+    assert len(cassette) == 4
+
+    with httpx.Client(transport=ReplayTransport(cassette, time_scale=0)) as client:
+        first = client.get("https://api.weather.gov/forecast")
+        assert [first.json(), client.get("https://api.weather.gov/forecast").json()] == [{"call": 1}, {"call": 2}]
+        # Once the recordings run out, the last one repeats
+        assert client.get("https://api.weather.gov/forecast").json() == {"call": 2}
+        assert client.post("https://openrouter.ai/api/v1/chat/completions", json={"messages": ["hi"]}).status_code == 200
+        with pytest.raises(httpx.ConnectError):
+            client.post("https://openrouter.ai/api/v1/chat/completions", json={"messages": ["bye"]})
+
+    assert first.headers["cache-control"] == "max-age=60"
+    assert "expires" not in first.headers
+
+
+def test_replay_under_another_host_rewrites_links(recorded):
+    with httpx.Client(transport=ReplayTransport(Cassette.load(recorded), time_scale=0)) as client:
+        points = client.get("http://127.0.0.1:8080/points/1,2").json()
+
+    assert points == {"forecast": "http://127.0.0.1:8080/gridpoints/TOP/1,2/forecast"}
+
+
+def test_replay_scales_recorded_timing(tmp_path):
+    cassette = Cassette(str(tmp_path / "slow.jsonl"))
+    request = httpx.Request("GET", "https://api.weather.gov/forecast")
+    cassette.record(request, httpx.Response(200, json={}), b"{}", elapsed=0.2)
+
+    async def replay(scale):
+        transport = ReplayTransport(cassette, time_scale=scale)
+        started = time.perf_counter()
+        await transport.handle_async_request(request)
+        return time.perf_counter() - started
+
+    assert asyncio.run(replay(0.5)) >= 0.1
+    assert asyncio.run(replay(0)) < 0.05
+
+
+class _SlowChunks(httpx.SyncByteStream):
+    """A streamed chat completion whose second event comes 0.2s after the first"""
+
+    def __iter__(self):
+        yield b"data: one\n\n"
+        time.sleep(0.2)
+        yield b"data: two\n\n"
+
+
+def test_streamed_responses_keep_their_chunk_timing(tmp_path):
+    cassette = Cassette(str(tmp_path / "stream.jsonl"))
+
+    def upstream(request):
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, stream=_SlowChunks())
+
+    def arrivals(transport):
+        started = time.perf_counter()
+        with httpx.Client(transport=transport) as client:
+            with client.stream("POST", "https://openrouter.ai/api/v1/chat/completions", json={}) as response:
+                return [(time.perf_counter() - started, chunk) for chunk in response.iter_bytes()]
+
+    recorded = arrivals(RecordingTransport(cassette, httpx.MockTransport(upstream)))
+    replayed = arrivals(ReplayTransport(cassette, time_scale=1.0))
+
+    assert [chunk for _, chunk in replayed] == [chunk for _, chunk in recorded] == [b"data: one\n\n", b"data: two\n\n"]
+    # The first event is passed on while recording and sent early in replay, not held back for the whole body
+    assert recorded[0][0] < 0.1 <= recorded[1][0]
+    assert replayed[0][0] < 0.1 <= replayed[1][0]
+
+
+def test_responses_read_part_way_replay_up_to_where_reading_stopped(tmp_path):
+    cassette = Cassette(str(tmp_path / "stream.jsonl"))
+    url = "https://openrouter.ai/api/v1/chat/completions"
+
+    def upstream(request):
+        return httpx.Response(200, stream=_SlowChunks())
+
+    with httpx.Client(transport=RecordingTransport(cassette, httpx.MockTransport(upstream))) as client:
+        with client.stream("POST", url, json={}) as response:
+            assert next(response.iter_bytes()) == b"data: one\n\n"
+
+    with httpx.Client(transport=ReplayTransport(cassette, time_scale=0)) as client:
+        with client.stream("POST", url, json={}) as response:
+            chunks = response.iter_bytes()
+            assert next(chunks) == b"data: one\n\n"
+            with pytest.raises(httpx.ReadError):
+                next(chunks)
+
+
+def test_conditional_requests_are_keyed_separately():
+    plain = httpx.Request("GET", "https://api.weather.gov/forecast")
+    conditional = httpx.Request("GET", "https://api.weather.gov/forecast", headers={"If-None-Match": '"v1"'})
+    other_host = httpx.Request("GET", "http://localhost:9000/forecast", headers={"Authorization": "Bearer secret"})
+
+    assert request_key(plain) != request_key(conditional)
+    assert request_key(plain) == request_key(other_host)
+
+
+def test_api_client_replays_from_settings(monkeypatch, recorded):
+    monkeypatch.setattr(settings, "CASSETTE_MODE", "replay")
+    monkeypatch.setattr(settings, "CASSETTE_PATH", recorded)
+    monkeypatch.setattr(settings, "CASSETTE_TIME_SCALE", 0.0)
+    client = ApiClient(base_url="https://api.weather.gov", response_cache=None)
+
+    assert client.get("forecast") == {"call": 1}
+    with pytest.raises(APIConnectionError):
+        client.get("alerts/active")
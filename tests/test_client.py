@@ -1,8 +1,13 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 import httpx
-from src.client import ApiClient
-from src.exceptions import APIError, APIConnectionError
+from tenacity import wait_none
+from src.client import ApiClient, AsyncApiClient
+from src.exceptions import APIError, APIConnectionError, APITimeoutError
 
 @pytest.fixture
 def api_client():
@@ -16,6 +21,7 @@ def test_init(api_client):
 def test_get_success(mock_get, api_client):
     mock_response = Mock()
     mock_response.status_code = 200
+    mock_response.headers = {}
     mock_response.json.return_value = {"data": "ok"}
     mock_get.return_value = mock_response
 
@@ -29,6 +35,7 @@ def test_get_retry_on_connection_error(mock_get, api_client):
     # Simulate connection error then success
     mock_response = Mock()
     mock_response.status_code = 200
+    mock_response.headers = {}
     mock_response.json.return_value = {"success": True}
     
     mock_get.side_effect = [httpx.ConnectError("Connection failed"), mock_response]
@@ -42,3 +49,149 @@ def test_get_retry_on_connection_error(mock_get, api_client):
     response = api_client.get("retry-endpoint")
     assert response == {"success": True}
     assert mock_get.call_count == 2
+
+@patch("httpx.Client.get")
+def test_get_reuses_pooled_client(mock_get, api_client):
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.json.return_value = {"data": "ok"}
+    mock_get.return_value = mock_response
+
+    api_client.get("first")
+    pooled = api_client.client
+    api_client.get("second")
+
+    assert api_client.client is pooled
+    assert mock_get.call_count == 2
+
+def test_close_releases_pool(api_client):
+    pooled = api_client.client
+    api_client.close()
+
+    assert pooled.is_closed
+    # A new pool is opened lazily on next use
+    assert api_client.client is not pooled
+    api_client.close()
+
+def test_context_manager_closes_pool():
+    with ApiClient(base_url="https://test.api.com") as client:
+        pooled = client.client
+    assert pooled.is_closed
+
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_async_get_success(mock_get):
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.json.return_value = {"data": "ok"}
+    mock_get.return_value = mock_response
+
+    async def scenario():
+        async with AsyncApiClient(base_url="https://test.api.com") as client:
+            return await client.get("test-endpoint")
+
+    assert asyncio.run(scenario()) == {"data": "ok"}
+    mock_get.assert_called_once()
+
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_async_get_retry_on_connection_error(mock_get):
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.json.return_value = {"success": True}
+    mock_get.side_effect = [httpx.ConnectError("Connection failed"), mock_response]
+    client = AsyncApiClient(base_url="https://test.api.com")
+    get_without_wait = AsyncApiClient.get.retry_with(wait=wait_none())
+
+    assert asyncio.run(get_without_wait(client, "retry-endpoint")) == {"success": True}
+    assert mock_get.call_count == 2
+
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_async_get_maps_timeout(mock_get):
+    mock_get.side_effect = httpx.ReadTimeout("too slow")
+    client = AsyncApiClient(base_url="https://test.api.com")
+
+    with pytest.raises(APITimeoutError):
+        asyncio.run(client.get("slow-endpoint"))
+
+def _response(status_code, json=None, headers=None):
+    return httpx.Response(
+        status_code,
+        json=json,
+        headers=headers,
+        request=httpx.Request("GET", "https://test.api.com/forecast"),
+    )
+
+@patch("httpx.Client.get")
+def test_get_serves_fresh_responses_from_cache(mock_get, api_client):
+    mock_get.return_value = _response(200, {"periods": []}, {"Cache-Control": "public, max-age=600"})
+
+    assert api_client.get("forecast") == {"periods": []}
+    assert api_client.get("forecast") == {"periods": []}
+
+    mock_get.assert_called_once()
+    assert api_client.cache_stats()["hits"] == 1
+
+@patch("httpx.Client.get")
+def test_get_revalidates_stale_responses_with_etag(mock_get, api_client):
+    mock_get.side_effect = [
+        _response(200, {"periods": [1]}, {"Cache-Control": "max-age=0", "ETag": '"v1"'}),
+        _response(304, headers={"Cache-Control": "max-age=600"}),
+    ]
+
+    api_client.get("forecast")
+    assert api_client.get("forecast") == {"periods": [1]}
+    assert api_client.get("forecast") == {"periods": [1]}
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert api_client.cache_stats() == {"hits": 1, "misses": 1, "revalidations": 1, "stores": 1}
+
+@patch("httpx.Client.get")
+def test_get_refresh_revalidates_fresh_responses(mock_get, api_client):
+    mock_get.side_effect = [
+        _response(200, {"periods": [1]}, {"Cache-Control": "max-age=600", "ETag": '"v1"'}),
+        _response(304, headers={"Cache-Control": "max-age=600"}),
+    ]
+
+    api_client.get("forecast")
+    before = api_client.cached_fresh_until("forecast")
+    time.sleep(0.01)
+    assert api_client.get("forecast", refresh=True) == {"periods": [1]}
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert api_client.cached_fresh_until("forecast") > before
+
+@patch("httpx.Client.get")
+def test_get_does_not_store_no_store_responses(mock_get, api_client):
+    mock_get.return_value = _response(200, {"data": 1}, {"Cache-Control": "no-store"})
+
+    api_client.get("private")
+    api_client.get("private")
+
+    assert mock_get.call_count == 2
+
+@patch("httpx.Client.get")
+def test_concurrent_identical_gets_share_one_request(mock_get):
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_get(*args, **kwargs):
+        started.set()
+        release.wait(timeout=5)
+        return _response(200, {"periods": []})
+
+    mock_get.side_effect = slow_get
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(client.get, "forecast") for _ in range(4)]
+        started.wait(timeout=5)
+        while client._flights.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    mock_get.assert_called_once()
+    assert results == [{"periods": []}] * 4
@@ -0,0 +1,126 @@
+import json
+from unittest.mock import patch
+
+import httpx
+
+from src.cache import MemoryCache, ResponseCache, SQLiteCache
+from src.client import ApiClient
+from src.forecast import FORECAST_PERIODS, Forecast, truncate
+
+
+def _payload(count=14):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [[[-97.1, 39.7], [-97.1, 39.8], [-97.0, 39.8]]]},
+        "properties": {
+            "updated": "2026-10-18T12:00:00+00:00",
+            "periods": [
+                {
+                    "number": number,
+                    "name": f"Period {number}",
+                    "temperature": 50 + number,
+                    "temperatureUnit": "F",
+                    "windSpeed": "5 mph",
+                    "icon": "https://api.weather.gov/icons/land/day/few?size=medium",
+                    "shortForecast": "Sunny",
+                    "detailedForecast": f"Sunny, with a high near {50 + number}.",
+                }
+                for number in range(1, count + 1)
+            ],
+        },
+    }
+
+
+def _legacy_format(city, state, payload):
+    """The string-concatenating formatter the model replaced"""
+    periods = payload["properties"]["periods"][:3]
+    if not periods:
+        return f"No forecast data available for {city}, {state}"
+    result = f"Weather forecast for {city}, {state}:\n\n"
+    for period in periods:
+        result += f"**{period['name']}**: {period['temperature']}°{period['temperatureUnit']}\n"
+        result += f"Conditions: {period['shortForecast']}\n"
+        result += f"Details: {period['detailedForecast']}\n\n"
+    return result.strip()
+
+
+def test_from_json_keeps_only_rendered_periods_and_fields():
+    forecast = Forecast.from_json(json.dumps(_payload()).encode())
+
+    assert len(forecast.periods) == FORECAST_PERIODS
+    assert forecast.periods[0].name == "Period 1"
+    assert forecast.periods[0].temperature == 51
+    assert not hasattr(forecast.periods[0], "__dict__")
+    assert forecast.to_payload()["properties"]["periods"][0] == {
+        "name": "Period 1",
+        "temperature": 51,
+        "temperatureUnit": "F",
+        "shortForecast": "Sunny",
+        "detailedForecast": "Sunny, with a high near 51.",
+    }
+
+
+def test_render_matches_previous_output():
+    for payload in (_payload(), _payload(count=2), _payload(count=0)):
+        assert Forecast.from_payload(payload).render("Linn", "KS") == _legacy_format("Linn", "KS", payload)
+
+
+def test_truncate_prefers_sentence_then_word_boundaries():
+    text = "Rain likely before noon. Then partly sunny, with a high near 61."
+
+    assert truncate(text, 200) == text
+    assert truncate(text, 40) == "Rain likely before noon."
+    assert truncate("Mostly sunny, with a high near 61 and light winds.", 20) == "Mostly sunny, with..."
+    assert truncate(text, 0) == ""
+
+
+def test_render_compact_is_one_line_per_period():
+    forecast = Forecast.from_payload(_payload())
+
+    assert forecast.render_compact("Linn", "KS", 160) == (
+        "Forecast for Linn, KS:\n"
+        "Period 1: 51°F, Sunny. Sunny, with a high near 51.\n"
+        "Period 2: 52°F, Sunny. Sunny, with a high near 52.\n"
+        "Period 3: 53°F, Sunny. Sunny, with a high near 53."
+    )
+    assert "Period 1: 51°F, Sunny\n" in forecast.render_compact("Linn", "KS", 0)
+
+
+def test_coerce_restores_payload_dicts():
+    forecast = Forecast.from_payload(_payload())
+
+    assert Forecast.coerce(forecast) is forecast
+    assert Forecast.coerce(forecast.to_payload()) == forecast
+
+
+def _response(payload):
+    return httpx.Response(
+        200,
+        json=payload,
+        headers={"Cache-Control": "max-age=600"},
+        request=httpx.Request("GET", "https://test.api.com/forecast"),
+    )
+
+
+@patch("httpx.Client.get")
+def test_client_caches_decoded_bodies_separately_from_raw_json(mock_get):
+    mock_get.side_effect = lambda *args, **kwargs: _response(_payload())
+    client = ApiClient(base_url="https://test.api.com", response_cache=ResponseCache(MemoryCache(), stale_ttl=60))
+
+    decoded = client.get("forecast", decode=Forecast.from_json)
+    assert client.get("forecast", decode=Forecast.from_json) is decoded
+    raw = client.get("forecast")
+
+    assert isinstance(decoded, Forecast)
+    assert len(raw["properties"]["periods"]) == 14
+    assert mock_get.call_count == 2
+
+
+def test_sqlite_cache_persists_models_as_payloads(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    forecast = Forecast.from_payload(_payload())
+
+    cache.set("k", {"body": forecast}, ttl=60)
+
+    assert Forecast.coerce(cache.get("k")["body"]) == forecast
+    cache.close()
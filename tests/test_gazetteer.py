@@ -0,0 +1,69 @@
+import math
+import random
+import pytest
+from scripts.build_gazetteer import build
+from src.gazetteer import Gazetteer, get_gazetteer, normalize_name, split_state
+from src.tools.geocode_tool import GeocodeTool
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return get_gazetteer()
+
+
+def test_normalize_and_split_state():
+    assert normalize_name("St. Louis") == normalize_name("Saint Louis") == "st louis"
+    assert split_state("Portland, OR") == ("Portland", "OR")
+    assert split_state("portland maine") == ("portland maine", None)
+    assert split_state("Portland, Maine") == ("Portland", "ME")
+    assert split_state("Seattle WA") == ("Seattle", "WA")
+
+
+def test_lookup_ranks_by_population_and_filters_by_state(gazetteer):
+    portlands = gazetteer.lookup("Portland")
+    assert [p.state for p in portlands[:2]] == ["OR", "ME"]
+    assert gazetteer.lookup("portland", state="ME")[0].label == "Portland, ME"
+
+
+def test_geocode_falls_back_to_prefix_and_fuzzy(gazetteer):
+    assert gazetteer.geocode("Dall")[0].label == "Dallas, TX"
+    assert gazetteer.geocode("Spokan")[0].label == "Spokane, WA"
+    assert gazetteer.geocode("Albuqerque")[0].label == "Albuquerque, NM"
+    assert gazetteer.geocode("Xqzzy") == []
+
+
+def test_resolve_requires_an_unambiguous_name(gazetteer):
+    assert gazetteer.resolve("Boise", min_population=20000).label == "Boise, ID"
+    assert gazetteer.resolve("Portland", min_population=20000) is None
+    assert gazetteer.resolve("Portland, OR").label == "Portland, OR"
+    assert gazetteer.resolve("Toronto", min_population=20000) is None
+
+
+def test_nearest_matches_brute_force(tmp_path):
+    rng = random.Random(7)
+    rows = [(f"Place {i}", "KS", rng.uniform(25, 49), rng.uniform(-124, -67), i) for i in range(500)]
+    path = str(tmp_path / "test.gaz")
+    build(rows, path)
+    gazetteer = Gazetteer(path)
+
+    for _ in range(25):
+        lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+        found = [place.name for place, _ in gazetteer.nearest(lat, lon, k=3)]
+        scale = math.cos(math.radians(lat))
+        expected = sorted(rows, key=lambda r: (r[2] - lat) ** 2 + ((r[3] - lon) * scale) ** 2)[:3]
+        assert found == [r[0] for r in expected]
+    gazetteer.close()
+
+
+def test_nearest_on_bundled_data(gazetteer):
+    place, distance = gazetteer.nearest(47.6062, -122.3321)[0]
+    assert place.label == "Seattle, WA"
+    assert distance < 1
+
+
+def test_geocode_tool_forward_and_reverse(gazetteer):
+    tool = GeocodeTool(gazetteer=gazetteer)
+
+    assert "Portland, OR: 45.52345, -122.67621" in tool.run({"query": "Portland"})
+    assert "Seattle, WA" in tool.run({"query": "47.6062, -122.3321"})
+    assert tool.run({"query": "Xqzzy"}).startswith("No US place found")
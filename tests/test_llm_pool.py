@@ -0,0 +1,184 @@
+import asyncio
+import time
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_openai import ChatOpenAI
+
+from benchmarks.fake_servers import FakeServerConfig, FakeUpstreamServer
+from src.agents.llm_pool import MIN_SAMPLES, LLM_POOL_HEDGES, PooledChatModel, parse_model_spec
+
+
+class DelayedChatModel(BaseChatModel):
+    """Streams reply word by word after delay seconds, or fails"""
+
+    reply: str
+    delay: float = 0.0
+    fail: bool = False
+    calls: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[getattr(t, "name", t) for t in tools], **kwargs)
+
+    def _chunks(self):
+        for word in self.reply.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.reply} is down")
+        yield from self._chunks()
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.reply} is down")
+        for chunk in self._chunks():
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, **kwargs))
+
+
+def _pool(*members, **kwargs):
+    return PooledChatModel(models=list(members), names=[m.reply for m in members], **kwargs)
+
+
+def test_parse_model_spec():
+    assert parse_model_spec("openai/gpt-4o-mini", "https://openrouter.ai/api/v1") == (
+        "openai/gpt-4o-mini", "https://openrouter.ai/api/v1"
+    )
+    assert parse_model_spec("llama3 @ http://localhost:11434/v1", "x") == ("llama3", "http://localhost:11434/v1")
+
+
+def test_fast_primary_is_not_hedged():
+    primary = DelayedChatModel(reply="primary", calls=[])
+    backup = DelayedChatModel(reply="backup", calls=[])
+
+    assert _pool(primary, backup, hedge_delay=0.5).invoke("hi").content == "primary "
+    assert backup.calls == []
+
+
+def test_slow_primary_is_hedged_with_the_next_model():
+    pool = _pool(DelayedChatModel(reply="slow", delay=1.0), DelayedChatModel(reply="fast"), hedge_delay=0.05)
+    hedges = LLM_POOL_HEDGES.value()
+
+    started = time.perf_counter()
+    assert pool.invoke("hi").content == "fast "
+    assert time.perf_counter() - started < 0.5
+    assert LLM_POOL_HEDGES.value() == hedges + 1
+
+
+def test_async_hedging_cancels_the_loser():
+    pool = _pool(DelayedChatModel(reply="slow", delay=1.0), DelayedChatModel(reply="fast"), hedge_delay=0.05)
+
+    async def run():
+        started = time.perf_counter()
+        message = await pool.ainvoke("hi")
+        return message, time.perf_counter() - started
+
+    message, elapsed = asyncio.run(run())
+    assert message.content == "fast "
+    assert elapsed < 0.5
+
+
+def test_failures_fall_back_and_demote_the_model():
+    broken = DelayedChatModel(reply="broken", fail=True, calls=[])
+    pool = _pool(broken, DelayedChatModel(reply="backup"), hedge_enabled=False, failure_threshold=2)
+
+    for _ in range(3):
+        assert pool.invoke("hi").content == "backup "
+
+    # The circuit opened after two failures, so the third call went to the backup first
+    assert len(broken.calls) == 2
+    assert pool.ranked() == [1, 0]
+    with pytest.raises(RuntimeError):
+        _pool(DelayedChatModel(reply="a", fail=True), DelayedChatModel(reply="b", fail=True)).invoke("hi")
+
+
+def test_a_model_failing_again_after_its_cooldown_is_demoted_again():
+    now = [0.0]
+    pool = _pool(DelayedChatModel(reply="a"), DelayedChatModel(reply="b"), failure_threshold=2, cooldown=30.0)
+    stats = pool._stats["a"]
+    stats.clock = lambda: now[0]
+
+    stats.record_error()
+    stats.record_error()
+    assert pool.ranked() == [1, 0]
+
+    now[0] += 31
+    assert pool.ranked() == [0, 1]
+    stats.record_error()
+    assert pool.ranked() == [1, 0]
+    assert pool.stats()[0]["circuit"] == "open"
+
+    stats.record_first_token(0.1)
+    assert pool.ranked() == [0, 1]
+    assert pool.stats()[0]["circuit"] == "closed"
+
+
+def test_abandoned_waits_never_lower_latency_estimates():
+    pool = _pool(DelayedChatModel(reply="a"), DelayedChatModel(reply="b"))
+    fast, slow = pool._stats["a"], pool._stats["b"]
+    for _ in range(MIN_SAMPLES):
+        fast.record_first_token(0.5)
+        slow.record_first_token(2.0)
+
+    for _ in range(MIN_SAMPLES):
+        # Abandoned early: a short wait says nothing about the model being fast
+        slow.record_abandoned(0.1)
+        # Abandoned late, more than once in ten calls: its p95 is at least that slow
+        fast.record_abandoned(3.0)
+
+    assert slow.percentile(0.5) == slow.percentile(0.95) == 2.0
+    assert fast.percentile(0.5) == 3.0
+    assert fast.percentile(0.95) == 3.0
+
+
+def test_models_are_ranked_by_observed_latency():
+    pool = _pool(DelayedChatModel(reply="a"), DelayedChatModel(reply="b"))
+    for _ in range(MIN_SAMPLES):
+        pool._stats["a"].record_first_token(0.5)
+        pool._stats["b"].record_first_token(0.1)
+
+    assert pool.ranked() == [1, 0]
+    assert pool.invoke("hi").content == "b "
+
+
+def test_bound_tools_reach_whichever_model_serves_the_call():
+    backup = DelayedChatModel(reply="backup", calls=[])
+    pool = _pool(DelayedChatModel(reply="broken", fail=True), backup, hedge_enabled=False)
+
+    pool.bind_tools(["get_weather_forecast"], tool_choice="auto").invoke("hi")
+
+    assert backup.calls == [{"tools": ["get_weather_forecast"], "tool_choice": "auto"}]
+
+
+def test_pool_hedges_against_openai_compatible_stand_ins():
+    config = FakeServerConfig(model_latency={"slow-model": 1.0}, failing_models=["down-model"])
+    with FakeUpstreamServer(config) as server:
+        def member(model):
+            return ChatOpenAI(model=model, api_key="test-key", base_url=server.llm_base_url, max_retries=0)
+
+        pool = PooledChatModel(
+            models=[member("down-model"), member("slow-model"), member("fast-model")],
+            names=["down-model", "slow-model", "fast-model"],
+            hedge_delay=0.1,
+        )
+        started = time.perf_counter()
+        message = pool.invoke("Should I plan a picnic near marker 1?")
+
+    assert time.perf_counter() - started < 0.8
+    assert message.tool_calls or message.content
+    assert [s["error_rate"] > 0 for s in pool.stats()] == [True, False, False]
@@ -0,0 +1,89 @@
+import io
+import json
+import logging
+
+from src import logger as logging_setup
+from src.config import settings
+from src.metrics import current_trace_id, trace
+
+
+def _logger(handler, name):
+    log = logging.getLogger(name)
+    log.handlers = [handler]
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    return log
+
+
+def test_json_lines_carry_trace_id_and_extra_fields(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    monkeypatch.setattr(settings, "LOG_QUEUE_ENABLED", False)
+    monkeypatch.setattr(settings, "DEBUG", True)
+    stream = io.StringIO()
+    handler, listener = logging_setup.build_handler(stream)
+    log = _logger(handler, "test.json")
+
+    with trace("agent"):
+        trace_id = current_trace_id.get()
+        log.info("GET %s", "forecast", extra={"status": 200})
+
+    entry = json.loads(stream.getvalue())
+    assert listener is None
+    assert entry["message"] == "GET forecast"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "test.json"
+    assert entry["trace_id"] == trace_id
+    assert entry["status"] == 200
+
+
+def test_queue_mode_writes_from_the_listener_thread(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_FORMAT", "text")
+    monkeypatch.setattr(settings, "LOG_QUEUE_ENABLED", True)
+    monkeypatch.setattr(settings, "DEBUG", False)
+    stream = io.StringIO()
+    handler, listener = logging_setup.build_handler(stream)
+    log = _logger(handler, "test.queue")
+
+    log.info("below the console level")
+    log.warning("upstream slow: %s", "forecast")
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith("WARNING - upstream slow: forecast")
+
+
+def test_sampling_keeps_or_drops_a_trace_as_a_whole(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_FORMAT", "text")
+    monkeypatch.setattr(settings, "LOG_QUEUE_ENABLED", False)
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.5)
+    monkeypatch.setattr(settings, "DEBUG", True)
+    stream = io.StringIO()
+    handler, _ = logging_setup.build_handler(stream)
+    log = _logger(handler, "test.sampling")
+
+    for _ in range(50):
+        with trace("agent"):
+            log.info("start")
+            log.info("end")
+            log.error("always")
+
+    lines = stream.getvalue().splitlines()
+    starts = sum(line.endswith("start") for line in lines)
+    assert 0 < starts < 50
+    assert sum(line.endswith("end") for line in lines) == starts
+    assert sum(line.endswith("always") for line in lines) == 50
+
+
+def test_full_queue_drops_records_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_QUEUE_ENABLED", True)
+    monkeypatch.setattr(settings, "LOG_QUEUE_SIZE", 1)
+    handler, listener = logging_setup.build_handler(io.StringIO())
+    listener.stop()
+    log = _logger(handler, "test.full")
+    dropped = logging_setup.LOG_DROPPED.value()
+
+    log.error("queued")
+    log.error("dropped")
+
+    assert logging_setup.LOG_DROPPED.value() == dropped + 1
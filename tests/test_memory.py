@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from src.agents.memory import Location, SessionMemory, SessionStore, summarize_turns
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _memory(clock=None, history_tokens=1000, max_tool_results=2):
+    return SessionMemory(
+        "s1", history_tokens=history_tokens, summary_tokens=100,
+        max_tool_results=max_tool_results, tool_result_ttl=900, clock=clock or Clock(),
+    )
+
+
+def _step(latitude, output, tool="get_weather_forecast"):
+    return SimpleNamespace(tool=tool, tool_input={"latitude": latitude, "longitude": -97.0892}), output
+
+
+def test_tool_results_and_locations_are_offered_to_follow_ups():
+    memory = _memory()
+    memory.add_turn("Weather near Linn?", "Sunny.", [_step(39.7456, "Forecast for Linn, KS:\nTonight: 51°F, Clear")])
+
+    messages = memory.messages()
+
+    assert messages[:2] == [("human", "Weather near Linn?"), ("ai", "Sunny.")]
+    role, context = messages[-1]
+    assert role == "system"
+    assert "Linn, KS (39.7456, -97.0892)" in context
+    assert "[get_weather_forecast(latitude=39.7456, longitude=-97.0892) fetched" in context
+    assert "Tonight: 51°F, Clear" in context
+    assert memory.has_context()
+
+
+def test_repeated_calls_replace_results_and_old_ones_expire():
+    clock = Clock()
+    memory = _memory(clock)
+    memory.add_turn("q1", "a1", [_step(39.7456, "Forecast for Linn, KS: old")])
+    memory.add_turn("q2", "a2", [_step(39.7456, "Forecast for Linn, KS: new"), _step(40.0, "Forecast for Topeka, KS: x")])
+    memory.add_turn("q3", "a3", [_step(41.0, "Forecast for Omaha, NE: y")])
+
+    assert [result.output[-1] for result in memory.tool_results] == ["x", "y"]
+    assert list(memory.locations) == ["Linn, KS", "Topeka, KS", "Omaha, NE"]
+
+    clock.now += 901
+    assert "Recent tool results" not in memory.messages()[-1][1]
+
+
+def test_turns_over_the_budget_are_returned_for_summarizing():
+    memory = _memory(history_tokens=30)
+    dropped = []
+    for i in range(4):
+        dropped += memory.add_turn(f"question {i} " + "x" * 40, f"answer {i}")
+
+    assert [turn.query[:10] for turn in dropped] == ["question 0", "question 1"]
+    assert [turn.query[:10] for turn in memory.turns] == ["question 2", "question 3"]
+    assert memory.tokens() <= 30
+
+
+def test_extractive_summary_keeps_newest_lines_within_budget():
+    memory = _memory(history_tokens=1)
+    turns = memory.add_turn("first", "one") + memory.add_turn("second", "two") + memory.add_turn("third", "three")
+
+    summary = summarize_turns("", turns, max_tokens=100)
+    assert summary.splitlines() == ["- Asked: first Answered: one", "- Asked: second Answered: two"]
+    assert summarize_turns(summary, turns[-1:], max_tokens=12).splitlines() == ["- Asked: second Answered: two"]
+
+
+def test_store_evicts_idle_and_least_recently_used_sessions():
+    clock = Clock()
+    store = SessionStore(max_sessions=2, idle_ttl=100, clock=clock)
+    store.get("a").remember_location(Location("Linn, KS", 39.7456, -97.0892))
+    store.get("b")
+    store.get("a")
+    store.get("c")
+
+    assert "b" not in store and "a" in store and "c" in store
+    assert list(store.get("a").locations) == ["Linn, KS"]
+
+    clock.now += 50
+    store.get("c")
+    clock.now += 60
+    store.get("d")
+    assert "a" not in store and "c" in store and "d" in store
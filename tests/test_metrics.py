@@ -0,0 +1,119 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from uuid import uuid4
+import httpx
+import pytest
+from tenacity import wait_none
+from src import metrics
+from src.agents.callbacks import MetricsCallbackHandler
+from src.client import ApiClient
+from src.config import settings
+from src.metrics import MetricsRegistry, span, trace
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+
+def test_span_is_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    monkeypatch.setattr(settings, "TRACE_PATH", None)
+    before = metrics.STAGE_SECONDS.count(stage="test.disabled")
+
+    with span("test.disabled") as timing:
+        timing.set(ignored=True)
+
+    assert timing is metrics._NOOP_SPAN
+    assert metrics.STAGE_SECONDS.count(stage="test.disabled") == before
+
+
+def test_span_records_duration_and_errors(enabled):
+    before = metrics.STAGE_SECONDS.count(stage="test.stage")
+
+    with span("test.stage"):
+        pass
+    with pytest.raises(ValueError):
+        with span("test.stage"):
+            raise ValueError("boom")
+
+    assert metrics.STAGE_SECONDS.count(stage="test.stage") == before + 2
+    assert metrics.STAGE_ERRORS.value(stage="test.stage", error="ValueError") >= 1
+
+
+def test_render_prometheus():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(2, route="/v1/query")
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="http")
+    histogram.observe(0.5, stage="http")
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/v1/query"} 2' in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{stage="http",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="http",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{stage="http",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{stage="http"} 2' in text
+
+
+def test_snapshots_from_other_processes_merge_into_sums():
+    worker = MetricsRegistry()
+    worker.counter("requests_total", "Requests").inc(2, route="/v1/query")
+    worker.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)).observe(0.5, stage="http")
+    snapshot = json.loads(json.dumps(worker.snapshot()))
+
+    merged = MetricsRegistry()
+    merged.merge(snapshot)
+    merged.merge(snapshot)
+
+    assert merged.counter("requests_total", "Requests").value(route="/v1/query") == 4
+    assert merged.histogram("latency_seconds", "Latency").count(stage="http") == 2
+    assert 'latency_seconds_bucket{stage="http",le="0.1"} 0' in merged.render_prometheus()
+
+
+def test_trace_records_share_a_trace_id(monkeypatch, tmp_path):
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(settings, "TRACE_PATH", str(path))
+
+    with trace("agent") as root:
+        root.set(path="fast")
+        with span("tool.points"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["stage"] for r in records] == ["tool.points", "agent"]
+    assert records[0]["trace_id"] == records[1]["trace_id"] is not None
+    assert records[1]["attrs"] == {"path": "fast"}
+    assert metrics.current_trace_id.get() is None
+
+
+@patch("httpx.Client.get")
+def test_each_http_attempt_is_timed(mock_get, enabled):
+    ok = Mock(status_code=200, headers={})
+    ok.json.return_value = {"data": "ok"}
+    mock_get.side_effect = [httpx.ConnectError("refused"), ok]
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    before = metrics.STAGE_SECONDS.count(stage="http.attempt")
+
+    client.get.retry_with(wait=wait_none())(client, "endpoint")
+
+    assert metrics.STAGE_SECONDS.count(stage="http.attempt") == before + 2
+    assert metrics.STAGE_ERRORS.value(stage="http.attempt", error="ConnectError") >= 1
+
+
+def test_llm_callback_records_tokens(enabled):
+    handler = MetricsCallbackHandler(model="test-model")
+    run_id = uuid4()
+    before = metrics.LLM_TOKENS.value(model="test-model", kind="completion")
+    message = SimpleNamespace(usage_metadata={"input_tokens": 120, "output_tokens": 30})
+    response = SimpleNamespace(llm_output=None, generations=[[SimpleNamespace(message=message)]])
+
+    handler.on_chat_model_start({}, [], run_id=run_id)
+    handler.on_llm_end(response, run_id=run_id)
+
+    assert metrics.LLM_TOKENS.value(model="test-model", kind="completion") == before + 30
+    assert metrics.LLM_TOKENS.value(model="test-model", kind="prompt") >= 120
@@ -0,0 +1,121 @@
+import time
+from unittest.mock import MagicMock
+
+from src.forecast import Forecast
+from src.prefetch import DemandTracker, ForecastPrefetcher
+from src.resilience import CircuitBreaker
+from src.tools.weather_tool import WeatherTool
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _client(fresh_until):
+    """A client mock whose cache reports fresh_until[endpoint] (None: not cached)"""
+    client = MagicMock()
+    client.circuit_breaker = None
+    client.cached_fresh_until.side_effect = lambda endpoint, decode=None: fresh_until.get(endpoint)
+    return client
+
+
+def test_demand_tracker_ranks_by_decayed_count():
+    clock = FakeClock()
+    demand = DemandTracker(half_life=60, clock=clock)
+    for _ in range(4):
+        demand.record("old")
+    clock.now += 120  # two half-lives: "old" now counts 1
+    demand.record("new")
+    demand.record("new")
+
+    assert [key for key, _ in demand.top(2)] == ["new", "old"]
+    assert abs(demand.score("old") - 1.0) < 1e-9
+    assert demand.score("unknown") == 0.0
+
+
+def test_demand_tracker_prunes_coldest_keys():
+    demand = DemandTracker(max_entries=10, clock=FakeClock())
+    for i in range(10):
+        for _ in range(i + 1):
+            demand.record(f"k{i}")
+    demand.record("k10")
+
+    assert len(demand) == 9
+    assert "k9" in dict(demand.top(9))
+    assert demand.score("k0") == 0.0
+
+
+def test_prefetcher_refreshes_hot_endpoints_close_to_expiry():
+    clock = FakeClock()
+    demand = DemandTracker(clock=clock)
+    for endpoint, hits in (("expiring", 3), ("fresh", 2), ("missing", 1), ("cold", 1)):
+        for _ in range(hits):
+            demand.record(endpoint)
+    client = _client({"expiring": clock.now + 30, "fresh": clock.now + 3600, "cold": clock.now + 10})
+    prefetcher = ForecastPrefetcher(client, demand, top_n=3, lead_time=60, jitter=0, clock=clock)
+
+    assert prefetcher.run_once() == 2
+
+    refreshed = [call.args[0] for call in client.get.call_args_list]
+    assert sorted(refreshed) == ["expiring", "missing"]
+    client.get.assert_called_with(refreshed[-1], decode=Forecast.from_json, refresh=True)
+
+
+def test_prefetcher_respects_budget_and_keeps_going_after_errors():
+    clock = FakeClock()
+    demand = DemandTracker(clock=clock)
+    for i in range(5):
+        demand.record(f"e{i}")
+    client = _client({})
+    client.get.side_effect = [Exception("upstream down"), {}, {}, {}, {}]
+    prefetcher = ForecastPrefetcher(client, demand, budget_per_minute=3, clock=clock)
+
+    assert prefetcher.run_once() == 2
+    assert client.get.call_count == 3
+
+
+def test_prefetcher_skips_pass_while_circuit_is_open():
+    demand = DemandTracker()
+    demand.record("forecast")
+    client = _client({})
+    client.circuit_breaker = MagicMock(state=CircuitBreaker.OPEN)
+
+    assert ForecastPrefetcher(client, demand).run_once() == 0
+    client.get.assert_not_called()
+
+
+def test_prefetcher_thread_starts_and_stops():
+    demand = DemandTracker()
+    demand.record("forecast")
+    client = _client({})
+    prefetcher = ForecastPrefetcher(client, demand, interval=0.01, jitter=0)
+
+    prefetcher.start()
+    deadline = time.monotonic() + 2
+    while not client.get.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    prefetcher.stop()
+
+    assert client.get.called
+    assert not prefetcher.running
+
+
+def test_weather_tool_records_forecast_demand():
+    demand = DemandTracker()
+    tool = WeatherTool(demand=demand)
+    client = MagicMock()
+    client.base_url = "https://api.weather.gov"
+    client.get.side_effect = [
+        {"properties": {"forecast": "https://api.weather.gov/gridpoints/TOP/32,81/forecast"}},
+        {"properties": {"periods": []}},
+    ]
+    tool.client = client
+    tool.grid_cache = None
+
+    tool.forecast(39.7456, -97.0892)
+
+    assert demand.top(1)[0][0] == "gridpoints/TOP/32,81/forecast"
@@ -0,0 +1,144 @@
+import pytest
+from unittest.mock import patch
+import httpx
+from tenacity import wait_none
+from src.cache import MemoryCache, ResponseCache
+from src.client import ApiClient
+from src.exceptions import APIConnectionError, APIRateLimitError, CircuitOpenError, RateLimitExceededError
+from src.resilience import CircuitBreaker, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(status_code, json=None, headers=None):
+    return httpx.Response(
+        status_code,
+        json=json,
+        headers=headers,
+        request=httpx.Request("GET", "https://test.api.com/forecast"),
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_limits_rate_and_honours_pause():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+    assert bucket.reserve(max_wait=10) == 0
+    assert bucket.reserve(max_wait=10) == 0
+    assert bucket.reserve(max_wait=10) == pytest.approx(0.5)
+    assert bucket.reserve(max_wait=0.1) is None
+
+    clock.now += 5
+    bucket.pause(3)
+    assert bucket.reserve(max_wait=10) == pytest.approx(3)
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@patch("httpx.Client.get")
+def test_rate_limited_responses_are_retried(mock_get):
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    mock_get.side_effect = [
+        _response(429, {"detail": "slow down"}, {"Retry-After": "0"}),
+        _response(503, {"detail": "busy"}),
+        _response(200, {"data": "ok"}),
+    ]
+
+    assert client.get.retry_with(wait=wait_none())(client, "forecast") == {"data": "ok"}
+    assert mock_get.call_count == 3
+
+
+@patch("httpx.Client.get")
+def test_rate_limit_error_carries_retry_after(mock_get):
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    mock_get.return_value = _response(429, {"detail": "slow down"}, {"Retry-After": "2"})
+
+    with pytest.raises(APIRateLimitError) as excinfo:
+        client.get.retry_with(wait=wait_none())(client, "forecast")
+
+    assert excinfo.value.retry_after == 2.0
+    assert excinfo.value.status_code == 429
+
+
+@patch("httpx.Client.get")
+def test_local_rate_limit_rejection_is_not_retried(mock_get):
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    client.rate_limiter = TokenBucket(rate=0.01, burst=1, clock=FakeClock())
+    mock_get.return_value = _response(200, {"data": "ok"})
+    get = client.get.retry_with(wait=wait_none())
+
+    assert get(client, "forecast") == {"data": "ok"}
+    with pytest.raises(RateLimitExceededError):
+        get(client, "forecast")
+
+    assert get.statistics["attempt_number"] == 1
+    assert mock_get.call_count == 1
+
+
+@patch("httpx.Client.get")
+def test_repeated_failures_open_the_circuit(mock_get):
+    client = ApiClient(base_url="https://test.api.com", response_cache=None)
+    client.circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    mock_get.side_effect = httpx.ConnectError("refused")
+
+    with pytest.raises(APIConnectionError):
+        client.get.retry_with(wait=wait_none())(client, "forecast")
+    calls = mock_get.call_count
+
+    with pytest.raises(CircuitOpenError):
+        client.get("forecast")
+    assert mock_get.call_count == calls
+    assert client.upstream_status()["circuit"] == CircuitBreaker.OPEN
+
+
+@patch("httpx.Client.get")
+def test_open_circuit_serves_stale_response(mock_get):
+    clock = FakeClock()
+    cache = ResponseCache(MemoryCache(max_entries=16, clock=clock), stale_ttl=3600, clock=clock)
+    client = ApiClient(base_url="https://test.api.com", response_cache=cache)
+    client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    mock_get.side_effect = [
+        _response(200, {"periods": [1]}, {"Cache-Control": "max-age=60"}),
+        _response(500, {"detail": "down"}),
+    ]
+
+    client.get("forecast")
+    clock.now += 120  # entry is now stale
+    with pytest.raises(Exception):
+        client.get("forecast")
+
+    assert client.get("forecast") == {"periods": [1]}
+    assert mock_get.call_count == 2
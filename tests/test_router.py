@@ -0,0 +1,57 @@
+import pytest
+from src.agents.router import QueryRouter, RoutedLocation, lookup_known_city
+
+
+@pytest.fixture
+def router():
+    return QueryRouter()
+
+
+@pytest.mark.parametrize("query", [
+    "What's the weather in Seattle?",
+    "weather in seattle",
+    "How's the weather in Seattle today?",
+    "Seattle weather",
+    "Forecast for Seattle, WA",
+    "Can you tell me the weather in Seattle WA please?",
+])
+def test_router_matches_simple_known_city_queries(router, query):
+    assert router.match(query) == RoutedLocation("Seattle", 47.6062, -122.3321)
+
+
+def test_router_matches_coordinates(router):
+    location = router.match("Get forecast for latitude 39.7456, longitude -97.0892")
+    assert (location.latitude, location.longitude) == (39.7456, -97.0892)
+    assert router.match("What's the weather at 37.7749, -122.4194?").longitude == -122.4194
+
+
+@pytest.mark.parametrize("query", [
+    "Will it rain in Seattle tomorrow?",
+    "Should I bring an umbrella in Boston today?",
+    "Compare the weather in Seattle and Miami",
+    "What's the weather in Portland?",
+    "What's the weather in Paris?",
+    "weather at 123.4, 500.0",
+])
+def test_router_leaves_other_queries_to_the_agent(router, query):
+    assert router.match(query) is None
+
+
+@pytest.mark.parametrize("query, label", [
+    ("weather in Boise", "Boise, ID"),
+    ("What's the weather in Portland, OR?", "Portland, OR"),
+    ("Saint Paul, Minnesota forecast", "Saint Paul, MN"),
+    # The built-in table's Kansas City is the Missouri one
+    ("weather in Kansas City, KS", "Kansas City, KS"),
+    ("Kansas City KS weather", "Kansas City, KS"),
+])
+def test_router_resolves_places_from_the_gazetteer(router, query, label):
+    assert router.match(query).name == label
+
+
+def test_state_qualified_table_cities_must_match_their_state():
+    router = QueryRouter(resolve_place=lookup_known_city)
+
+    assert router.match("weather in Kansas City, Missouri").name == "Kansas City"
+    assert router.match("weather in Seattle, OR") is None
+    assert router.match("weather in Kansas City, KS") is None
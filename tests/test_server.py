@@ -0,0 +1,181 @@
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, MagicMock
+from src.exceptions import APIConnectionError, APIError, APIRateLimitError, APITimeoutError
+from src.server import WeatherService
+
+
+def make_agent(answer_delay: float = 0.0):
+    agent = MagicMock()
+
+    async def aanswer(query, session_id=None):
+        await asyncio.sleep(answer_delay)
+        return f"answer to {query}" + (f" in {session_id}" if session_id else "")
+
+    agent.aanswer = aanswer
+    agent.aclose = AsyncMock()
+    agent.weather_tool.aforecast = AsyncMock(return_value="Weather forecast for Linn, KS:")
+    return agent
+
+
+def run_with_service(service, scenario):
+    async def runner():
+        await service.startup()
+        transport = httpx.ASGITransport(app=service)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            try:
+                return await scenario(client)
+            finally:
+                await service.shutdown()
+    return asyncio.run(runner())
+
+
+def test_query_and_forecast_endpoints():
+    agent = make_agent()
+    service = WeatherService(agent_factory=lambda: agent)
+
+    async def scenario(client):
+        query = await client.post("/v1/query", json={"query": "weather in Seattle"})
+        forecast = await client.get("/v1/forecast", params={"latitude": 39.7456, "longitude": -97.0892})
+        bad = await client.post("/v1/query", json={})
+        missing = await client.get("/nope")
+        return query, forecast, bad, missing
+
+    query, forecast, bad, missing = run_with_service(service, scenario)
+
+    assert query.json() == {"answer": "answer to weather in Seattle"}
+    assert forecast.json() == {"forecast": "Weather forecast for Linn, KS:"}
+    agent.weather_tool.aforecast.assert_awaited_once_with(39.7456, -97.0892)
+    assert bad.status_code == 400
+    assert missing.status_code == 404
+    agent.aclose.assert_awaited_once()
+
+
+def test_query_with_session_id_continues_the_conversation():
+    service = WeatherService(agent_factory=make_agent)
+
+    async def scenario(client):
+        ok = await client.post("/v1/query", json={"query": "and tomorrow?", "session_id": "abc"})
+        bad = await client.post("/v1/query", json={"query": "and tomorrow?", "session_id": 7})
+        return ok, bad
+
+    ok, bad = run_with_service(service, scenario)
+
+    assert ok.json() == {"answer": "answer to and tomorrow? in abc", "session_id": "abc"}
+    assert bad.status_code == 400
+
+
+def test_requests_carry_a_request_id():
+    service = WeatherService(agent_factory=make_agent)
+
+    async def scenario(client):
+        given = await client.post("/v1/query", json={"query": "hi"}, headers={"X-Request-ID": "req-42"})
+        generated = await client.post("/v1/query", json={})
+        return given, generated
+
+    given, generated = run_with_service(service, scenario)
+
+    assert given.headers["x-request-id"] == "req-42"
+    assert len(generated.headers["x-request-id"]) == 16
+
+
+def test_excess_requests_are_rejected_when_queue_is_full():
+    service = WeatherService(agent_factory=lambda: make_agent(answer_delay=0.05), max_concurrency=1, queue_depth=1)
+
+    async def scenario(client):
+        requests = [client.post("/v1/query", json={"query": f"q{i}"}) for i in range(4)]
+        return await asyncio.gather(*requests)
+
+    statuses = sorted(r.status_code for r in run_with_service(service, scenario))
+
+    assert statuses == [200, 200, 503, 503]
+
+
+def test_slow_requests_time_out():
+    service = WeatherService(agent_factory=lambda: make_agent(answer_delay=1.0), request_timeout=0.01)
+
+    async def scenario(client):
+        return await client.post("/v1/query", json={"query": "slow"})
+
+    assert run_with_service(service, scenario).status_code == 504
+
+
+def test_healthz_reports_admission_status():
+    service = WeatherService(agent_factory=make_agent, max_concurrency=3)
+
+    async def scenario(client):
+        return await client.get("/healthz")
+
+    response = run_with_service(service, scenario)
+
+    assert response.status_code == 200
+    assert response.json()["max_concurrency"] == 3
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    service = WeatherService(agent_factory=make_agent)
+
+    async def scenario(client):
+        return await client.get("/metrics")
+
+    response = run_with_service(service, scenario)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE weather_stage_duration_seconds histogram" in response.text
+
+
+def test_query_failures_are_reported_as_upstream_errors():
+    agent = make_agent()
+    agent.aanswer = AsyncMock(side_effect=[APIConnectionError("weather.gov is down"), APITimeoutError("too slow")])
+    service = WeatherService(agent_factory=lambda: agent)
+
+    async def scenario(client):
+        failed = await client.post("/v1/query", json={"query": "weather in Seattle"})
+        timed_out = await client.post("/v1/query", json={"query": "weather in Seattle"})
+        return failed, timed_out
+
+    failed, timed_out = run_with_service(service, scenario)
+
+    assert failed.status_code == 502
+    assert failed.json() == {"error": "Upstream error: weather.gov is down"}
+    assert timed_out.status_code == 504
+
+
+def test_query_bugs_are_internal_errors_not_upstream_errors():
+    agent = make_agent()
+    agent.aanswer = AsyncMock(side_effect=TypeError("'NoneType' object is not subscriptable"))
+    service = WeatherService(agent_factory=lambda: agent)
+
+    async def scenario(client):
+        return await client.post("/v1/query", json={"query": "weather in Seattle"})
+
+    response = run_with_service(service, scenario)
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal server error"}
+
+
+def test_forecast_rejected_by_weather_gov_is_a_client_error():
+    agent = make_agent()
+    agent.weather_tool.aforecast = AsyncMock(side_effect=[
+        APIError("API Request failed: 404", status_code=404),
+        APIError("API Request failed: 400", status_code=400),
+        APIRateLimitError("API Request failed: 429", status_code=429),
+        APIError("API Request failed: 500", status_code=500),
+    ])
+    service = WeatherService(agent_factory=lambda: agent)
+
+    async def scenario(client):
+        return [
+            await client.get("/v1/forecast", params={"latitude": 51.5, "longitude": -0.1})
+            for _ in range(4)
+        ]
+
+    outside_us, invalid, throttled, failed = run_with_service(service, scenario)
+
+    assert outside_us.status_code == 404
+    assert outside_us.json() == {"error": "Upstream rejected the request: API Request failed: 404"}
+    assert invalid.status_code == 400
+    assert throttled.status_code == 502
+    assert failed.status_code == 502
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_one_call_between_threads():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"forecast": "sunny"}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flights.do, "points/1,2", fetch) for _ in range(5)]
+        while flights.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_single_flight_shares_exceptions_and_forgets_finished_calls():
+    flights = SingleFlight()
+
+    with pytest.raises(ValueError):
+        flights.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+    # A finished call is not cached: the next call runs again
+    assert flights.do("key", lambda: 42) == 42
+
+
+def test_async_single_flight_shares_one_call():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"forecast": "rain"}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("forecast", fetch) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert flights.coalesced == 9
+    assert all(result == {"forecast": "rain"} for result in results)
+
+
+def test_async_single_flight_propagates_exceptions_to_waiters():
+    flights = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_async_single_flight_survives_the_first_caller_being_cancelled():
+    flights = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "rain"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+
+    assert isinstance(first, asyncio.CancelledError)
+    assert second == "rain"
+    assert flights.coalesced == 1
@@ -0,0 +1,68 @@
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.agents import tokens
+from src.agents.callbacks import MetricsCallbackHandler
+from src.agents.prompts import fast_path_summary_messages, system_prompt
+from src.config import settings
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+
+def test_count_tokens_estimates_without_encoding():
+    assert tokens.count_tokens("") == 0
+    assert tokens.count_tokens("abcdefgh") == 2
+    assert tokens.count_tokens("abcdefghi") == 3
+
+
+def test_prompt_breakdown_splits_parts():
+    messages = [
+        SystemMessage(content="s" * 40),
+        HumanMessage(content="u" * 20),
+        AIMessage(content="", tool_calls=[{"name": "get_weather_forecast", "args": {"latitude": 1}, "id": "1"}]),
+        ToolMessage(content="t" * 80, tool_call_id="1"),
+    ]
+    tools = [{"type": "function", "function": {"name": "get_weather_forecast"}}]
+
+    parts = tokens.prompt_breakdown(messages, tools)
+
+    assert parts["system"] == 10
+    assert parts["user"] == 5
+    assert parts["assistant"] > 0
+    assert parts["tool"] == 20
+    assert parts["tools"] > 0
+
+
+def test_callback_records_prompt_parts_and_tool_output(enabled):
+    handler = MetricsCallbackHandler(model="token-model")
+    system_before = tokens.PROMPT_TOKENS.value(model="token-model", part="system")
+    tool_before = tokens.TOOL_OUTPUT_TOKENS.value(tool="get_weather_forecast")
+
+    handler.on_chat_model_start({}, [[SystemMessage(content="s" * 40)]], run_id=uuid4())
+    tool_run = uuid4()
+    handler.on_tool_start({"name": "get_weather_forecast"}, "{}", run_id=tool_run)
+    handler.on_tool_end("x" * 12, run_id=tool_run)
+
+    assert tokens.PROMPT_TOKENS.value(model="token-model", part="system") == system_before + 10
+    assert tokens.TOOL_OUTPUT_TOKENS.value(tool="get_weather_forecast") == tool_before + 3
+
+
+def test_compact_system_prompt_is_shorter_and_keeps_tools():
+    compact, full = system_prompt(True), system_prompt(False)
+
+    assert tokens.count_tokens(compact) < tokens.count_tokens(full) / 2
+    for tool in ("get_weather_details", "geocode_place"):
+        assert tool in compact
+
+
+def test_fast_path_summary_puts_static_instructions_first():
+    first = fast_path_summary_messages("Rain in Linn?", "Sunny")
+    second = fast_path_summary_messages("Snow in Boise?", "Cloudy")
+
+    assert first[0] == second[0] and first[0][0] == "system"
+    assert "Rain in Linn?" in first[1][1] and "Sunny" in first[1][1]
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.config import settings
+from src.agents.weather_agent import WeatherAgent
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """WeatherAgent with a dummy API key; no network calls are made at construction"""
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "test-key")
+    agent = WeatherAgent()
+    agent.agent_executor = MagicMock()
+    agent.agent_executor.invoke.return_value = {"output": "agent answer"}
+    agent.weather_tool.forecast = MagicMock(return_value="Weather forecast for Seattle, WA:")
+    yield agent
+    agent.close()
+
+
+def test_fast_path_skips_agent_for_known_city(agent):
+    assert agent.run("What's the weather in Seattle?") == "Weather forecast for Seattle, WA:"
+    agent.weather_tool.forecast.assert_called_once_with(47.6062, -122.3321)
+    agent.agent_executor.invoke.assert_not_called()
+
+
+def test_ambiguous_queries_use_agent(agent):
+    assert agent.run("Will it rain in Seattle tomorrow?") == "agent answer"
+    agent.weather_tool.forecast.assert_not_called()
+
+
+def test_fast_path_falls_back_to_agent_on_error(agent):
+    agent.weather_tool.forecast.side_effect = RuntimeError("upstream down")
+    assert agent.run("Seattle weather") == "agent answer"
+
+
+def test_repeat_questions_are_served_from_answer_cache(agent):
+    agent.run("Will it rain in Seattle tomorrow?")
+    assert agent.run("will it rain in  seattle tomorrow") == "agent answer"
+    agent.agent_executor.invoke.assert_called_once()
+
+
+def test_error_answers_are_not_cached(agent):
+    agent.agent_executor.invoke.side_effect = [RuntimeError("LLM down"), {"output": "agent answer"}]
+    assert agent.run("Will it rain in Seattle tomorrow?").startswith("Sorry")
+    assert agent.run("Will it rain in Seattle tomorrow?") == "agent answer"
+
+
+def test_run_many_reports_results_for_every_query(agent):
+    agent.agent_executor.invoke.side_effect = RuntimeError("LLM down")
+    queries = ["Seattle weather", "seattle weather", "Will it rain in Seattle tomorrow?"]
+
+    results = sorted(agent.run_many(queries), key=lambda r: r.index)
+
+    assert [r.output for r in results[:2]] == ["Weather forecast for Seattle, WA:"] * 2
+    assert results[2].error == "RuntimeError: LLM down"
+    agent.weather_tool.forecast.assert_called_once()
+
+
+def test_stream_relays_tool_starts_and_tokens(agent):
+    def fake_invoke(inputs, config):
+        handler = config["callbacks"][0]
+        handler.on_tool_start({"name": "get_weather_forecast"}, "{}")
+        for token in ["Rain ", "", "likely."]:
+            handler.on_llm_new_token(token)
+        return {"output": "Rain likely."}
+
+    agent.agent_executor.invoke.side_effect = fake_invoke
+
+    events = list(agent.stream("Will it rain in Seattle tomorrow?"))
+
+    assert [(e.type, e.data) for e in events] == [
+        ("tool_start", "get_weather_forecast"),
+        ("token", "Rain "),
+        ("token", "likely."),
+        ("final", "Rain likely."),
+    ]
+
+
+def test_stream_fast_path_and_errors(agent):
+    events = list(agent.stream("Seattle weather"))
+    assert [e.type for e in events] == ["tool_start", "token", "final"]
+    assert events[-1].data == "Weather forecast for Seattle, WA:"
+
+    agent.agent_executor.invoke.side_effect = RuntimeError("LLM down")
+    events = list(agent.stream("Will it snow in Denver?"))
+    assert events[-1].type == "error"
+    assert "LLM down" in events[-1].data
+
+
+def test_astream_fast_path(agent):
+    agent.weather_tool.aforecast = AsyncMock(return_value="Weather forecast for Denver, CO:")
+
+    async def collect():
+        return [event async for event in agent.astream("weather in Denver")]
+
+    events = asyncio.run(collect())
+
+    assert events[-1] == ("final", "Weather forecast for Denver, CO:")
+
+
+def test_executor_is_built_lazily(monkeypatch):
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "test-key")
+    with WeatherAgent() as agent:
+        assert agent._agent_executor is None
+        agent.warm_up(background=True).join(timeout=30)
+        assert agent._agent_executor is not None
+        assert agent.llm.streaming is True
+
+
+def test_follow_ups_get_session_history_and_skip_answer_cache(agent):
+    action = SimpleNamespace(tool="get_weather_forecast", tool_input={"latitude": 47.6062, "longitude": -122.3321})
+    agent.agent_executor.invoke.return_value = {
+        "output": "Rain tonight.",
+        "intermediate_steps": [(action, "Forecast for Seattle, WA:\nTonight: 48°F, Rain")],
+    }
+    agent.run("Will it rain in Seattle tonight?", session_id="s1")
+    agent.run("and tomorrow?", session_id="other")
+    agent.run("and tomorrow?", session_id="s1")
+
+    inputs = agent.agent_executor.invoke.call_args.args[0]
+    assert inputs["input"] == "and tomorrow?"
+    assert inputs["chat_history"][:2] == [("human", "Will it rain in Seattle tonight?"), ("ai", "Rain tonight.")]
+    assert "Tonight: 48°F, Rain" in inputs["chat_history"][-1][1]
+    assert agent.agent_executor.invoke.call_count == 3
+
+    agent.reset_session("s1")
+    assert "s1" not in agent.sessions
+
+
+def test_fast_path_answers_are_remembered_in_the_session(agent):
+    agent.run("Seattle weather", session_id="s1")
+    agent.run("Is that warmer than usual?", session_id="s1")
+
+    history = agent.agent_executor.invoke.call_args.args[0]["chat_history"]
+    assert history[1] == ("ai", "Weather forecast for Seattle, WA:")
+    assert "Seattle (47.6062, -122.3321)" in history[-1][1]
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.cache import GridPointCache, MemoryCache
+from src.client import ApiClient, AsyncApiClient
+from src.forecast import Alerts, GridpointData, HourlyForecast
+from src.tools.weather_details_tool import WeatherDetailsTool
+
+BASE_URL = "https://api.weather.gov"
+
+POINT_DATA = {
+    "properties": {
+        "relativeLocation": {"properties": {"city": "Linn", "state": "KS"}},
+        "forecast": f"{BASE_URL}/gridpoints/TOP/32,81/forecast",
+        "forecastHourly": f"{BASE_URL}/gridpoints/TOP/32,81/forecast/hourly",
+        "forecastGridData": f"{BASE_URL}/gridpoints/TOP/32,81",
+        "forecastZone": f"{BASE_URL}/zones/forecast/KSZ009",
+    }
+}
+
+HOURLY = {"properties": {"periods": [
+    {
+        "startTime": f"2026-10-18T{hour:02d}:00:00-05:00",
+        "temperature": 50 + hour,
+        "temperatureUnit": "F",
+        "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": 10 * (hour % 10)},
+        "windSpeed": "10 mph",
+        "shortForecast": "Chance Showers",
+        "icon": "https://api.weather.gov/icons/land/day/rain_showers",
+    }
+    for hour in range(24)
+]}}
+
+GRIDPOINT = {"properties": {
+    "temperature": {"uom": "wmoUnit:degC", "values": [{"validTime": "2026-10-18T12:00:00+00:00/PT1H", "value": 12.5}]},
+    "dewpoint": {"uom": "wmoUnit:degC", "values": [{"validTime": "2026-10-18T12:00:00+00:00/PT1H", "value": 5}]},
+    "skyCover": {"uom": "wmoUnit:percent", "values": [{"validTime": "2026-10-18T12:00:00+00:00/PT3H", "value": 80}]},
+}}
+
+ALERTS = {"features": [{"properties": {
+    "event": "Flood Watch",
+    "severity": "Moderate",
+    "headline": "Flood Watch issued October 18 at 4:00AM CDT",
+    "ends": "2026-10-19T07:00:00-05:00",
+    "instruction": "Monitor later forecasts.\nBe prepared to act.",
+    "description": "..." * 500,
+}}]}
+
+RESPONSES = {
+    "points/39.7456,-97.0892": POINT_DATA,
+    "gridpoints/TOP/32,81/forecast/hourly": HourlyForecast.from_payload(HOURLY),
+    "gridpoints/TOP/32,81": GridpointData.from_payload(GRIDPOINT),
+    "alerts/active/zone/KSZ009": Alerts.from_payload(ALERTS),
+}
+
+
+def _tool(get):
+    client = MagicMock(spec=ApiClient(base_url=BASE_URL))
+    client.base_url = BASE_URL
+    client.get.side_effect = get
+    async_client = MagicMock(spec=AsyncApiClient(base_url=BASE_URL))
+    return WeatherDetailsTool(client=client, async_client=async_client, grid_cache=GridPointCache(MemoryCache(), ttl=60))
+
+
+def test_fetches_requested_sections_after_one_points_lookup():
+    tool = _tool(lambda endpoint, params=None, decode=None: RESPONSES[endpoint])
+
+    result = tool._run(latitude=39.7456, longitude=-97.0892, sections=["hourly", "alerts", "gridpoint"], hours=3)
+
+    assert result.index("Hourly forecast for Linn, KS") < result.index("Active weather alerts") < result.index("Gridpoint")
+    assert "- 2026-10-18 02:00: 52°F, Chance Showers, 20% chance of precipitation, wind 10 mph" in result
+    assert "03:00" not in result
+    assert "**Flood Watch** (Moderate) until 2026-10-19 07:00" in result
+    assert "Instructions: Monitor later forecasts. Be prepared to act." in result
+    assert "- temperature (degC): 10-18 12:00 12.5" in result
+    assert "dewpoint" not in result
+    endpoints = [call.args[0] for call in tool.client.get.call_args_list]
+    assert endpoints[0] == "points/39.7456,-97.0892"
+    assert sorted(endpoints[1:]) == ["alerts/active/zone/KSZ009", "gridpoints/TOP/32,81", "gridpoints/TOP/32,81/forecast/hourly"]
+
+
+def test_sections_are_fetched_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def get(endpoint, params=None, decode=None):
+        if not endpoint.startswith("points/"):
+            barrier.wait()  # both section requests must be in flight at once
+        return RESPONSES[endpoint]
+
+    result = _tool(get)._run(latitude=39.7456, longitude=-97.0892, sections=["hourly", "alerts"])
+
+    assert "Hourly forecast" in result and "Active weather alerts" in result
+
+
+def test_failed_section_is_reported_without_losing_the_others():
+    def get(endpoint, params=None, decode=None):
+        if endpoint.startswith("alerts/"):
+            raise RuntimeError("alerts down")
+        return RESPONSES[endpoint]
+
+    result = _tool(get)._run(latitude=39.7456, longitude=-97.0892, sections=["alerts", "hourly"])
+
+    assert "Could not fetch alerts for Linn, KS: RuntimeError: alerts down" in result
+    assert "Hourly forecast for Linn, KS" in result
+
+
+def test_alerts_fall_back_to_point_query_without_zone():
+    point_data = {"properties": {"relativeLocation": {"properties": {"city": "Linn", "state": "KS"}}}}
+    calls = []
+
+    def get(endpoint, params=None, decode=None):
+        calls.append((endpoint, params))
+        return point_data if endpoint.startswith("points/") else {"features": []}
+
+    result = _tool(get)._run(latitude=39.74561, longitude=-97.0892, sections=["alerts", "hourly"])
+
+    assert calls[1] == ("alerts/active", {"point": "39.7456,-97.0892"})
+    assert "No active weather alerts for Linn, KS." in result
+    assert "No hourly forecast available for Linn, KS" in result
+
+
+def test_async_details_use_async_client():
+    async def get(endpoint, params=None, decode=None):
+        await asyncio.sleep(0)
+        return RESPONSES[endpoint]
+
+    tool = _tool(None)
+    tool.async_client.get = AsyncMock(side_effect=get)
+
+    result = asyncio.run(tool._arun(latitude=39.7456, longitude=-97.0892, sections=["alerts"]))
+
+    assert "Flood Watch" in result
+    tool.client.get.assert_not_called()
+    assert tool.async_client.get.await_count == 2
+
+
+@pytest.mark.parametrize("model, payload", [(HourlyForecast, HOURLY), (GridpointData, GRIDPOINT), (Alerts, ALERTS)])
+def test_models_round_trip_through_payloads(model, payload):
+    decoded = model.from_payload(payload)
+
+    assert model.coerce(decoded.to_payload()) == decoded
@@ -1,5 +1,7 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from src.forecast import Forecast
 from src.tools.weather_tool import WeatherTool
 
 
@@ -91,3 +93,18 @@ def test_weather_tool_run_error_handling(mock_api_client_class, weather_tool):
     # Verify error message
     assert "Error fetching weather data" in result
     assert "API Error" in result
+
+
+def test_weather_tool_arun_success(weather_tool, mock_point_data, mock_forecast_data):
+    """Test the async path uses the async client and formats the same output"""
+    weather_tool.client.base_url = "https://api.weather.gov"
+    mock_async_client = MagicMock()
+    mock_async_client.get = AsyncMock(side_effect=[mock_point_data, mock_forecast_data])
+    weather_tool.async_client = mock_async_client
+    
+    result = asyncio.run(weather_tool._arun(latitude=39.7456, longitude=-97.0892))
+    
+    assert "Linn, KS" in result
+    assert "32°F" in result
+    assert mock_async_client.get.await_count == 2
+    mock_async_client.get.assert_awaited_with("gridpoints/TOP/32,81/forecast", decode=Forecast.from_json)
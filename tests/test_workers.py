@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+
+from src import workers
+from src.batch import run_batch_processes
+from src.config import settings
+from src.metrics import MetricsRegistry, registry
+from src.server import WeatherService
+from tests.test_server import make_agent, run_with_service
+
+
+def _upper_worker():
+    """Factory run in each worker process"""
+    handled = registry.counter("test_worker_items_total", "Items handled by test workers")
+
+    def upper(item):
+        if item == "bad":
+            raise ValueError("no such place")
+        handled.inc(pid=os.getpid())
+        return item.upper()
+
+    return upper, lambda: None
+
+
+def _broken_worker():
+    raise RuntimeError("no API key")
+
+
+def test_run_batch_processes_spreads_items_and_merges_metrics():
+    items = ["a", "b", "a", "bad", "c", "d"]
+
+    results = sorted(run_batch_processes(_upper_worker, items, workers=2, max_concurrency=4), key=lambda r: r.index)
+
+    assert [r.output for r in results] == ["A", "B", "A", None, "C", "D"]
+    assert results[3].error == "ValueError: no such place"
+    # Each distinct item ran once, in whichever worker took it
+    handled = registry.counter("test_worker_items_total", "Items handled by test workers")
+    assert sum(value for _, value in handled.state()) == 4
+
+
+def test_run_batch_processes_reports_items_when_workers_cannot_start():
+    results = list(run_batch_processes(_broken_worker, ["a", "b"], workers=2))
+
+    assert [r.error for r in results] == ["RuntimeError: no API key"] * 2
+
+
+def test_prepare_shared_state_points_caches_at_the_state_directory(monkeypatch, tmp_path):
+    for name in ("WORKERS", "WORKER_STATE_DIR", "DEBUG", "GRID_CACHE_PATH", "RESPONSE_CACHE_PATH", "AGENT_CACHE_PATH"):
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(settings, "WORKER_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "AGENT_CACHE_PATH", "/var/cache/answers.sqlite")
+    (tmp_path / "metrics").mkdir()
+    (tmp_path / "metrics" / "123.json").write_text("{}")
+
+    assert workers.prepare_shared_state(4) == str(tmp_path)
+
+    assert settings.GRID_CACHE_PATH == str(tmp_path / "grid.sqlite")
+    assert os.environ["RESPONSE_CACHE_PATH"] == str(tmp_path / "responses.sqlite")
+    assert settings.AGENT_CACHE_PATH == "/var/cache/answers.sqlite"
+    assert os.environ["WORKERS"] == "4"
+    assert list((tmp_path / "metrics").iterdir()) == []
+
+
+def test_service_metrics_include_other_workers(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "WORKERS", 2)
+    monkeypatch.setattr(settings, "WORKER_STATE_DIR", str(tmp_path))
+    (tmp_path / "metrics").mkdir()
+    other = MetricsRegistry()
+    other.counter("weather_agent_answers_total", "Agent answers by path (cache/fast/agent)").inc(5, path="fast")
+    (tmp_path / "metrics" / "1.json").write_text(json.dumps(other.snapshot()))
+    before = registry.counter("weather_agent_answers_total", "").value(path="fast")
+    service = WeatherService(agent_factory=make_agent)
+
+    async def scenario(client):
+        return await client.get("/metrics")
+
+    response = run_with_service(service, scenario)
+
+    assert f'weather_agent_answers_total{{path="fast"}} {int(before) + 5}' in response.text
+    # A stopped worker's snapshot goes, so its replacement is not counted twice
+    assert not (tmp_path / "metrics" / f"{os.getpid()}.json").exists()
+
+
+def test_snapshots_of_exited_workers_are_skipped(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    (tmp_path / "metrics").mkdir()
+    stale = MetricsRegistry()
+    stale.counter("test_stale_snapshot_total", "Counted only by an exited worker").inc(3)
+    (tmp_path / "metrics" / f"{exited.pid}.json").write_text(json.dumps(stale.snapshot()))
+
+    merged = workers.aggregated_metrics(str(tmp_path))
+
+    assert merged.counter("test_stale_snapshot_total", "").value() == 0